@@ -0,0 +1,233 @@
+"""
+Per-Day Session Aggregates
+==========================
+Mergeable session statistics (counts per rep, time per rep, hourly counts,
+regions, unique IP / customer sketches, handle-time quantile sketches per
+rep and per hour) and a per-day cache of them.
+
+generate_report builds one SessionAggregate per calendar day in a single
+pass over the sessions and stores each day under report_cache/ next to the
+CSV. Monthly or yearly views merge the cached days instead of re-reading
+every CSV.
+
+Usage:
+    from aggregate_cache import SessionAggregate, save_day, load_range
+
+    totals, missing = load_range(folder, date(2025, 11, 1), date(2025, 11, 30))
+    totals.unique_ips.count(), totals.unique_ips.error_bound
+    totals.rep_handle_time['Alice'].percentiles()   # {50: ..., 90: ..., 99: ...} minutes
+"""
+
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from distinct_sketch import DistinctCounter
+from ip_regions import classify_address, parse_address
+from quantile_sketch import KllSketch
+
+CACHE_DIRNAME = "report_cache"
+
+# Bump when the stored layout changes; older files are ignored
+CACHE_VERSION = 2
+
+# Column names tried (in order) for the customer identity
+CUSTOMER_COLUMNS = ("Customer's Name", "Customer Name", "Customer")
+
+# Columns the report reads from each session row
+SESSION_FIELDS = ('Started', "Representative's Name", "Representative's Time Involved",
+                  "Customer's Public IP") + CUSTOMER_COLUMNS
+
+# Columns a file must have to be processed at all (checked before parsing)
+REQUIRED_COLUMNS = ('Started',)
+
+
+def parse_started(started):
+    """Parse a 'Started' value like '2025-11-07 09:15:02 EST' (timezone dropped)"""
+    # Exports always use this layout; fromisoformat is several times faster than strptime
+    if started[10:11] == ' ' and started[19:20] == ' ':
+        try:
+            return datetime.fromisoformat(started[:19])
+        except ValueError:
+            pass
+    return datetime.strptime(started.rsplit(' ', 1)[0], '%Y-%m-%d %H:%M:%S')
+
+
+def parse_time_involved(time_str):
+    """Minutes from a 'Representative's Time Involved' value like '1:25' (None if invalid)"""
+    parts = (time_str or '').split(':')
+    if len(parts) == 2:
+        try:
+            return int(parts[0]) * 60 + int(parts[1])
+        except ValueError:
+            return None
+    return None
+
+
+def customer_key(session):
+    """Best available customer identifier for a session row"""
+    for column in CUSTOMER_COLUMNS:
+        value = session.get(column)
+        if value:
+            return value.strip().lower()
+    return None
+
+
+class SessionAggregate:
+    """Mergeable statistics for a set of sessions (usually one day)"""
+
+    def __init__(self, distinct_mode='auto'):
+        self.distinct_mode = distinct_mode
+        self.sessions = 0
+        self.rep_counts = defaultdict(int)
+        self.rep_time = defaultdict(int)
+        self.hourly_counts = defaultdict(int)
+        self.regions = defaultdict(int)
+        self.unique_ips = DistinctCounter(distinct_mode)
+        self.unique_customers = DistinctCounter(distinct_mode)
+        # Handle time ("Representative's Time Involved", minutes) distributions
+        self.handle_time = KllSketch()
+        self.rep_handle_time = defaultdict(KllSketch)
+        self.hourly_handle_time = defaultdict(KllSketch)
+
+    def add_session(self, session, started=None):
+        """Add one CSV row (started: already-parsed 'Started' datetime)"""
+        if started is None:
+            started = parse_started(session['Started'])
+
+        rep_name = session.get("Representative's Name", "Unknown")
+        self.sessions += 1
+        self.rep_counts[rep_name] += 1
+        self.hourly_counts[started.hour] += 1
+
+        minutes = parse_time_involved(session.get("Representative's Time Involved", ""))
+        if minutes is not None:
+            self.rep_time[rep_name] += minutes
+            self.handle_time.add(minutes)
+            self.rep_handle_time[rep_name].add(minutes)
+            self.hourly_handle_time[started.hour].add(minutes)
+
+        address = parse_address(session.get("Customer's Public IP", ""))
+        if address:
+            ip, version, value = address
+            self.unique_ips.add(ip)
+            self.regions[classify_address(version, value)] += 1
+
+        customer = customer_key(session)
+        if customer:
+            self.unique_customers.add(customer)
+
+    def merge(self, other):
+        """Merge another aggregate into this one (in place)"""
+        self.sessions += other.sessions
+        for target, source in ((self.rep_counts, other.rep_counts), (self.rep_time, other.rep_time),
+                               (self.hourly_counts, other.hourly_counts), (self.regions, other.regions)):
+            for key, value in source.items():
+                target[key] += value
+        self.unique_ips.merge(other.unique_ips)
+        self.unique_customers.merge(other.unique_customers)
+        self.handle_time.merge(other.handle_time)
+        for target, source in ((self.rep_handle_time, other.rep_handle_time),
+                               (self.hourly_handle_time, other.hourly_handle_time)):
+            for key, sketch in source.items():
+                target[key].merge(sketch)
+        return self
+
+    def handle_time_for(self, hours):
+        """Handle-time sketch for sessions started in any of the given hours"""
+        sketch = KllSketch()
+        for hour in hours:
+            if hour in self.hourly_handle_time:
+                sketch.merge(self.hourly_handle_time[hour])
+        return sketch
+
+    def to_dict(self):
+        return {
+            'version': CACHE_VERSION,
+            'sessions': self.sessions,
+            'rep_counts': dict(self.rep_counts),
+            'rep_time': dict(self.rep_time),
+            'hourly_counts': {str(hour): count for hour, count in self.hourly_counts.items()},
+            'regions': dict(self.regions),
+            'unique_ips': self.unique_ips.to_dict(),
+            'unique_customers': self.unique_customers.to_dict(),
+            'handle_time': self.handle_time.to_dict(),
+            'rep_handle_time': {rep: sketch.to_dict() for rep, sketch in self.rep_handle_time.items()},
+            'hourly_handle_time': {str(hour): sketch.to_dict() for hour, sketch in self.hourly_handle_time.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        agg = cls(data['unique_ips'].get('mode', 'auto'))
+        agg.sessions = data['sessions']
+        agg.rep_counts.update(data['rep_counts'])
+        agg.rep_time.update(data['rep_time'])
+        agg.hourly_counts.update({int(hour): count for hour, count in data['hourly_counts'].items()})
+        agg.regions.update(data['regions'])
+        agg.unique_ips = DistinctCounter.from_dict(data['unique_ips'])
+        agg.unique_customers = DistinctCounter.from_dict(data['unique_customers'])
+        agg.handle_time = KllSketch.from_dict(data['handle_time'])
+        agg.rep_handle_time.update({rep: KllSketch.from_dict(sketch)
+                                    for rep, sketch in data['rep_handle_time'].items()})
+        agg.hourly_handle_time.update({int(hour): KllSketch.from_dict(sketch)
+                                       for hour, sketch in data['hourly_handle_time'].items()})
+        return agg
+
+
+def cache_dir(folder):
+    return Path(folder) / CACHE_DIRNAME
+
+
+def save_day(folder, day, aggregate):
+    """Store the aggregate for one day (a date or 'YYYY-MM-DD')"""
+    directory = cache_dir(folder)
+    directory.mkdir(exist_ok=True)
+
+    day_file = directory / f"{day}.json"
+    tmp_file = directory / f"{day}.json.tmp"
+    # dumps() uses the C encoder; dump() streams through the pure-Python one
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(aggregate.to_dict()))
+    os.replace(tmp_file, day_file)
+
+
+def load_day(folder, day):
+    """Load the cached aggregate for one day (None if missing or outdated)"""
+    day_file = cache_dir(folder) / f"{day}.json"
+    if not day_file.exists():
+        return None
+    try:
+        with open(day_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != CACHE_VERSION:
+        return None
+    return SessionAggregate.from_dict(data)
+
+
+def load_range(folder, start, end):
+    """
+    Merge cached aggregates for every day from start to end (inclusive).
+
+    Returns:
+        (merged SessionAggregate, list of days with no cached data)
+    """
+    if isinstance(start, datetime):
+        start = start.date()
+    if isinstance(end, datetime):
+        end = end.date()
+
+    totals = SessionAggregate('sketch')
+    missing = []
+    day = start
+    while day <= end:
+        aggregate = load_day(folder, day.isoformat())
+        if aggregate is None:
+            missing.append(day)
+        else:
+            totals.merge(aggregate)
+        day += timedelta(days=1)
+    return totals, missing
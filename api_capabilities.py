@@ -0,0 +1,210 @@
+"""
+BeyondTrust API Capability Cache
+================================
+Probes BeyondTrust API endpoints concurrently and remembers what each one
+returned (status, content type, sample schema, timestamp) in a small JSON
+file next to the scripts.
+
+The explorer writes the map; the other tools read it at startup so they can
+skip endpoints that are known to return 404 instead of asking the appliance
+again.
+
+Usage:
+    from api_capabilities import CapabilityMap, probe_endpoints
+
+    capabilities = CapabilityMap.load()
+    results = probe_endpoints(api, ["/api/config/v1/user"], capabilities)
+    capabilities.save()
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlencode
+
+# Where the capability map is stored
+CAPABILITY_FILE = Path(__file__).parent / "api_capabilities.json"
+
+# Entries older than this are probed again
+CAPABILITY_MAX_AGE = timedelta(days=7)
+
+# Maximum number of requests in flight against the appliance
+DEFAULT_MAX_WORKERS = 8
+
+
+def capability_key(endpoint, params=None):
+    """Build the map key for an endpoint (query params are part of the key)"""
+    if params:
+        return f"{endpoint}?{urlencode(sorted(params.items()))}"
+    return endpoint
+
+
+def describe_schema(data, depth=2):
+    """Summarize the shape of a decoded JSON value (keys and value types)"""
+    if isinstance(data, dict):
+        if depth <= 0:
+            return 'object'
+        return {key: describe_schema(value, depth - 1) for key, value in list(data.items())[:20]}
+    if isinstance(data, list):
+        if not data:
+            return []
+        return [describe_schema(data[0], depth)]
+    if data is None:
+        return 'null'
+    return type(data).__name__
+
+
+def describe_response(response):
+    """Return a sample schema for a response body (JSON or XML)"""
+    content_type = response.headers.get("Content-Type", "")
+
+    if "json" in content_type:
+        try:
+            return describe_schema(response.json())
+        except ValueError:
+            return None
+
+    if "xml" in content_type:
+        import xml.etree.ElementTree as ET
+        try:
+            root = ET.fromstring(response.content)
+        except ET.ParseError:
+            return None
+        children = sorted({child.tag.split('}')[-1] for child in root})
+        return {'root': root.tag.split('}')[-1], 'children': children[:20]}
+
+    return None
+
+
+class CapabilityMap:
+    """Persistent map of endpoint -> last probe result"""
+
+    def __init__(self, path=CAPABILITY_FILE, entries=None):
+        self.path = Path(path)
+        self.entries = entries or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=CAPABILITY_FILE):
+        """Load the map from disk (an empty map if missing or unreadable)"""
+        path = Path(path)
+        entries = {}
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = {}
+        return cls(path, entries)
+
+    def save(self):
+        """Write the map back to disk"""
+        with self._lock:
+            data = dict(self.entries)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        tmp_path.replace(self.path)
+
+    def get(self, key):
+        """Return the stored entry for a key, or None"""
+        return self.entries.get(key)
+
+    def is_fresh(self, key):
+        """True if the key was probed recently enough to trust the result"""
+        entry = self.entries.get(key)
+        if not entry:
+            return False
+        try:
+            checked = datetime.fromisoformat(entry['checked_at'])
+        except (KeyError, ValueError):
+            return False
+        return datetime.now() - checked < CAPABILITY_MAX_AGE
+
+    def is_known_missing(self, key):
+        """True if the endpoint recently returned 404"""
+        entry = self.entries.get(key)
+        return bool(entry) and entry.get('status') == 404 and self.is_fresh(key)
+
+    def record(self, key, status, content_type=None, schema=None):
+        """Store the result of a probe"""
+        with self._lock:
+            self.entries[key] = {
+                'status': status,
+                'content_type': content_type,
+                'schema': schema,
+                'checked_at': datetime.now().isoformat(timespec='seconds'),
+            }
+
+
+def _probe_one(api, endpoint, params, handler=None):
+    """Probe a single endpoint; returns (status, response, error, schema, result)"""
+    import requests
+
+    try:
+        if handler is None:
+            response = api._make_request("GET", endpoint, params=params, timeout=30)
+            schema = describe_response(response) if response.status_code == 200 else None
+            return response.status_code, response, None, schema, None
+
+        # Let the handler consume the body as a stream inside the worker
+        response = api._make_request("GET", endpoint, params=params, timeout=30, stream=True)
+        schema, result = handler(response)
+        return response.status_code, response, None, schema, result
+    except requests.exceptions.HTTPError as e:
+        status = e.response.status_code if e.response is not None else None
+        return status, e.response, e, None, None
+    except Exception as e:
+        return None, None, e, None, None
+
+
+def probe_endpoints(api, probes, capabilities=None, max_workers=DEFAULT_MAX_WORKERS, refresh=False,
+                    handler=None):
+    """
+    Probe endpoints concurrently with a bounded thread pool.
+
+    Args:
+        api: BeyondTrustAPI instance
+        probes: List of endpoints, or (endpoint, params) tuples
+        capabilities: CapabilityMap to read from and record into
+        max_workers: Maximum concurrent requests
+        refresh: Probe even endpoints already known to be missing
+        handler: Optional callable(response) -> (schema, result) run in the
+                 worker on a streamed response instead of reading the body
+
+    Returns:
+        List of dicts (in the same order as probes) with keys
+        key, endpoint, params, status, response, error, result, skipped
+    """
+    jobs = []
+    for probe in probes:
+        endpoint, params = probe if isinstance(probe, tuple) else (probe, None)
+        jobs.append({'key': capability_key(endpoint, params), 'endpoint': endpoint, 'params': params,
+                     'status': None, 'response': None, 'error': None, 'result': None,
+                     'skipped': False})
+
+    pending = []
+    for job in jobs:
+        if capabilities is not None and not refresh and capabilities.is_known_missing(job['key']):
+            job['status'] = 404
+            job['skipped'] = True
+        else:
+            pending.append(job)
+
+    if pending:
+        # Acquire the token once up front so the workers don't race to refresh it
+        api._get_access_token()
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as pool:
+            futures = [pool.submit(_probe_one, api, job['endpoint'], job['params'], handler) for job in pending]
+            for job, future in zip(pending, futures):
+                job['status'], job['response'], job['error'], schema, job['result'] = future.result()
+
+                if capabilities is not None and job['status'] is not None:
+                    response = job['response']
+                    content_type = response.headers.get("Content-Type", "") if response is not None else None
+                    capabilities.record(job['key'], job['status'], content_type, schema)
+
+    return jobs
@@ -2,116 +2,221 @@
 Automatic Support Session Report Generator
 ==========================================
 This script automatically:
-1. Cleans CSV files by removing specified columns (A, B, H, I, J, L, N, O, S, T, U, V)
+1. Cleans CSV files down to the columns the report uses (CLEANED_COLUMNS,
+   matched by header name, so reordered or new export columns are handled)
 2. Generates a formatted HTML report with statistics and charts
 3. Opens the report in your browser
 
+If a report daemon (report_daemon.py, or the folder watcher) is running,
+the job is handed to it so this process doesn't have to load the report
+pipeline; otherwise the report is generated in-process. Pass --local to
+always generate in-process.
+
 Usage:
-    python auto_generate_report.py <path_to_csv_file>
+    python auto_generate_report.py <path_to_csv_file> [--local] [--workers N]
+    python auto_generate_report.py <folder|glob> [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+
+Given a folder, a glob or a date range, every matching export is read in
+one pass, sessions repeated across overlapping exports are counted once,
+and a single report covering the whole range is generated.
+
+Exports larger than parallel_csv.PARALLEL_THRESHOLD are parsed on all
+cores; --workers N sets the number of processes (1 = single process) and
+implies --local.
 
 Example:
     python auto_generate_report.py "C:\\Users\\YourName\\Downloads\\Support-sessions.csv"
 """
 
-import csv
 import sys
 import os
-from datetime import datetime
-from collections import defaultdict
 from pathlib import Path
 
-def clean_csv(input_file):
-    """Remove specified columns from CSV file"""
-    print(f"Step 1: Cleaning CSV file...")
+# The pipeline modules (csv, datetime, aggregate_cache, ...) are imported
+# inside the functions that use them, so handing a job to the report daemon
+# from main() stays cheap.
+
+# HTML template the report is rendered from
+TEMPLATE_FILE = Path(r'c:\Users\Zengar User\OneDrive - Zengar Institute Inc\Documents\Work\Templates\Daily-Support-Performance-Report-[DATE].html')
+
+# Template text cached by (path, mtime) for long-running processes
+_template_cache = {}
+
+# Buffer size for streaming the report to disk
+WRITE_BUFFER_SIZE = 1024 * 1024
 
-    # Columns to remove (0-indexed): A=0, B=1, H=7, I=8, J=9, L=11, N=13, O=14, S=18, T=19, U=20, V=21
-    columns_to_remove = {0, 1, 7, 8, 9, 11, 13, 14, 18, 19, 20, 21}
+# Columns clean_csv keeps (by header name, in this order); the export's
+# IDs, jump details, private IPs, extra reps and file counts are dropped
+CLEANED_COLUMNS = (
+    'Started', 'Ended', 'Duration', "Customer's Name", "Customer's Company", "Customer's Public IP",
+    "Representative's Name", "Representative's Time Involved", 'Public Site', 'Session Queue',
+)
 
-    with open(input_file, 'r', encoding='utf-8') as infile:
-        reader = csv.reader(infile)
-        rows = list(reader)
+def read_template(template_file):
+    """Read the HTML template (cached until the file changes)"""
+    template_file = str(template_file)
+    mtime = os.path.getmtime(template_file)
+    cached = _template_cache.get(template_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
 
-    # Filter out the specified columns
-    filtered_rows = []
-    for row in rows:
-        filtered_row = [col for idx, col in enumerate(row) if idx not in columns_to_remove]
-        filtered_rows.append(filtered_row)
+    with open(template_file, 'r', encoding='utf-8') as f:
+        html = f.read()
+    _template_cache[template_file] = (mtime, html)
+    return html
+
+def clean_csv(input_file, timer=None):
+    """
+    Keep only the CLEANED_COLUMNS of an exported CSV (matched by header name)
+
+    Args:
+        input_file: Path to the exported CSV
+        timer: Optional StageTimer that records the 'clean' stage
+    """
+    from aggregate_cache import REQUIRED_COLUMNS
+    from fast_csv import check_columns, project_columns, projection
+    from instrumentation import StageTimer
+
+    print(f"Step 1: Cleaning CSV file...")
+    timer = timer or StageTimer()
 
-    # Create cleaned filename
-    input_path = Path(input_file)
-    cleaned_file = input_path.parent / f"{input_path.stem}_cleaned.csv"
+    # Unreadable or wrong-format files fail here, before any row is copied
+    fmt = check_columns(input_file, REQUIRED_COLUMNS)
+    kept, _, missing = projection(fmt, CLEANED_COLUMNS)
 
-    # Write cleaned CSV
-    with open(cleaned_file, 'w', encoding='utf-8', newline='') as outfile:
-        writer = csv.writer(outfile)
-        writer.writerows(filtered_rows)
+    with timer.stage('clean', bytes_processed=os.path.getsize(input_file)) as stage:
+        # Create cleaned filename
+        input_path = Path(input_file)
+        cleaned_file = input_path.parent / f"{input_path.stem}_cleaned.csv"
 
-    print(f"   [OK] Removed columns A, B, H, I, J, L, N, O, S, T, U, V")
+        # Copy the kept columns by name (memory-mapped, see fast_csv.py)
+        rows = project_columns(input_file, cleaned_file, CLEANED_COLUMNS)
+
+        stage['rows'] = max(0, rows - 1)
+
+    print(f"   [OK] Kept {len(kept)} of {len(fmt.header)} columns")
+    if missing:
+        print(f"   [WARNING] Columns not in this export: {', '.join(missing)}")
     print(f"   [OK] Created: {cleaned_file}")
 
     return str(cleaned_file)
 
-def generate_report(csv_file):
-    """Generate HTML report from cleaned CSV file"""
-    print(f"\nStep 2: Analyzing data and generating report...")
+def read_sessions(csv_file, columns=None):
+    """
+    Read the session rows (those with a 'Started' value) from a CSV file
 
-    # Read CSV data
-    sessions = []
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row.get('Started'):
-                sessions.append(row)
+    Only the given columns are decoded (default: the columns the report
+    uses, aggregate_cache.SESSION_FIELDS).
+    """
+    from aggregate_cache import SESSION_FIELDS
+    from fast_csv import iter_columns
 
-    if not sessions:
-        print("   [ERROR] No valid session data found in CSV")
-        return None
+    return [row for row in iter_columns(csv_file, columns or SESSION_FIELDS) if row.get('Started')]
 
-    total_sessions = len(sessions)
-    print(f"   [OK] Found {total_sessions} sessions")
+def aggregate_sessions(sessions, distinct_mode='auto', cache_folder=None, keys=None):
+    """
+    Aggregate sessions in a single pass
 
-    # Representative stats
-    rep_counts = defaultdict(int)
-    rep_time = defaultdict(int)
+    Builds one SessionAggregate per day (stored in the aggregate cache when
+    cache_folder is given) and returns the merged totals. If a keys list is
+    given, each session's payload key (session_payload.session_key) is
+    appended to it in the same pass, so 'Started' is parsed only once.
+    """
+    from collections import defaultdict
+    from aggregate_cache import SessionAggregate, parse_started
+    from session_payload import session_key
+
+    day_aggregates = defaultdict(lambda: SessionAggregate(distinct_mode))
     for session in sessions:
-        rep_name = session.get("Representative's Name", "Unknown")
-        rep_counts[rep_name] += 1
-        time_str = session.get("Representative's Time Involved", "")
-        if time_str:
-            parts = time_str.split(':')
-            if len(parts) == 2:
-                hours = int(parts[0])
-                mins = int(parts[1])
-                rep_time[rep_name] += hours * 60 + mins
+        started = parse_started(session['Started'])
+        day_aggregates[started.date().isoformat()].add_session(session, started)
+        if keys is not None:
+            keys.append(session_key(session, started))
+
+    return merge_days(day_aggregates, distinct_mode, cache_folder)
+
+def merge_days(day_aggregates, distinct_mode='auto', cache_folder=None):
+    """Merge {day: SessionAggregate} into totals, caching each day if cache_folder is given"""
+    from aggregate_cache import SessionAggregate, save_day
+
+    totals = SessionAggregate(distinct_mode)
+    for day, aggregate in day_aggregates.items():
+        totals.merge(aggregate)
+        if cache_folder is not None:
+            save_day(cache_folder, day, aggregate)
+
+    return totals
+
+def render_report(sessions, totals, html, payload=None, payload_mode='auto', date_range=None):
+    """
+    Fill the report template with the aggregated statistics
+
+    Args:
+        payload: Columnar session payload for the filter (built from
+            sessions if not given, see session_payload.py)
+        payload_mode: 'auto', 'inline', 'gzip' or 'sidecar' (the caller
+            writes the sidecar file)
+        date_range: (first, last) dates the report covers; defaults to the
+            date of the first session
+
+    The large generated sections (rep bars, chart, geo cards, session data)
+    are not spliced into the template string; they are returned as separate
+    parts for write_report to stream.
+
+    Returns:
+        (parts, report_date_filename) - parts is a list of strings that
+        make up the report in order
+    """
+    from datetime import datetime
+    from session_payload import encode_sessions, scans_rows, session_script, SESSION_DATA_PLACEHOLDER
+
+    # Generated sections, keyed by the marker left in the template
+    sections = {}
+
+    def section(name, content):
+        marker = f'<!--@report-section:{name}@-->'
+        sections[marker] = content
+        return marker
+
+    total_sessions = totals.sessions
+
+    # Representative stats
+    rep_counts = totals.rep_counts
+    rep_time = totals.rep_time
 
     top_reps = sorted(rep_counts.items(), key=lambda x: x[1], reverse=True)[:5]
 
     # Hourly distribution
-    hourly_counts = defaultdict(int)
-    for session in sessions:
-        started = session.get('Started', '')
-        if started:
-            dt = datetime.strptime(started.rsplit(' ', 1)[0], '%Y-%m-%d %H:%M:%S')
-            hourly_counts[dt.hour] += 1
+    hourly_counts = totals.hourly_counts
 
-    # Extract date from first session
-    first_session_date = datetime.strptime(sessions[0]['Started'].rsplit(' ', 1)[0], '%Y-%m-%d %H:%M:%S')
-    report_date = first_session_date.strftime('%B %d, %Y')
-    report_date_filename = first_session_date.strftime('%b-%d-%Y')  # Format: Nov-07-2025
+    if date_range and date_range[0] != date_range[1]:
+        # Multi-day report: Nov-01-2025-to-Nov-28-2025
+        first_day, last_day = date_range
+        report_date = f"{first_day.strftime('%B %d, %Y')} - {last_day.strftime('%B %d, %Y')}"
+        report_date_filename = f"{first_day.strftime('%b-%d-%Y')}-to-{last_day.strftime('%b-%d-%Y')}"
+    else:
+        # Extract date from first session
+        if date_range:
+            first_session_date = date_range[0]
+        else:
+            first_session_date = datetime.strptime(sessions[0]['Started'].rsplit(' ', 1)[0], '%Y-%m-%d %H:%M:%S')
+        report_date = first_session_date.strftime('%B %d, %Y')
+        report_date_filename = first_session_date.strftime('%b-%d-%Y')  # Format: Nov-07-2025
 
     # Time block aggregation for staffing table
-    time_blocks = {
-        '07:00-08:00': hourly_counts[7],
-        '08:00-09:00': hourly_counts[8],
-        '09:00-10:00': hourly_counts[9],
-        '10:00-11:00': hourly_counts[10],
-        '11:00-12:00': hourly_counts[11],
-        '12:00-13:00': hourly_counts[12],
-        '13:00-14:00': hourly_counts[13],
-        '14:00-15:00': hourly_counts[14],
-        '15:00-17:00': hourly_counts[15] + hourly_counts[16],
-        '17:00-19:00': hourly_counts[17] + hourly_counts[18]
+    block_hours = {
+        '07:00-08:00': (7,),
+        '08:00-09:00': (8,),
+        '09:00-10:00': (9,),
+        '10:00-11:00': (10,),
+        '11:00-12:00': (11,),
+        '12:00-13:00': (12,),
+        '13:00-14:00': (13,),
+        '14:00-15:00': (14,),
+        '15:00-17:00': (15, 16),
+        '17:00-19:00': (17, 18)
     }
+    time_blocks = {block: sum(hourly_counts[hour] for hour in hours) for block, hours in block_hours.items()}
 
     # Find busiest hour
     if hourly_counts:
@@ -145,17 +250,6 @@ def generate_report(csv_file):
         else:
             quiet_blocks.append(block)
 
-    # Find HTML template
-    template_file = Path(r'c:\Users\Zengar User\OneDrive - Zengar Institute Inc\Documents\Work\Templates\Daily-Support-Performance-Report-[DATE].html')
-
-    if not os.path.exists(template_file):
-        print(f"   [ERROR] Template file not found at {template_file}")
-        return None
-
-    # Read HTML template
-    with open(template_file, 'r', encoding='utf-8') as f:
-        html = f.read()
-
     # Replace placeholders
     html = html.replace('[DATE]', report_date)
     html = html.replace('Daily-Support-Performance-Report-[DATE].html', f'Daily-Support-Performance-Report-{report_date_filename}.html')
@@ -206,6 +300,11 @@ def generate_report(csv_file):
                 staff = '1-2 agents'
                 note = 'Good for breaks/training'
 
+            # Handle-time spread for the block (merged from the hourly sketches)
+            block_handle_time = totals.handle_time_for(block_hours[block])
+            if block_handle_time.count:
+                note += f' · {_percentiles_text(block_handle_time, (50, 90))} handle'
+
             old_row = f'<tr data-time="{block}">\n            <td>{block}</td>\n            <td class="session-count">—</td>\n            <td><span class="badge volume-badge">—</span></td>\n            <td class="staff-rec">—</td>\n            <td class="notes-cell">Awaiting data</td>'
             new_row = f'<tr data-time="{block}">\n            <td>{block}</td>\n            <td class="session-count">{count}</td>\n            <td><span class="badge {badge_class}">{badge}</span></td>\n            <td class="staff-rec">{staff}</td>\n            <td class="notes-cell">{note}</td>'
             html = html.replace(old_row, new_row)
@@ -218,15 +317,17 @@ def generate_report(csv_file):
         mins = rep_time[rep] % 60
         percent = (count / max_sessions) * 100
         color = '#ef4444' if count == max_sessions else '#2563eb'
+        rep_handle_time = totals.rep_handle_time.get(rep)
+        handle_time_text = f' · handle time {_percentiles_text(rep_handle_time)}' if rep_handle_time else ''
         rep_bars_html += f'''
           <div class="row">
             <div style="font-weight:600">{rep}</div>
             <div class="bar"><span style="width:{percent}%;background:{color}"></span></div>
             <div style="text-align:right">{count}</div>
           </div>
-          <div class="small" style="margin-bottom:8px">Time involved: {hours}h {mins}m</div>'''
+          <div class="small" style="margin-bottom:8px">Time involved: {hours}h {mins}m{handle_time_text}</div>'''
 
-    html = html.replace('<div class="empty">No representative session data provided.</div>', rep_bars_html)
+    html = html.replace('<div class="empty">No representative session data provided.</div>', section('rep_bars', rep_bars_html))
 
     # Chart data - create SVG bars
     chart_svg = ''
@@ -251,63 +352,42 @@ def generate_report(csv_file):
 
             chart_svg += f'<rect x="{x_positions[i]-15}" y="{y}" width="28" height="{height}" fill="{color}" rx="3"/>'
 
-    html = html.replace('<text x="294" y="150" text-anchor="middle" class="empty">No hourly volume data</text>', chart_svg)
+    html = html.replace('<text x="294" y="150" text-anchor="middle" class="empty">No hourly volume data</text>', section('chart', chart_svg))
 
     # Update daily summary
     if len(top_reps) >= 3:
         summary_text = f'The support team completed <span class="k">{total_sessions} sessions</span> in total. Top performers were {top_reps[0][0]} with {top_reps[0][1]} sessions, {top_reps[1][0]} with {top_reps[1][1]} sessions, and {top_reps[2][0]} with {top_reps[2][1]} sessions.'
     else:
         summary_text = f'The support team completed <span class="k">{total_sessions} sessions</span> in total.'
+    if totals.handle_time.count:
+        summary_text += f' Handle time per session: {_percentiles_text(totals.handle_time)}.'
     html = html.replace('The support team completed <span class="k">—</span> sessions in total. Top performers and busiest hours will appear once data is available.', summary_text)
 
-    # Inject session data for filtering
-    import json
-    session_data = []
-    for session in sessions:
-        started = session.get('Started', '')
-        if started:
-            dt = datetime.strptime(started.rsplit(' ', 1)[0], '%Y-%m-%d %H:%M:%S')
-            session_data.append({
-                'rep': session.get("Representative's Name", "Unknown"),
-                'hour': dt.hour,
-                'started': started
-            })
-
-    # Inject data and populate dropdown
-    reps_list = sorted(list(set([s['rep'] for s in session_data])))
-    reps_options = '\n'.join([f'          <option value="{rep}">{rep}</option>' for rep in reps_list])
+    # Inject session data for filtering (columnar payload, see session_payload.py)
+    if payload is None:
+        payload = encode_sessions(sessions)
 
-    html = html.replace('          <!-- Representative options will be populated by JavaScript -->',
-                       reps_options)
+    # Populate dropdown from the rep dictionary
+    reps_options = '\n'.join([f'          <option value="{rep}">{rep}</option>' for rep in payload['reps']])
 
-    session_data_json = json.dumps(session_data)
-    html = html.replace('let allSessionData = []; // Will be populated by the Python script',
-                       f'let allSessionData = {session_data_json};')
+    html = html.replace('          <!-- Representative options will be populated by JavaScript -->',
+                       section('rep_options', reps_options))
 
-    # Geographic distribution analysis
-    ip_addresses = []
-    for session in sessions:
-        ip_str = session.get("Customer's Public IP", "")
-        if ip_str and ':' in ip_str:
-            ip = ip_str.split(':')[0]  # Remove port
-            ip_addresses.append(ip)
+    # Only rebuild the row list if the template's filter still scans it
+    row_compat = scans_rows(html)
+    html = html.replace(SESSION_DATA_PLACEHOLDER,
+                       section('session_data', session_script(
+                           payload, payload_mode,
+                           report_file=f'Daily-Support-Performance-Report-{report_date_filename}.html',
+                           row_compat=row_compat)))
 
-    unique_ips = len(set(ip_addresses))
+    # Geographic distribution analysis (regions from the offline range table, see ip_regions.py)
+    unique_ips = totals.unique_ips.count()
+    ip_error = totals.unique_ips.error_bound
 
-    # Simple region classification based on IP ranges (approximate)
     regions = {'North America': 0, 'Europe': 0, 'Asia Pacific': 0, 'Other': 0}
-
-    for ip in ip_addresses:
-        first_octet = int(ip.split('.')[0])
-        # Very simplified regional classification
-        if first_octet in range(3, 77) or first_octet in range(140, 200):  # NA ranges (simplified)
-            regions['North America'] += 1
-        elif first_octet in range(77, 96) or first_octet in range(130, 140):  # EU ranges (simplified)
-            regions['Europe'] += 1
-        elif first_octet in range(1, 3) or first_octet in range(118, 130):  # APAC ranges (simplified)
-            regions['Asia Pacific'] += 1
-        else:
-            regions['Other'] += 1
+    for region, count in totals.regions.items():
+        regions[region] = regions.get(region, 0) + count
 
     total_geo_sessions = sum(regions.values())
     region_count = sum(1 for count in regions.values() if count > 0)
@@ -317,7 +397,9 @@ def generate_report(csv_file):
     region_configs = {
         'North America': {'emoji': '🇺🇸 🇨🇦', 'color': 'var(--indigo)', 'bg': '#eef2ff'},
         'Europe': {'emoji': '🇪🇺', 'color': 'var(--blue)', 'bg': '#dbeafe'},
-        'Asia Pacific': {'emoji': '🌏', 'color': 'var(--amber)', 'bg': '#fef3c7'}
+        'Asia Pacific': {'emoji': '🌏', 'color': 'var(--amber)', 'bg': '#fef3c7'},
+        'Latin America': {'emoji': '🌎', 'color': '#16a34a', 'bg': '#dcfce7'},
+        'Africa': {'emoji': '🌍', 'color': '#dc2626', 'bg': '#fee2e2'}
     }
 
     for region, count in regions.items():
@@ -340,25 +422,284 @@ def generate_report(csv_file):
           </div>'''
 
     html = html.replace('<div id="geoRegionsLeft">\n          <!-- North America, Europe, Asia Pacific cards will be populated here -->\n        </div>',
-                       f'<div id="geoRegionsLeft">{geo_cards_html}\n        </div>')
+                       f'<div id="geoRegionsLeft">{section("geo_cards", geo_cards_html)}\n        </div>')
 
     # Update geographic summary stats
-    html = html.replace('<span class="k" id="uniqueIPs">—</span>', f'<span class="k" id="uniqueIPs">{unique_ips}</span>')
+    unique_ips_text = f'~{unique_ips}' if ip_error else f'{unique_ips}'
+    html = html.replace('<span class="k" id="uniqueIPs">—</span>', f'<span class="k" id="uniqueIPs">{unique_ips_text}</span>')
     html = html.replace('<span id="totalSessionsGeo">—</span>', f'<span id="totalSessionsGeo">{total_geo_sessions}</span>')
     html = html.replace('<span id="regionCount">—</span>', f'<span id="regionCount">{region_count}</span>')
 
     # Diversity text
     uniqueness_rate = (unique_ips / total_geo_sessions * 100) if total_geo_sessions > 0 else 0
-    diversity_text = f'{unique_ips} unique IPs from {total_geo_sessions} sessions ({uniqueness_rate:.1f}% unique rate) demonstrates {"excellent" if uniqueness_rate > 70 else "good" if uniqueness_rate > 50 else "moderate"} customer base diversity'
+    diversity_text = f'{unique_ips_text} unique IPs (±{ip_error * 100:.1f}%)' if ip_error else f'{unique_ips} unique IPs'
+    diversity_text += f' from {total_geo_sessions} sessions ({uniqueness_rate:.1f}% unique rate) demonstrates {"excellent" if uniqueness_rate > 70 else "good" if uniqueness_rate > 50 else "moderate"} customer base diversity'
     html = html.replace('<span id="diversityText">Geographic diversity analysis pending</span>',
                        f'<span id="diversityText">{diversity_text}</span>')
 
+    return _split_sections(html, sections), report_date_filename
+
+def _minutes_text(minutes):
+    """'45m' or '1h 25m'"""
+    return f'{minutes // 60}h {minutes % 60}m' if minutes >= 60 else f'{minutes}m'
+
+
+def _percentiles_text(sketch, percentiles=(50, 90, 99)):
+    """'p50 12m, p90 44m, p99 2h 5m' from a handle-time KllSketch (~ once approximate)"""
+    approx = '' if sketch.is_exact else '~'
+    return ', '.join(f'p{p} {approx}{_minutes_text(value)}' for p, value in sketch.percentiles(percentiles).items())
+
+
+def _split_sections(html, sections):
+    """Split the filled template at the section markers into ordered parts"""
+    positions = sorted((html.find(marker), marker) for marker in sections if marker in html)
+
+    parts = []
+    start = 0
+    for position, marker in positions:
+        parts.append(html[start:position])
+        parts.append(sections[marker])
+        start = position + len(marker)
+    parts.append(html[start:])
+    return parts
+
+def write_report(parts, output_file):
+    """
+    Stream the rendered report (a string or a list of parts) to disk.
+
+    The report is written to a temp file next to the target and renamed
+    over it, so the watcher and the browser never see a partial file.
+    """
+    if isinstance(parts, str):
+        parts = [parts]
+
+    output_file = Path(output_file)
+    tmp_file = output_file.with_name(output_file.name + '.tmp')
+    try:
+        with open(tmp_file, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            for part in parts:
+                f.write(part)
+        os.replace(tmp_file, output_file)
+    except BaseException:
+        if tmp_file.exists():
+            tmp_file.unlink()
+        raise
+
+def generate_report(csv_file, distinct_mode='auto', template_file=None, timer=None, payload_mode='auto',
+                    workers=None, executor=None):
+    """
+    Generate HTML report from cleaned CSV file
+
+    Args:
+        csv_file: Path to the cleaned CSV
+        distinct_mode: How unique IPs/customers are counted - 'exact' (full
+            set), 'sketch' (HyperLogLog estimate) or 'auto' (exact for small
+            inputs, sketch above distinct_sketch.EXACT_THRESHOLD)
+        template_file: HTML template (defaults to TEMPLATE_FILE)
+        timer: Optional StageTimer that records the parse, aggregate,
+            render and write stages
+        payload_mode: How the session data for the filter is embedded -
+            'inline', 'gzip' (gzip+base64), 'sidecar' (<report>.sessions.js),
+            'cube' (rep x hour counts only) or 'auto' (inline, gzip for
+            large reports)
+        workers: Processes used to parse the CSV - None (all cores for
+            exports over parallel_csv.PARALLEL_THRESHOLD, otherwise
+            in-process), 1 (in-process) or a pool size
+        executor: A long-lived process pool to parse large exports in
+            (e.g. the folder watcher's) instead of starting one per report
+    """
+    from aggregate_cache import REQUIRED_COLUMNS
+    from fast_csv import check_columns
+    from instrumentation import StageTimer
+    from parallel_csv import should_parallelize, parse_parallel
+    from session_payload import encode_keys
+
+    print(f"\nStep 2: Analyzing data and generating report...")
+    timer = timer or StageTimer()
+    check_columns(csv_file, REQUIRED_COLUMNS)
+
+    result = None
+    if should_parallelize(csv_file, workers):
+        # Parse + per-day aggregation in a process pool; partials merged below
+        with timer.stage('parse', bytes_processed=os.path.getsize(csv_file)) as stage:
+            result = parse_parallel(csv_file, distinct_mode, workers, executor=executor)
+            stage['rows'] = result['rows']
+
+        # Only the first session is needed (for the report date)
+        sessions = [result['first']] if result['first'] else []
+        total_sessions = result['rows']
+    else:
+        # Read CSV data
+        with timer.stage('parse', bytes_processed=os.path.getsize(csv_file)) as stage:
+            sessions = read_sessions(csv_file)
+            stage['rows'] = len(sessions)
+        total_sessions = len(sessions)
+
+    if not sessions:
+        print("   [ERROR] No valid session data found in CSV")
+        return None
+
+    print(f"   [OK] Found {total_sessions} sessions")
+
+    # Single pass: per-day aggregates (cached for monthly views) merged into totals
+    keys = result['keys'] if result is not None else []
+    with timer.stage('aggregate', rows=total_sessions):
+        if result is not None:
+            totals = merge_days(result['days'], distinct_mode, cache_folder=Path(csv_file).parent)
+        else:
+            # Payload keys are collected in the same pass (one 'Started' parse per row)
+            totals = aggregate_sessions(sessions, distinct_mode, cache_folder=Path(csv_file).parent, keys=keys)
+
+    # Session payload for the filter (timed with the rest of the render stage)
+    with timer.stage('render'):
+        payload = encode_keys(keys)
+
+    return _render_and_write(sessions, totals, payload, Path(csv_file).parent,
+                             template_file, payload_mode, timer, total_sessions)
+
+def find_input_files(spec=None):
+    """
+    Expand an input argument into CSV exports
+
+    spec may be a file, a directory (its Support-sessions*.csv files), or a
+    glob pattern. Cleaned copies (*_cleaned.csv) are skipped. Defaults to
+    the Downloads folder.
+    """
+    import glob
+
+    if spec is None:
+        spec = str(Path.home() / "Downloads")
+
+    from csv_discovery import EXPORT_PREFIX, scan_csv_files
+
+    path = Path(spec)
+    if path.is_dir():
+        files = [entry.path for entry in scan_csv_files(path, EXPORT_PREFIX)]
+    elif path.is_file():
+        files = [path]
+    else:
+        files = (Path(match) for match in glob.glob(spec))
+
+    return sorted(f for f in files if f.is_file() and not f.name.endswith("_cleaned.csv"))
+
+def session_identity(row):
+    """
+    Key used to drop sessions repeated across overlapping exports
+
+    The LSID (Session ID) plus sequence number when the export has it,
+    otherwise the start time and representative.
+    """
+    lsid = row.get('Session ID')
+    if lsid:
+        return ('lsid', lsid, row.get('Session Sequence Number') or '')
+    return ('started', row['Started'], row.get("Representative's Name"))
+
+def generate_range_report(csv_files, start_date=None, end_date=None, distinct_mode='auto',
+                          template_file=None, timer=None, payload_mode='auto', output_dir=None):
+    """
+    Generate one report from several exports
+
+    All files are streamed through a single aggregation pass; sessions that
+    appear in more than one export are counted once (see session_identity),
+    and sessions outside start_date..end_date (dates, inclusive) are
+    skipped. The raw exports are read directly - no cleaned copies are
+    written.
+
+    Returns:
+        Path of the report, or None if no sessions matched
+    """
+    from datetime import date
+    from aggregate_cache import REQUIRED_COLUMNS, SESSION_FIELDS, parse_started
+    from fast_csv import check_columns, iter_columns
+    from instrumentation import StageTimer
+    from parallel_csv import accumulate, empty_result
+    from session_payload import encode_keys
+
+    print(f"\nAnalyzing {len(csv_files)} file(s) and generating report...")
+    timer = timer or StageTimer()
+
+    # Check every file's format before parsing any of them
+    for csv_file in csv_files:
+        check_columns(csv_file, REQUIRED_COLUMNS)
+    columns = SESSION_FIELDS + ('Session ID', 'Session Sequence Number')
+
+    seen = set()
+    duplicates = 0
+
+    def matching_rows(csv_file):
+        nonlocal duplicates
+        for row in iter_columns(csv_file, columns):
+            if not row.get('Started'):
+                continue
+            if start_date or end_date:
+                day = parse_started(row['Started']).date()
+                if (start_date and day < start_date) or (end_date and day > end_date):
+                    continue
+            identity = session_identity(row)
+            if identity in seen:
+                duplicates += 1
+                continue
+            seen.add(identity)
+            yield row
+
+    # Parse and aggregate in one streaming pass over every file
+    result = empty_result()
+    with timer.stage('parse', bytes_processed=sum(os.path.getsize(f) for f in csv_files)) as stage:
+        for csv_file in csv_files:
+            accumulate(result, matching_rows(csv_file), distinct_mode)
+            print(f"   [OK] {Path(csv_file).name}")
+        stage['rows'] = result['rows']
+
+    if not result['rows']:
+        print("   [ERROR] No valid session data found in the selected files")
+        return None
+
+    print(f"   [OK] Found {result['rows']} sessions ({duplicates} duplicates skipped)")
+
+    output_dir = Path(output_dir or Path(csv_files[0]).parent)
+    with timer.stage('aggregate', rows=result['rows']):
+        totals = merge_days(result['days'], distinct_mode, cache_folder=output_dir)
+
+    with timer.stage('render'):
+        payload = encode_keys(result['keys'])
+
+    days = sorted(result['days'])
+    date_range = (start_date or date.fromisoformat(days[0]), end_date or date.fromisoformat(days[-1]))
+    return _render_and_write([result['first']], totals, payload, output_dir, template_file,
+                             payload_mode, timer, result['rows'], date_range)
+
+def _render_and_write(sessions, totals, payload, output_dir, template_file=None, payload_mode='auto',
+                      timer=None, total_sessions=None, date_range=None):
+    """Render the report into output_dir; returns the report path (None if the template is missing)"""
+    from instrumentation import StageTimer
+    from session_payload import resolve_mode, scans_rows, write_sidecar
+
+    timer = timer or StageTimer()
+
+    # Find HTML template
+    template_file = Path(template_file or TEMPLATE_FILE)
+
+    if not os.path.exists(template_file):
+        print(f"   [ERROR] Template file not found at {template_file}")
+        return None
+
+    with timer.stage('render', rows=total_sessions):
+        # Read HTML template
+        html = read_template(template_file)
+
+        payload_mode = resolve_mode(payload, payload_mode, scans_rows(html))
+        parts, report_date_filename = render_report(sessions, totals, html, payload, payload_mode, date_range)
+
     # Write output to Downloads folder
-    csv_path = Path(csv_file)
-    output_file = csv_path.parent / f'Daily-Support-Performance-Report-{report_date_filename}.html'
+    output_file = Path(output_dir) / f'Daily-Support-Performance-Report-{report_date_filename}.html'
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    with timer.stage('write') as stage:
+        stage['bytes'] = 0
+        if payload_mode == 'sidecar':
+            # Sidecar first, so the report never points at a missing file
+            stage['bytes'] += os.path.getsize(write_sidecar(output_file, payload))
+        write_report(parts, output_file)
+        stage['bytes'] += os.path.getsize(output_file)
 
     print(f"   [OK] Report generated successfully!")
     print(f"   [OK] Saved to: {output_file}")
@@ -370,18 +711,93 @@ def main():
     print("Support Session Report Auto-Generator")
     print("=" * 60)
 
-    if len(sys.argv) < 2:
-        print("\nUsage: python auto_generate_report.py <csv_file>")
+    args = sys.argv[1:]
+    local = '--local' in args
+    args = [arg for arg in args if arg != '--local']
+
+    # Parse processes: --workers N (default: automatic, see parallel_csv.py)
+    workers = None
+    if '--workers' in args:
+        i = args.index('--workers')
+        try:
+            workers = int(args[i + 1])
+        except (IndexError, ValueError):
+            workers = 0
+        if workers < 1:
+            print("\n[ERROR] --workers needs a number of processes (1 or more)")
+            sys.exit(1)
+        del args[i:i + 2]
+        local = True
+
+    # Date range: --from YYYY-MM-DD --to YYYY-MM-DD
+    from datetime import date
+    date_range = {}
+    for flag in ('--from', '--to'):
+        if flag in args:
+            i = args.index(flag)
+            try:
+                date_range[flag] = date.fromisoformat(args[i + 1])
+            except (IndexError, ValueError):
+                print(f"\n[ERROR] {flag} needs a date (YYYY-MM-DD)")
+                sys.exit(1)
+            del args[i:i + 2]
+
+    if not args and not date_range:
+        print("\nUsage: python auto_generate_report.py <csv_file|folder|glob> [--from YYYY-MM-DD] [--to YYYY-MM-DD]")
+        print("                                [--local] [--workers N]")
         print("\nExample:")
         print('  python auto_generate_report.py "C:\\Users\\...\\Support-sessions.csv"')
+        print('  python auto_generate_report.py "C:\\Users\\...\\Downloads" --from 2025-11-01 --to 2025-11-30')
+        sys.exit(1)
+
+    # A mistyped file name is an error, not a folder/glob to search
+    if args and args[0].lower().endswith('.csv') and not os.path.exists(args[0]) \
+            and not any(char in args[0] for char in '*?['):
+        print(f"\n[ERROR] File not found: {args[0]}")
         sys.exit(1)
 
-    input_file = sys.argv[1]
+    # Several exports (folder, glob or date range): one combined report
+    if date_range or not os.path.isfile(args[0]):
+        csv_files = find_input_files(args[0] if args else None)
+        if not csv_files:
+            print(f"\n[ERROR] No CSV files found: {args[0] if args else Path.home() / 'Downloads'}")
+            sys.exit(1)
+
+        print(f"\nProcessing {len(csv_files)} file(s)\n")
+        report_file = generate_range_report(csv_files, date_range.get('--from'), date_range.get('--to'))
+        if not report_file:
+            print("\n[ERROR] Failed to generate report")
+            sys.exit(1)
+
+        print("\n" + "=" * 60)
+        print("[SUCCESS] Report generated and ready to view!")
+        print("=" * 60)
+        print(f"\nReport: {report_file}")
+        import webbrowser
+        webbrowser.open(f'file:///{report_file}')
+        return
+
+    input_file = args[0]
 
     if not os.path.exists(input_file):
         print(f"\n[ERROR] File not found: {input_file}")
         sys.exit(1)
 
+    # Hand off to a warm report daemon if one is running
+    if not local:
+        from report_daemon import submit_job
+        result = submit_job(input_file)
+        if result is not None:
+            print(f"\nProcessing: {os.path.basename(input_file)} (via {result.get('host', 'report daemon')})\n")
+            if result.get('status') == 'success':
+                print("=" * 60)
+                print("[SUCCESS] Report generated and ready to view!")
+                print("=" * 60)
+                print(f"\nReport: {result['report_file']}")
+                return
+            print(f"[ERROR] {result.get('error', 'Failed to generate report')}")
+            sys.exit(1)
+
     print(f"\nProcessing: {os.path.basename(input_file)}\n")
 
     try:
@@ -389,7 +805,7 @@ def main():
         cleaned_file = clean_csv(input_file)
 
         # Step 2: Generate Report
-        report_file = generate_report(cleaned_file)
+        report_file = generate_report(cleaned_file, workers=workers)
 
         if report_file:
             print("\n" + "=" * 60)
@@ -0,0 +1,218 @@
+"""
+Report Pipeline Benchmarks
+==========================
+Times each stage of the report pipeline (clean, parse, aggregate, render,
+write) on synthetic Support-sessions CSVs and records peak RSS.
+
+Each size runs in a fresh Python process so peak memory is measured per
+size. Results can be saved as a baseline and later runs compared against
+it; a stage that is more than --tolerance slower than the baseline is
+reported as a regression and the run exits with status 1.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 1k,100k,1m] [--save-baseline]
+                                        [--tolerance 0.25] [--baseline FILE]
+"""
+
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from synthetic_sessions import generate_sessions_csv, DEFAULT_SEED
+
+DATA_DIR = BENCH_DIR / "data"
+BASELINE_FILE = BENCH_DIR / "baseline.json"
+TEMPLATE_FILE = BENCH_DIR / "bench_template.html"
+
+SIZES = {'1k': 1000, '100k': 100000, '1m': 1000000}
+DEFAULT_SIZES = ['1k', '100k', '1m']
+
+STAGES = ['clean', 'parse', 'aggregate', 'render', 'write']
+
+# Allowed slowdown vs. baseline before a stage counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# Stages faster than this (seconds) are too noisy to compare
+NOISE_FLOOR = 0.05
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS reports bytes
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except (ImportError, AttributeError):
+        return None
+
+
+def dataset_path(size):
+    """Generate (once) and return the synthetic CSV for a size label"""
+    DATA_DIR.mkdir(exist_ok=True)
+    path = DATA_DIR / f"Support-sessions-bench-{size}-seed{DEFAULT_SEED}.csv"
+    if not path.exists():
+        print(f"[GENERATE] {SIZES[size]:,} rows -> {path.name}")
+        generate_sessions_csv(path, SIZES[size])
+    return path
+
+
+def run_stages(csv_file):
+    """Run the pipeline once, timing each stage (runs inside the worker process)"""
+    from auto_generate_report import clean_csv, read_sessions, aggregate_sessions, render_report, write_report
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as work_dir, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        cleaned_file = clean_csv(csv_file)
+        timings['clean'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sessions = read_sessions(cleaned_file)
+        timings['parse'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        totals = aggregate_sessions(sessions, cache_folder=work_dir)
+        timings['aggregate'] = time.perf_counter() - start
+
+        with open(TEMPLATE_FILE, 'r', encoding='utf-8') as f:
+            template_html = f.read()
+
+        start = time.perf_counter()
+        parts, _ = render_report(sessions, totals, template_html)
+        timings['render'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        output_file = Path(work_dir) / "report.html"
+        write_report(parts, output_file)
+        timings['write'] = time.perf_counter() - start
+
+        report_bytes = output_file.stat().st_size
+
+    return {
+        'rows': len(sessions),
+        'input_bytes': Path(csv_file).stat().st_size,
+        'report_bytes': report_bytes,
+        'timings': timings,
+        'total': sum(timings.values()),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_size(size):
+    """Benchmark one size in a fresh interpreter"""
+    csv_file = dataset_path(size)
+    result = subprocess.run(
+        [sys.executable, __file__, '--worker', str(csv_file)],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Benchmark worker failed for {size}:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages"""
+    regressions = []
+    for size, result in results.items():
+        base = baseline.get(size)
+        if not base:
+            continue
+        for stage in STAGES:
+            now = result['timings'].get(stage)
+            before = base['timings'].get(stage)
+            if now is None or before is None or max(now, before) < NOISE_FLOOR:
+                continue
+            if now > before * (1 + tolerance):
+                regressions.append(f"{size} {stage}: {before:.3f}s -> {now:.3f}s (+{(now / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_results(results, baseline):
+    print()
+    print(f"{'size':>6} {'rows':>9} " + " ".join(f"{stage:>10}" for stage in STAGES) + f" {'total':>9} {'peak MB':>8}")
+    for size, result in results.items():
+        line = f"{size:>6} {result['rows']:>9,} "
+        line += " ".join(f"{result['timings'][stage]:>9.3f}s" for stage in STAGES)
+        rss = result['peak_rss_mb']
+        line += f" {result['total']:>8.3f}s {rss:>8.1f}" if rss is not None else f" {result['total']:>8.3f}s {'n/a':>8}"
+        print(line)
+
+        base = baseline.get(size)
+        if base:
+            change = (result['total'] / base['total'] - 1) * 100 if base['total'] else 0
+            print(f"{'':>6} {'baseline':>9} " + " ".join(f"{base['timings'].get(stage, 0):>9.3f}s" for stage in STAGES)
+                  + f" {base['total']:>8.3f}s ({change:+.0f}%)")
+
+
+def main():
+    args = sys.argv[1:]
+
+    if args and args[0] == '--worker':
+        print(json.dumps(run_stages(args[1])))
+        return
+
+    sizes = DEFAULT_SIZES
+    tolerance = DEFAULT_TOLERANCE
+    baseline_file = BASELINE_FILE
+
+    if "--sizes" in args:
+        sizes = args[args.index("--sizes") + 1].lower().split(',')
+    if "--tolerance" in args:
+        tolerance = float(args[args.index("--tolerance") + 1])
+    if "--baseline" in args:
+        baseline_file = Path(args[args.index("--baseline") + 1])
+
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        print(f"[ERROR] Unknown size(s): {', '.join(unknown)} (choose from {', '.join(SIZES)})")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("Report Pipeline Benchmarks")
+    print("=" * 60)
+
+    results = {}
+    for size in sizes:
+        print(f"[RUN] {size}...")
+        results[size] = run_size(size)
+
+    baseline = {}
+    if baseline_file.exists():
+        with open(baseline_file, 'r') as f:
+            baseline = json.load(f)
+
+    print_results(results, baseline)
+
+    if "--save-baseline" in args:
+        baseline.update(results)
+        with open(baseline_file, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\n[SAVED] Baseline: {baseline_file}")
+        return
+
+    regressions = compare(results, baseline, tolerance)
+    if regressions:
+        print(f"\n[REGRESSION] {len(regressions)} stage(s) slower than baseline by more than {tolerance * 100:.0f}%:")
+        for message in regressions:
+            print(f"  - {message}")
+        sys.exit(1)
+    elif baseline:
+        print("\n[OK] No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
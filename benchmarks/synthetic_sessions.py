@@ -0,0 +1,142 @@
+"""
+Synthetic Support-Sessions CSV Generator
+========================================
+Writes seeded, realistic BeyondTrust Support-sessions exports for
+benchmarking: the real 22-column layout, 'Started' timestamps with a
+timezone, customer public IPs with ports (IPv4 and some IPv6), and
+representative time involved as H:MM.
+
+The same seed, row count and start date always produce the same file.
+
+Usage:
+    python benchmarks/synthetic_sessions.py <output.csv> [rows] [--days N] [--seed N]
+"""
+
+import csv
+import random
+import sys
+from datetime import datetime, timedelta
+
+# Column layout of a BeyondTrust Support-sessions export (A..V)
+SESSION_COLUMNS = [
+    "Session ID",                        # A
+    "Session Sequence Number",           # B
+    "Started",                           # C
+    "Ended",                             # D
+    "Duration",                          # E
+    "Customer's Name",                   # F
+    "Customer's Company",                # G
+    "Jumpoint",                          # H
+    "Jump Group",                        # I
+    "External Key",                      # J
+    "Customer's Public IP",              # K
+    "Customer's Private IP",             # L
+    "Representative's Name",             # M
+    "Representative's Public IP",        # N
+    "Representative's Private IP",       # O
+    "Representative's Time Involved",    # P
+    "Public Site",                       # Q
+    "Session Queue",                     # R
+    "Additional Representatives",        # S
+    "# Files Transferred",               # T
+    "# Files Renamed",                   # U
+    "# Files Deleted",                   # V
+]
+
+REPRESENTATIVES = [
+    "Alex Morgan", "Jordan Lee", "Sam Patel", "Taylor Chen", "Casey Nguyen",
+    "Riley Brooks", "Jamie Ortiz", "Avery Singh", "Drew Kim", "Morgan Davis",
+]
+
+QUEUES = ["General", "Clinical Support", "Billing", "Hardware"]
+
+# Weight per hour of day (07:00-19:00), shaped like a real support day
+HOUR_WEIGHTS = {7: 2, 8: 6, 9: 10, 10: 12, 11: 11, 12: 7, 13: 9, 14: 10, 15: 8, 16: 6, 17: 3, 18: 2}
+
+DEFAULT_SEED = 42
+DEFAULT_START = datetime(2025, 11, 3)
+
+
+def _public_ip(rng):
+    """Customer public IP with port (about 1 in 10 is IPv6)"""
+    if rng.random() < 0.1:
+        return f"[2a00:{rng.randrange(0x10000):x}::{rng.randrange(0x10000):x}]:{rng.randint(1024, 65535)}"
+    first = rng.choice([24, 50, 68, 73, 76, 81, 86, 99, 142, 174, 184, 203, 212])
+    return f"{first}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}:{rng.randint(1024, 65535)}"
+
+
+def iter_session_rows(rows, seed=DEFAULT_SEED, days=1, start=DEFAULT_START):
+    """Yield synthetic session rows (lists in SESSION_COLUMNS order)"""
+    rng = random.Random(seed)
+    hours = list(HOUR_WEIGHTS)
+    weights = list(HOUR_WEIGHTS.values())
+    customers = [f"Customer {i:05d}" for i in range(max(50, rows // 4))]
+
+    for i in range(rows):
+        day = start + timedelta(days=i * days // rows)
+        hour = rng.choices(hours, weights)[0]
+        started = day.replace(hour=hour, minute=rng.randrange(60), second=rng.randrange(60))
+        duration = timedelta(minutes=rng.randint(2, 90), seconds=rng.randrange(60))
+        involved = int(duration.total_seconds() // 60 * rng.uniform(0.5, 1.0))
+        customer = rng.choice(customers)
+
+        yield [
+            f"{1000000 + i}",
+            "1",
+            started.strftime('%Y-%m-%d %H:%M:%S') + " EST",
+            (started + duration).strftime('%Y-%m-%d %H:%M:%S') + " EST",
+            str(duration),
+            customer,
+            f"{customer.split()[-1]} Clinic",
+            "",
+            "",
+            "",
+            _public_ip(rng),
+            f"192.168.{rng.randint(0, 10)}.{rng.randint(2, 254)}",
+            rng.choice(REPRESENTATIVES),
+            "203.0.113.10",
+            f"10.0.0.{rng.randint(2, 254)}",
+            f"{involved // 60}:{involved % 60:02d}",
+            "Default",
+            rng.choice(QUEUES),
+            "",
+            str(rng.choice([0, 0, 0, 1, 2])),
+            "0",
+            "0",
+        ]
+
+
+def generate_sessions_csv(output_file, rows, seed=DEFAULT_SEED, days=1, start=DEFAULT_START):
+    """Write a synthetic Support-sessions CSV and return its path"""
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(SESSION_COLUMNS)
+        writer.writerows(iter_session_rows(rows, seed, days, start))
+    return output_file
+
+
+def main():
+    args = sys.argv[1:]
+    seed = DEFAULT_SEED
+    days = 1
+
+    if "--seed" in args:
+        i = args.index("--seed")
+        seed = int(args[i + 1])
+        del args[i:i + 2]
+    if "--days" in args:
+        i = args.index("--days")
+        days = int(args[i + 1])
+        del args[i:i + 2]
+
+    if not args:
+        print("Usage: python synthetic_sessions.py <output.csv> [rows] [--days N] [--seed N]")
+        sys.exit(1)
+
+    rows = int(args[1]) if len(args) > 1 else 1000
+    generate_sessions_csv(args[0], rows, seed, days)
+    print(f"[OK] Wrote {rows} sessions to {args[0]}")
+
+
+if __name__ == "__main__":
+    main()
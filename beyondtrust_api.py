@@ -15,6 +15,8 @@ import base64
 import json
 from datetime import datetime, timedelta
 
+from api_capabilities import CapabilityMap, capability_key
+
 
 class BeyondTrustAPI:
     """BeyondTrust Remote Support API Client"""
@@ -29,6 +31,9 @@ class BeyondTrustAPI:
         self.access_token = None
         self.token_expires_at = None
 
+        # Endpoint capabilities discovered by explore_all_apis.py
+        self.capabilities = CapabilityMap.load()
+
     def _get_auth_header(self):
         """Generate Basic Auth header for OAuth token request"""
         credentials = f"{self.client_id}:{self.client_secret}"
@@ -72,6 +77,10 @@ class BeyondTrustAPI:
                 print(f"[ERROR] Response: {e.response.text}")
             raise
 
+    def is_endpoint_available(self, endpoint, params=None):
+        """False if the capability map says this endpoint recently returned 404"""
+        return not self.capabilities.is_known_missing(capability_key(endpoint, params))
+
     def _make_request(self, method, endpoint, **kwargs):
         """Make authenticated API request"""
         token = self._get_access_token()
@@ -122,6 +131,10 @@ class BeyondTrustAPI:
 
         available_endpoints = []
         for endpoint in test_endpoints:
+            if not self.is_endpoint_available(endpoint):
+                print(f"[404] {endpoint} - Not found (cached)")
+                continue
+
             try:
                 response = self._make_request("GET", endpoint)
                 print(f"[OK] {endpoint}")
@@ -0,0 +1,186 @@
+"""
+BeyondTrust Command API (Streaming)
+===================================
+Runs Command API actions and parses the XML responses incrementally with
+iterparse, so large responses (session summaries, rep lists) are never held
+in memory as a whole string or DOM.
+
+Each child of the response root is yielded as a record and then cleared.
+An <error> root is detected as soon as it is read and raised as
+CommandAPIError.
+
+Usage:
+    from beyondtrust_api import BeyondTrustAPI
+    from command_api import iter_command, get_logged_in_reps
+
+    api = BeyondTrustAPI()
+    for rep in get_logged_in_reps(api):
+        print(rep.display_name, rep.routing_available)
+"""
+
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from contextlib import closing
+
+COMMAND_ENDPOINT = "/api/command"
+
+# Generic record: tag name, attributes and {child tag: text} fields
+CommandRecord = namedtuple('CommandRecord', ['tag', 'attrs', 'fields'])
+
+# Typed record for <rep> elements (get_logged_in_reps)
+RepStatus = namedtuple('RepStatus', [
+    'id', 'display_name', 'type', 'session_count',
+    'routing_available', 'routing_idle', 'routing_busy', 'routing_enabled',
+])
+
+
+class CommandAPIError(Exception):
+    """The Command API answered with an <error> document"""
+
+
+def _local_name(tag):
+    """Strip the XML namespace from a tag"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _to_int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _to_bool(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes')
+
+
+def _rep_status(record):
+    """Build a RepStatus from a <rep> record"""
+    fields = record.fields
+    return RepStatus(
+        id=_to_int(record.attrs.get('id', fields.get('id'))),
+        display_name=fields.get('display_name') or fields.get('public_display_name') or '',
+        type=fields.get('type', ''),
+        session_count=_to_int(fields.get('session_count')),
+        routing_available=_to_bool(fields.get('routing_available')),
+        routing_idle=_to_bool(fields.get('routing_idle')),
+        routing_busy=_to_bool(fields.get('routing_busy')),
+        routing_enabled=_to_bool(fields.get('routing_enabled')),
+    )
+
+
+# Record tag -> converter to a typed record
+RECORD_TYPES = {
+    'rep': _rep_status,
+}
+
+
+def _element_fields(elem):
+    """Flatten an element's children into a dict (nested children become dicts)"""
+    fields = {}
+    for child in elem:
+        if len(child):
+            value = _element_fields(child)
+        else:
+            value = (child.text or '').strip()
+        fields[_local_name(child.tag)] = value
+    return fields
+
+
+class CommandResponseParser:
+    """
+    Incremental parser for a Command API XML response stream.
+
+    Iterating yields one record per child of the root element. Elements are
+    cleared as soon as their record has been built.
+    """
+
+    def __init__(self, stream, typed=True):
+        self.stream = stream
+        self.typed = typed
+        self.root_tag = None
+        self.root_attrs = {}
+        self.count = 0
+
+    def __iter__(self):
+        depth = 0
+        root = None
+
+        for event, elem in ET.iterparse(self.stream, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == 1:
+                    root = elem
+                    self.root_tag = _local_name(elem.tag)
+                    self.root_attrs = dict(elem.attrib)
+                continue
+
+            depth -= 1
+
+            if depth == 0:
+                # End of the document root
+                if self.root_tag == 'error':
+                    raise CommandAPIError((elem.text or '').strip() or 'Unknown Command API error')
+                root.clear()
+                break
+
+            if depth == 1 and self.root_tag != 'error':
+                tag = _local_name(elem.tag)
+                record = CommandRecord(tag, dict(elem.attrib), _element_fields(elem))
+                self.count += 1
+
+                # Drop the finished record (and the root's reference to it)
+                elem.clear()
+                root.clear()
+
+                converter = RECORD_TYPES.get(tag) if self.typed else None
+                yield converter(record) if converter else record
+
+
+def iter_command(api, action, typed=True, **params):
+    """
+    Run a Command API action and yield its records as they are parsed.
+
+    Raises:
+        CommandAPIError: The appliance returned an <error> document
+    """
+    params = dict(params, action=action)
+    response = api._make_request("GET", COMMAND_ENDPOINT, params=params, stream=True)
+
+    with closing(response):
+        response.raw.decode_content = True
+        yield from CommandResponseParser(response.raw, typed=typed)
+
+
+def get_logged_in_reps(api):
+    """Return RepStatus records for every logged-in representative"""
+    return list(iter_command(api, "get_logged_in_reps"))
+
+
+def summarize_response(response, sample_size=3):
+    """
+    Consume a streamed Command API response and summarize it.
+
+    Returns:
+        Dict with root, count, samples (first few records as dicts),
+        fields (record field names) and error (message or None)
+    """
+    summary = {'root': None, 'count': 0, 'samples': [], 'fields': [], 'error': None}
+
+    with closing(response):
+        response.raw.decode_content = True
+        parser = CommandResponseParser(response.raw, typed=False)
+        try:
+            for record in parser:
+                if len(summary['samples']) < sample_size:
+                    summary['samples'].append({'tag': record.tag, **record.attrs, **record.fields})
+                    if not summary['fields']:
+                        summary['fields'] = sorted(record.fields)
+        except CommandAPIError as e:
+            summary['error'] = str(e)
+        except ET.ParseError as e:
+            summary['error'] = f"Invalid XML: {e}"
+        summary['root'] = parser.root_tag
+        summary['count'] = parser.count
+
+    return summary
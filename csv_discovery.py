@@ -0,0 +1,255 @@
+"""
+CSV Export Discovery
+====================
+Finds Support-sessions exports in a folder with a single os.scandir()
+pass. The stat result cached on each DirEntry is reused for sorting, age
+checks and the watcher's processed-file index, so each file is stat'ed
+at most once per scan; on Windows and OneDrive folders scandir returns
+it without any extra call.
+
+Exports are indexed by the dates they cover: taken from the filename when
+it contains one (Support-sessions-2025-11-07.csv), otherwise from the
+'Started' values of the first PEEK_ROWS data rows and of the last ones
+(read with a seek from the end of the file), so an export is never
+parsed in full to find its dates. BeyondTrust exports are ordered by start
+time (either direction), so the first and last rows give the span. Peeked spans are remembered per (path,
+size, mtime), so a long-running watcher reads each export once. Looking
+up the export for a date is then a dict lookup, and the monthly runner
+can tell exactly which days of a month have no export.
+
+Usage:
+    from csv_discovery import scan_csv_files, ExportIndex, EXPORT_PREFIX
+
+    index = ExportIndex(scan_csv_files(downloads_dir, EXPORT_PREFIX))
+    entry = index.for_date(target_date)   # newest export for that day, or None
+    missing = index.missing_days(weekdays)
+"""
+
+import os
+import re
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+EXPORT_PREFIX = "Support-sessions"
+
+CLEANED_SUFFIX = "_cleaned.csv"
+
+# A YYYY-MM-DD date in a filename
+_NAME_DATE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+
+# Data rows read from each end of a file to find its date span
+PEEK_ROWS = 5
+
+# Bytes read from each end of a file for those rows
+PEEK_BYTES = 64 * 1024
+
+# Longest span (days) an export is indexed under; guards against a stray date
+MAX_SPAN_DAYS = 366
+
+# (path, size, mtime_ns) -> (first date, last date) peeked from the file (None if it had none)
+_peeked_spans = {}
+
+
+class CsvEntry:
+    """A CSV file found by scan_csv_files (path + the stat from the scan)"""
+
+    __slots__ = ('path', 'stat')
+
+    def __init__(self, path, stat):
+        self.path = path
+        self.stat = stat
+
+    @property
+    def name(self):
+        return self.path.name
+
+    @property
+    def size(self):
+        return self.stat.st_size
+
+    @property
+    def mtime(self):
+        return self.stat.st_mtime
+
+    def __repr__(self):
+        return f"CsvEntry({str(self.path)!r})"
+
+
+def scan_csv_files(folder, prefix=None):
+    """
+    CSV files in folder (one scandir pass), newest first
+
+    Cleaned copies (*_cleaned.csv) are skipped; prefix limits the scan to
+    names starting with it (case-insensitive).
+    """
+    prefix = prefix.lower() if prefix else None
+    entries = []
+    with os.scandir(folder) as scan:
+        for dir_entry in scan:
+            name = dir_entry.name.lower()
+            if not name.endswith('.csv') or name.endswith(CLEANED_SUFFIX):
+                continue
+            if prefix and not name.startswith(prefix):
+                continue
+            try:
+                if not dir_entry.is_file():
+                    continue
+                stat = dir_entry.stat()
+            except OSError:
+                # Deleted (or being replaced) since the directory was read
+                continue
+            entries.append(CsvEntry(Path(dir_entry.path), stat))
+
+    entries.sort(key=lambda entry: entry.stat.st_mtime_ns, reverse=True)
+    return entries
+
+
+def name_date(name):
+    """Date in a filename like Support-sessions-2025-11-07.csv (None if there is none)"""
+    match = _NAME_DATE.search(name)
+    if not match:
+        return None
+    try:
+        return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+
+
+def _started_date(value):
+    from aggregate_cache import parse_started
+
+    try:
+        return parse_started(value).date() if value else None
+    except ValueError:
+        return None
+
+
+def _line_dates(lines, fmt, rows):
+    """'Started' dates of up to `rows` records that have the header's shape"""
+    from fast_csv import parse_quoted
+
+    index = fmt.header.index('Started')
+    dates = []
+    for line in lines:
+        line = line.rstrip(b'\r')
+        if not line:
+            continue
+        if b'"' in line:
+            # An odd quote count means a piece of a multi-line quoted field
+            if line.count(b'"') % 2:
+                continue
+            fields = parse_quoted(line, fmt.encoding, fmt.delimiter)
+        else:
+            fields = line.decode(fmt.encoding, 'replace').split(fmt.delimiter)
+        # A fragment of a multi-line quoted field won't have the header's shape
+        if len(fields) != len(fmt.header):
+            continue
+        day = _started_date(fields[index])
+        if day is not None:
+            dates.append(day)
+            if len(dates) >= rows:
+                break
+    return dates
+
+
+def peek_date_span(path, rows=PEEK_ROWS):
+    """
+    (first, last) session date of an export from its first and last rows
+    (None if no 'Started' date was found)
+
+    Reads at most PEEK_BYTES from the start of the file and PEEK_BYTES
+    from the end (one seek), whatever the file size.
+    """
+    from fast_csv import CsvFormatError, iter_records, sniff
+
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            head = f.read(PEEK_BYTES)
+            tail = b''
+            if size > PEEK_BYTES:
+                f.seek(max(PEEK_BYTES, size - PEEK_BYTES))
+                tail = f.read()
+    except OSError:
+        return None
+
+    try:
+        fmt = sniff(head)
+    except CsvFormatError:
+        return None
+    if 'Started' not in fmt.header:
+        return None
+
+    # The head starts at a record boundary, so its records are read whole
+    # (quoted newlines included); the tail starts mid-row and is read by line
+    head_records = [record for record, _ in iter_records(head, fmt.data_start)]
+    if tail:
+        # The last head record may be cut off; the first tail line may start mid-row
+        head_records.pop()
+        tail_lines = tail.split(b'\n')[1:]
+    else:
+        tail_lines = head_records
+
+    dates = _line_dates(head_records, fmt, rows) + _line_dates(reversed(tail_lines), fmt, rows)
+    if not dates:
+        return None
+    return min(dates), max(dates)
+
+
+def export_span(entry):
+    """(first, last) date an export covers: from its name, else peeked from its rows"""
+    day = name_date(entry.name)
+    if day is not None:
+        return day, day
+
+    key = (str(entry.path), entry.stat.st_size, entry.stat.st_mtime_ns)
+    if key not in _peeked_spans:
+        _peeked_spans[key] = peek_date_span(entry.path)
+    return _peeked_spans[key]
+
+
+class ExportIndex:
+    """Exports from scan_csv_files() indexed by the dates they cover"""
+
+    def __init__(self, entries):
+        self.entries = list(entries)
+        self.spans = {}     # path -> (first date, last date)
+        self.by_date = {}   # date -> newest export covering it
+        for entry in self.entries:
+            span = export_span(entry)
+            if span is None:
+                continue
+            self.spans[entry.path] = span
+            first, last = span
+            if (last - first).days > MAX_SPAN_DAYS:
+                continue
+            day = first
+            while day <= last:
+                # Entries are newest first, so the first one seen for a date wins
+                self.by_date.setdefault(day, entry)
+                day += timedelta(days=1)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def for_date(self, day):
+        """Newest export covering a date or datetime (None if there is none)"""
+        if isinstance(day, datetime):
+            day = day.date()
+        return self.by_date.get(day)
+
+    def covering(self, start, end):
+        """Exports whose dates overlap start..end (inclusive), oldest first"""
+        start = start.date() if isinstance(start, datetime) else start
+        end = end.date() if isinstance(end, datetime) else end
+        return [entry for entry in reversed(self.entries)
+                if entry.path in self.spans
+                and self.spans[entry.path][0] <= end and self.spans[entry.path][1] >= start]
+
+    def missing_days(self, days):
+        """The days (dates or datetimes) no export covers"""
+        return [day for day in days if self.for_date(day) is None]
+
+    def latest(self):
+        """Most recently modified export (None if there are none)"""
+        return self.entries[0] if self.entries else None
@@ -10,13 +10,27 @@ This script monitors a folder for new CSV files and automatically:
 
 Features:
 - Robust file detection with retry logic
-- Comprehensive logging
-- Desktop notifications
+- Comprehensive logging, written from a background thread to a rotating
+  log file (optionally gzip-compressed, optionally JSON lines)
+- Desktop notifications (Windows toast, notify-send or D-Bus), sent with
+  the browser launch from a background thread; bursts are coalesced into
+  one summary notification
 - Processing history tracking
 - Better error handling
+- Re-downloaded copies of an export ("Support-sessions (1).csv") are
+  linked to the existing report instead of being processed again
+- Hosts the report daemon job server, so drag-and-drop and the daily /
+  monthly runners hand their jobs to this warm process (--no-daemon to
+  disable)
+- Optional built-in scheduler for the daily and monthly reports
+  (--schedule; cron specs via --daily-cron / --monthly-cron), with
+  catch-up of runs missed while the watcher was stopped
 
 Usage:
-    python enhanced_watch_folder.py [folder_path]
+    python enhanced_watch_folder.py [folder_path] [--profile cprofile|tracemalloc] [--metrics-port N]
+                                    [--no-daemon] [--notify auto|windows|notify-send|dbus|none]
+                                    [--log-rotate size|midnight] [--log-compress] [--log-json]
+                                    [--schedule] [--daily-cron SPEC|off] [--monthly-cron SPEC|off]
 
 If no folder path is provided, it watches the Downloads folder by default.
 
@@ -26,34 +40,63 @@ To stop: Press Ctrl+C
 import os
 import sys
 import time
-import logging
 from pathlib import Path
 from datetime import datetime
-import subprocess
 import json
+import threading
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 # Force output flushing for real-time display
 sys.stdout.reconfigure(line_buffering=True)
 
 # Import the report generation function
 from auto_generate_report import clean_csv, generate_report
+from history_store import load_history, save_history
+from file_index import ProcessedFileIndex, content_hash
+from csv_discovery import scan_csv_files
+from instrumentation import StageTimer, ProfileCapture, PROFILE_MODES
+from metrics import MetricsRegistry, start_http_server
+from report_daemon import JobServer, is_daemon_running, warm_up
+from side_effects import SideEffectDispatcher
+from log_setup import setup_queued_logging, ROTATE_MODES
+from parallel_csv import default_workers, should_parallelize
+from report_scheduler import ReportScheduler, default_jobs
+
+# Buckets for the rows-per-second histogram
+ROWS_PER_SECOND_BUCKETS = (100, 1000, 5000, 10000, 50000, 100000, 250000, 500000, 1000000)
 
 
 class EnhancedFolderWatcher:
-    def __init__(self, watch_folder, log_file=None):
+    def __init__(self, watch_folder, log_file=None, profile_mode=None, metrics_port=None, serve_jobs=True,
+                 notify_backend='auto', log_options=None, schedule=None):
         self.watch_folder = Path(watch_folder)
-        self.processed_files = set()
+        self.profile_mode = profile_mode
+        if profile_mode is not None and profile_mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {profile_mode} (choose from {', '.join(PROFILE_MODES)})")
+        self.file_index = None
+        self.missed_files = []
+        self.in_progress = set()
         self.last_check_time = datetime.now()
         self.processing_history = []
+        self.job_server = None
+        self.scheduler = None
+        self.worker_pool = None
+
+        # Watch-loop files and daemon jobs are processed one at a time
+        self._process_lock = threading.Lock()
 
         # Setup logging
         if log_file is None:
             log_file = self.watch_folder / "report_processing.log"
 
         self.log_file = Path(log_file)
+        self.log_options = log_options or {}
         self._setup_logging()
 
+        # Notifications and browser launches run off the processing path
+        self.side_effects = SideEffectDispatcher(notify_backend, logger=self.logger)
+
         if not self.watch_folder.exists():
             raise ValueError(f"Folder does not exist: {watch_folder}")
 
@@ -69,66 +112,189 @@ class EnhancedFolderWatcher:
         print(f"\nWaiting for new CSV files...")
         print(f"(Press Ctrl+C to stop)\n")
 
-        # Load existing files to avoid processing them
-        self._load_existing_files()
+        # Metrics (always collected; served over HTTP only when a port is given)
+        self._setup_metrics()
+        if metrics_port:
+            start_http_server(self.metrics, metrics_port)
+            self.logger.info(f"Metrics: http://127.0.0.1:{metrics_port}/metrics")
+            print(f"[METRICS] http://127.0.0.1:{metrics_port}/metrics\n")
+
+        # Find files that arrived while the watcher was stopped
+        self._load_file_index()
 
         # Load processing history
         self._load_history()
 
-    def _setup_logging(self):
-        """Setup logging configuration"""
-        self.logger = logging.getLogger('ReportWatcher')
-        self.logger.setLevel(logging.INFO)
-
-        # File handler
-        fh = logging.FileHandler(self.log_file)
-        fh.setLevel(logging.INFO)
+        # Accept report jobs from other scripts (report_daemon.submit_job)
+        if serve_jobs:
+            self._start_job_server()
+
+        # Scheduled daily / monthly reports (schedule: {'daily': cron, 'monthly': cron})
+        if schedule is not None:
+            self._start_scheduler(schedule)
+
+    def _start_job_server(self):
+        """Host the report daemon job server in this process"""
+        if is_daemon_running():
+            self.logger.info("Another report daemon is running; not accepting jobs")
+            print("[DAEMON] Another report daemon is running; not accepting jobs\n")
+            return
+
+        warm_up()
+        self.job_server = JobServer(handler=self._handle_job, name='folder watcher')
+        port = self.job_server.start()
+        self.logger.info(f"Accepting report jobs on 127.0.0.1:{port}")
+        print(f"[DAEMON] Accepting report jobs on 127.0.0.1:{port}\n")
+
+    def _start_scheduler(self, schedule):
+        """Run the daily / monthly reports on their cron schedules in this process"""
+        jobs = default_jobs(self.watch_folder, **schedule)
+        if not jobs:
+            return
+        self.scheduler = ReportScheduler(self.watch_folder, jobs, run_job=self._run_scheduled_job,
+                                         logger=self.logger)
+        for job in jobs:
+            self.logger.info(f"Scheduled {job.name} report: {job.cron.spec}")
+            print(f"[SCHEDULE] {job.name} report: {job.cron.spec}")
+        print()
+        self.scheduler.start()
+
+    def _run_scheduled_job(self, job, run_time):
+        """ReportScheduler callback: run one scheduled report"""
+        with self._process_lock:
+            print(f"\n[SCHEDULED] {job.name} report ({run_time.strftime('%Y-%m-%d %H:%M')})")
+            report_file = job.action(run_time)
+
+        if report_file:
+            self.logger.info(f"Scheduled {job.name} report: {report_file}")
+            self._send_notification(f"Scheduled {job.name.title()} Report Generated",
+                                    f"Generated: {Path(report_file).name}")
+        else:
+            self.logger.warning(f"Scheduled {job.name} report: no sessions for its dates")
+            self._send_notification(f"Scheduled {job.name.title()} Report Skipped",
+                                    "No sessions found for its dates", success=False)
+        return report_file
+
+    def _executor_for(self, csv_file):
+        """The watcher's long-lived process pool, if csv_file is large enough to parse in parallel"""
+        if not should_parallelize(csv_file):
+            return None
+        if self.worker_pool is None:
+            self.worker_pool = ProcessPoolExecutor(max_workers=default_workers())
+        return self.worker_pool
+
+    def _handle_job(self, csv_file, open_browser=True):
+        """JobServer handler: process a CSV submitted by another script"""
+        file_path = Path(csv_file)
+        self.in_progress.add(str(file_path))
+        self.logger.info(f"Job received: {file_path.name}")
+        try:
+            with self._process_lock:
+                record = self._process_file(file_path, open_browser=open_browser, wait_for_file=False)
+        finally:
+            self.in_progress.discard(str(file_path))
+        if record['status'] != 'success' and record['error']:
+            raise RuntimeError(record['error'])
+        return record['report_file']
 
-        # Console handler
-        ch = logging.StreamHandler()
-        ch.setLevel(logging.INFO)
+    def _setup_logging(self):
+        """Setup logging: queued, with the file written and rotated on a listener thread"""
+        self.logger, self.log_listener = setup_queued_logging('ReportWatcher', self.log_file,
+                                                              **self.log_options)
+
+    def _setup_metrics(self):
+        """Create the watcher's metric families"""
+        self.metrics = MetricsRegistry(prefix='report_watcher_')
+        self.m_files_seen = self.metrics.counter('files_seen_total', 'Support session CSV files detected')
+        self.m_files_processed = self.metrics.counter('files_processed_total', 'Files processed successfully')
+        self.m_files_failed = self.metrics.counter('files_failed_total', 'Files that failed to process')
+        self.m_files_duplicate = self.metrics.counter('files_duplicate_total',
+                                                      'Re-downloaded copies linked to an existing report')
+        self.m_backlog = self.metrics.gauge('backlog_files', 'Detected files waiting to be processed')
+        self.m_queue_wait = self.metrics.histogram('queue_wait_seconds', 'Time from detection to processing start')
+        self.m_stage_seconds = self.metrics.histogram('stage_seconds', 'Pipeline stage latency', labels=('stage',))
+        self.m_rows_per_second = self.metrics.histogram('rows_per_second', 'Session rows processed per second',
+                                                        buckets=ROWS_PER_SECOND_BUCKETS)
+
+    def _record_metrics(self, record, timer):
+        """Update metrics after a file has been processed"""
+        if record['status'] == 'success':
+            self.m_files_processed.inc()
+        else:
+            self.m_files_failed.inc()
 
-        # Formatter
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        fh.setFormatter(formatter)
-        ch.setFormatter(formatter)
+        for name, info in timer.stages.items():
+            self.m_stage_seconds.labels(stage=name).observe(info['seconds'])
 
-        self.logger.addHandler(fh)
-        self.logger.addHandler(ch)
+        rows = timer.stages.get('parse', {}).get('rows')
+        busy_seconds = sum(info['seconds'] for name, info in timer.stages.items() if name != 'file_wait')
+        if rows and busy_seconds > 0:
+            self.m_rows_per_second.observe(rows / busy_seconds)
 
     def _load_history(self):
         """Load processing history from JSON file"""
-        history_file = self.watch_folder / "processing_history.json"
-        if history_file.exists():
-            try:
-                with open(history_file, 'r') as f:
-                    self.processing_history = json.load(f)
+        try:
+            self.processing_history = load_history(self.watch_folder)
+            if self.processing_history:
                 self.logger.info(f"Loaded {len(self.processing_history)} historical records")
-            except Exception as e:
-                self.logger.warning(f"Could not load history: {e}")
-                self.processing_history = []
-        else:
+        except Exception as e:
+            self.logger.warning(f"Could not load history: {e}")
             self.processing_history = []
 
     def _save_history(self):
         """Save processing history to JSON file"""
-        history_file = self.watch_folder / "processing_history.json"
         try:
-            with open(history_file, 'w') as f:
-                json.dump(self.processing_history, f, indent=2)
+            save_history(self.watch_folder, self.processing_history)
         except Exception as e:
             self.logger.error(f"Could not save history: {e}")
 
-    def _load_existing_files(self):
-        """Mark all existing CSV files as already processed"""
-        for file in self.watch_folder.glob("*.csv"):
-            if not file.name.endswith("_cleaned.csv"):
-                self.processed_files.add(str(file))
+    def _load_file_index(self):
+        """Load the processed-file index and diff the folder against it"""
+        self.file_index = ProcessedFileIndex(self.watch_folder)
+        # Only session exports are indexed (each is hashed); other CSVs are never processed
+        entries = [entry for entry in scan_csv_files(self.watch_folder)
+                   if self._is_support_session_file(entry.path)]
+        csv_files = [entry.path for entry in entries]
+
+        if not self.file_index.loaded:
+            # No index yet: treat the exports already here as processed
+            for entry in entries:
+                try:
+                    self.file_index.mark(entry.path, status='existing', stat=entry.stat)
+                except OSError:
+                    pass
+            self._save_file_index()
+            if csv_files:
+                self.logger.info(f"Indexed {len(csv_files)} existing session exports")
+                print(f"[INFO] Indexed {len(csv_files)} existing session exports")
+                print(f"       Only NEW files will be processed\n")
+            return
+
+        self.file_index.prune(csv_files)
+        self.missed_files = [entry.path for entry in reversed(entries)  # oldest first
+                             if not self.file_index.is_processed(entry.path, entry.stat)]
+        self._save_file_index()
+
+        if self.missed_files:
+            self.logger.info(f"Catching up on {len(self.missed_files)} file(s) that arrived while stopped")
+            print(f"[CATCH-UP] {len(self.missed_files)} file(s) arrived while the watcher was stopped\n")
+
+    def _save_file_index(self):
+        """Save the processed-file index to the history store"""
+        try:
+            self.file_index.save()
+        except Exception as e:
+            self.logger.error(f"Could not save file index: {e}")
 
-        if self.processed_files:
-            self.logger.info(f"Ignoring {len(self.processed_files)} existing CSV files")
-            print(f"[INFO] Ignoring {len(self.processed_files)} existing CSV files")
-            print(f"       Only NEW files will be processed\n")
+    def _index_file(self, file_path, record):
+        """Record a processed file in the index"""
+        try:
+            self.file_index.mark(file_path, status=record['status'], report_file=record['report_file'],
+                                 digest=record.get('content_hash'))
+        except OSError as e:
+            self.logger.warning(f"Could not index {file_path.name}: {e}")
+            return
+        self._save_file_index()
 
     def _is_support_session_file(self, file_path):
         """Check if file looks like a support session CSV"""
@@ -149,39 +315,8 @@ class EnhancedFolderWatcher:
         return False
 
     def _send_notification(self, title, message, success=True):
-        """Send desktop notification (Windows)"""
-        try:
-            # Windows notification using PowerShell
-            if sys.platform == 'win32':
-                # Escape quotes in message
-                message = message.replace('"', '`"')
-                title = title.replace('"', '`"')
-
-                ps_script = f'''
-                [Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, ContentType = WindowsRuntime] | Out-Null
-                [Windows.Data.Xml.Dom.XmlDocument, Windows.Data.Xml.Dom.XmlDocument, ContentType = WindowsRuntime] | Out-Null
-
-                $template = @"
-                <toast>
-                    <visual>
-                        <binding template="ToastText02">
-                            <text id="1">{title}</text>
-                            <text id="2">{message}</text>
-                        </binding>
-                    </visual>
-                </toast>
-"@
-
-                $xml = New-Object Windows.Data.Xml.Dom.XmlDocument
-                $xml.LoadXml($template)
-                $toast = [Windows.UI.Notifications.ToastNotification]::new($xml)
-                [Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier("BeyondTrust Report Processor").Show($toast)
-                '''
-
-                subprocess.run(['powershell', '-Command', ps_script],
-                             capture_output=True, timeout=5)
-        except Exception as e:
-            self.logger.debug(f"Notification failed: {e}")
+        """Queue a desktop notification (sent from the side-effect thread)"""
+        self.side_effects.notify(title, message, success=success)
 
     def _wait_for_file_complete(self, file_path, max_wait=30):
         """Wait for file to finish writing"""
@@ -207,9 +342,11 @@ class EnhancedFolderWatcher:
         self.logger.warning(f"File may still be writing after {max_wait/2}s")
         return False
 
-    def _process_file(self, file_path):
-        """Process a CSV file and generate report"""
+    def _process_file(self, file_path, open_browser=True, wait_for_file=True):
+        """Process a CSV file and generate report; returns the history record"""
         start_time = datetime.now()
+        timer = StageTimer()
+        profile = ProfileCapture(self.profile_mode)
         record = {
             'file': str(file_path),
             'filename': file_path.name,
@@ -229,22 +366,42 @@ class EnhancedFolderWatcher:
             print(f"{'='*60}")
 
             # Wait for file to finish writing
-            if not self._wait_for_file_complete(file_path):
-                self.logger.warning("Proceeding anyway...")
+            with timer.stage('file_wait'):
+                if wait_for_file and not self._wait_for_file_complete(file_path):
+                    self.logger.warning("Proceeding anyway...")
+
+            # Same content as an export that already has a report?
+            try:
+                record['content_hash'] = content_hash(file_path)
+            except OSError as e:
+                self.logger.warning(f"Could not hash {file_path.name}: {e}")
+                record['content_hash'] = None
+            duplicate = record['content_hash'] and self.file_index.find_duplicate(record['content_hash'],
+                                                                                   exclude=file_path)
+            if duplicate:
+                record['status'] = 'duplicate'
+                record['report_file'] = duplicate['report_file']
+                record['duplicate_of'] = duplicate['path']
+                self.logger.info(f"DUPLICATE of {Path(duplicate['path']).name}; "
+                                 f"existing report: {duplicate['report_file']}")
+                print(f"\n[DUPLICATE] Same content as {Path(duplicate['path']).name} - skipped")
+                print(f"[FILE] {duplicate['report_file']}\n")
+                return record
 
             # Run the report generation
             self.logger.info("Starting report generation...")
             print(f"\n[PROCESSING] Cleaning and generating report...")
 
-            # Clean CSV
-            self.logger.info("Step 1: Cleaning CSV...")
-            cleaned_file = clean_csv(str(file_path))
-            self.logger.info(f"CSV cleaned: {cleaned_file}")
-            print(f"   [OK] CSV cleaned")
+            with profile:
+                # Clean CSV
+                self.logger.info("Step 1: Cleaning CSV...")
+                cleaned_file = clean_csv(str(file_path), timer=timer)
+                self.logger.info(f"CSV cleaned: {cleaned_file}")
+                print(f"   [OK] CSV cleaned")
 
-            # Generate report
-            self.logger.info("Step 2: Generating HTML report...")
-            report_file = generate_report(cleaned_file)
+                # Generate report
+                self.logger.info("Step 2: Generating HTML report...")
+                report_file = generate_report(cleaned_file, timer=timer, executor=self._executor_for(cleaned_file))
 
             if report_file:
                 record['status'] = 'success'
@@ -255,11 +412,11 @@ class EnhancedFolderWatcher:
                 self.logger.info(f"SUCCESS: Report generated at {report_file}")
                 print(f"\n[SUCCESS] Report generated!")
                 print(f"[FILE] {report_file}")
-                print(f"\n[BROWSER] Opening report...")
 
                 # Open in browser
-                import webbrowser
-                webbrowser.open(f'file:///{report_file}')
+                if open_browser:
+                    print(f"\n[BROWSER] Opening report...")
+                    self.side_effects.open_report(report_file)
 
                 # Send notification
                 self._send_notification(
@@ -298,9 +455,41 @@ class EnhancedFolderWatcher:
             )
 
         finally:
-            # Save to history
-            self.processing_history.append(record)
-            self._save_history()
+            if record['status'] == 'duplicate':
+                # Not processed: only linked in the index
+                self.m_files_duplicate.inc()
+                self._index_file(file_path, record)
+            else:
+                self._finish_record(file_path, record, timer, profile)
+
+        return record
+
+    def _finish_record(self, file_path, record, timer, profile):
+        """Store stages, profile, metrics and history for a processed file"""
+        # Stage breakdown (file wait, clean, parse, aggregate, render, write)
+        record['stages'] = timer.as_dict()
+        record['rows'] = timer.stages.get('parse', {}).get('rows')
+        record['bytes'] = timer.stages.get('clean', {}).get('bytes')
+        self.logger.info("Stages: " + ", ".join(
+            f"{name} {info['seconds']:.2f}s" for name, info in timer.stages.items()))
+
+        # Optional profile dump next to the report
+        if self.profile_mode:
+            try:
+                stem = Path(record['report_file']).with_suffix('') if record['report_file'] else file_path.with_suffix('')
+                profile_file = profile.dump(stem)
+                if profile_file:
+                    record['profile_file'] = str(profile_file)
+                    self.logger.info(f"Profile saved: {profile_file}")
+            except Exception as e:
+                self.logger.warning(f"Could not save profile: {e}")
+
+        self._record_metrics(record, timer)
+
+        # Save to history and the processed-file index
+        self.processing_history.append(record)
+        self._save_history()
+        self._index_file(file_path, record)
 
     def get_statistics(self):
         """Get processing statistics"""
@@ -325,26 +514,33 @@ class EnhancedFolderWatcher:
             while True:
                 check_count += 1
 
-                # Check for new CSV files
-                for file in self.watch_folder.glob("*.csv"):
-                    file_str = str(file)
+                # Files that arrived while stopped go first
+                pending = [(file, time.monotonic()) for file in self.missed_files]
+                self.missed_files = []
 
-                    # Skip if already processed
-                    if file_str in self.processed_files:
-                        continue
+                # Check for new CSV files (one directory scan; cleaned files are skipped)
+                for entry in reversed(scan_csv_files(self.watch_folder)):
+                    file = entry.path
 
-                    # Skip if it's a cleaned file
-                    if file.name.endswith("_cleaned.csv"):
+                    # Skip if already processed (or being processed as a daemon job)
+                    if str(file) in self.in_progress or any(file == queued for queued, _ in pending):
+                        continue
+                    if self.file_index.is_processed(file, entry.stat):
                         continue
 
                     # Check if it's a support session file
                     if self._is_support_session_file(file):
-                        # Mark as processed immediately to avoid double-processing
-                        self.processed_files.add(file_str)
                         self.logger.info(f"Adding to processing queue: {file.name}")
-
-                        # Process the file
+                        self.m_files_seen.inc()
+                        pending.append((file, time.monotonic()))
+
+                # Process the files found in this scan
+                self.m_backlog.set(len(pending))
+                for file, detected_at in pending:
+                    self.m_queue_wait.observe(time.monotonic() - detected_at)
+                    with self._process_lock:
                         self._process_file(file)
+                    self.m_backlog.dec()
 
                 # Log heartbeat every 5 minutes
                 if check_count % 150 == 0:  # 150 * 2 seconds = 5 minutes
@@ -362,6 +558,18 @@ class EnhancedFolderWatcher:
         self.logger.info("Folder Watcher Stopping...")
         self.logger.info("="*60)
 
+        if self.job_server is not None:
+            self.job_server.stop()
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+
+        # Send whatever notifications are still queued
+        self.side_effects.stop()
+        if self.side_effects.dropped:
+            self.logger.warning(f"Dropped {self.side_effects.dropped} notification(s)/browser launch(es)")
+
         stats = self.get_statistics()
         if stats:
             self.logger.info(f"Session Statistics:")
@@ -371,6 +579,7 @@ class EnhancedFolderWatcher:
             self.logger.info(f"  Success Rate: {stats['success_rate']:.1f}%")
 
         self.logger.info("Shutdown complete")
+        self.log_listener.stop()
 
         print(f"\n\n{'='*60}")
         print(f"[STOPPED] Folder watcher stopped")
@@ -386,15 +595,70 @@ def main():
     print("=" * 60)
     print()
 
+    args = sys.argv[1:]
+
+    # Optional profiling: --profile cprofile|tracemalloc
+    profile_mode = None
+    if "--profile" in args:
+        i = args.index("--profile")
+        profile_mode = args[i + 1] if i + 1 < len(args) else 'cprofile'
+        del args[i:i + 2]
+
+    # Optional metrics endpoint: --metrics-port N
+    metrics_port = None
+    if "--metrics-port" in args:
+        i = args.index("--metrics-port")
+        metrics_port = int(args[i + 1])
+        del args[i:i + 2]
+
+    # Don't accept report jobs from other scripts: --no-daemon
+    serve_jobs = "--no-daemon" not in args
+    args = [arg for arg in args if arg != "--no-daemon"]
+
+    # Notification backend: --notify auto|windows|notify-send|dbus|none
+    notify_backend = 'auto'
+    if "--notify" in args:
+        i = args.index("--notify")
+        notify_backend = args[i + 1] if i + 1 < len(args) else 'none'
+        del args[i:i + 2]
+
+    # Scheduled reports: --schedule, --daily-cron SPEC|off, --monthly-cron SPEC|off
+    schedule = None
+    if "--schedule" in args:
+        schedule = {}
+        args.remove("--schedule")
+    for name in ('daily', 'monthly'):
+        option = f"--{name}-cron"
+        if option in args:
+            i = args.index(option)
+            schedule = schedule if schedule is not None else {}
+            schedule[name] = None if args[i + 1] == 'off' else args[i + 1]
+            del args[i:i + 2]
+
+    # Log file rotation / format: --log-rotate size|midnight, --log-compress, --log-json
+    log_options = {}
+    if "--log-rotate" in args:
+        i = args.index("--log-rotate")
+        log_options['rotate'] = args[i + 1] if i + 1 < len(args) else ROTATE_MODES[0]
+        del args[i:i + 2]
+    if "--log-compress" in args:
+        log_options['compress'] = True
+        args.remove("--log-compress")
+    if "--log-json" in args:
+        log_options['json_logs'] = True
+        args.remove("--log-json")
+
     # Determine watch folder
-    if len(sys.argv) > 1:
-        watch_folder = sys.argv[1]
+    if args:
+        watch_folder = args[0]
     else:
         # Default to Downloads folder
         watch_folder = str(Path.home() / "Downloads")
 
     try:
-        watcher = EnhancedFolderWatcher(watch_folder)
+        watcher = EnhancedFolderWatcher(watch_folder, profile_mode=profile_mode, metrics_port=metrics_port,
+                                         serve_jobs=serve_jobs, notify_backend=notify_backend,
+                                         log_options=log_options, schedule=schedule)
         watcher.watch()
     except ValueError as e:
         print(f"[ERROR] {e}")
@@ -5,13 +5,23 @@ Enabled APIs:
 - Command API (Full Access)
 - Reporting API (Support Session Reports access)
 - Configuration API (Allow Access)
+
+Endpoints are probed concurrently and the results are saved to
+api_capabilities.json. Endpoints that returned 404 recently are skipped on
+the next run; pass --refresh to probe everything again.
+
+Usage:
+    python explore_all_apis.py [--refresh]
 """
 
+import sys
+
 from beyondtrust_api import BeyondTrustAPI
-import json
+from api_capabilities import probe_endpoints
+from command_api import summarize_response
 
 
-def test_configuration_api(api):
+def test_configuration_api(api, refresh=False):
     """Test Configuration API endpoints from the OpenAPI spec"""
     print("\n" + "=" * 80)
     print("CONFIGURATION API")
@@ -28,30 +38,35 @@ def test_configuration_api(api):
 
     working = []
 
-    for endpoint in endpoints:
+    for result in probe_endpoints(api, endpoints, api.capabilities, refresh=refresh):
+        endpoint = result['endpoint']
         print(f"\nTesting: {endpoint}")
-        try:
-            response = api._make_request("GET", endpoint)
-            if response.status_code == 200:
-                data = response.json()
-                print(f"  [SUCCESS] Status: 200")
-                print(f"  Data type: {type(data)}")
-                if isinstance(data, list):
-                    print(f"  Items: {len(data)}")
-                    if data:
-                        print(f"  Sample keys: {list(data[0].keys())[:10]}")
-                elif isinstance(data, dict):
-                    print(f"  Keys: {list(data.keys())[:10]}")
-                working.append((endpoint, data))
-            else:
-                print(f"  [FAILED] Status: {response.status_code}")
-        except Exception as e:
-            print(f"  [ERROR] {str(e)[:100]}")
+        if result['skipped']:
+            print(f"  [SKIPPED] Known 404 (cached)")
+        elif result['status'] == 200:
+            try:
+                data = result['response'].json()
+            except ValueError as e:
+                print(f"  [ERROR] {str(e)[:100]}")
+                continue
+            print(f"  [SUCCESS] Status: 200")
+            print(f"  Data type: {type(data)}")
+            if isinstance(data, list):
+                print(f"  Items: {len(data)}")
+                if data:
+                    print(f"  Sample keys: {list(data[0].keys())[:10]}")
+            elif isinstance(data, dict):
+                print(f"  Keys: {list(data.keys())[:10]}")
+            working.append((endpoint, data))
+        elif result['status'] is not None:
+            print(f"  [FAILED] Status: {result['status']}")
+        else:
+            print(f"  [ERROR] {str(result['error'])[:100]}")
 
     return working
 
 
-def test_command_api_actions(api):
+def test_command_api_actions(api, refresh=False):
     """Test different Command API actions based on BeyondTrust docs"""
     print("\n" + "=" * 80)
     print("COMMAND API - Testing Common Actions")
@@ -84,32 +99,40 @@ def test_command_api_actions(api):
 
     working = []
 
-    for action in actions:
+    def summarize(response):
+        # Stream-parse the XML in the worker; only a small summary comes back
+        summary = summarize_response(response)
+        schema = {'error': summary['error']} if summary['error'] else \
+            {'root': summary['root'], 'fields': summary['fields']}
+        return schema, summary
+
+    probes = [("/api/command", {"action": action}) for action in actions]
+    results = probe_endpoints(api, probes, api.capabilities, refresh=refresh, handler=summarize)
+    for action, result in zip(actions, results):
         print(f"\nTesting action: {action}")
-        try:
-            response = api._make_request("GET", "/api/command", params={"action": action})
-            if response.status_code == 200:
-                text = response.text
-
-                # Check if it's an error
-                if "<error" in text:
-                    import xml.etree.ElementTree as ET
-                    root = ET.fromstring(text)
-                    error_msg = root.text
-                    print(f"  [ERROR IN XML] {error_msg}")
-                else:
-                    print(f"  [SUCCESS] Got response!")
-                    print(f"  Response preview: {text[:300]}")
-                    working.append((action, text))
+        if result['skipped']:
+            print(f"  [SKIPPED] Known 404 (cached)")
+        elif result['status'] == 200:
+            summary = result['result']
+
+            # Check if it's an error
+            if summary['error']:
+                print(f"  [ERROR IN XML] {summary['error']}")
             else:
-                print(f"  [FAILED] Status: {response.status_code}")
-        except Exception as e:
-            print(f"  [ERROR] {str(e)[:100]}")
+                print(f"  [SUCCESS] Got response!")
+                print(f"  Root: <{summary['root']}>  Records: {summary['count']}")
+                for sample in summary['samples']:
+                    print(f"  Sample: {str(sample)[:300]}")
+                working.append((action, summary))
+        elif result['status'] is not None:
+            print(f"  [FAILED] Status: {result['status']}")
+        else:
+            print(f"  [ERROR] {str(result['error'])[:100]}")
 
     return working
 
 
-def test_openapi_endpoints(api):
+def test_openapi_endpoints(api, refresh=False):
     """Check if there's an OpenAPI/Swagger doc for other APIs"""
     print("\n" + "=" * 80)
     print("LOOKING FOR API DOCUMENTATION ENDPOINTS")
@@ -125,24 +148,28 @@ def test_openapi_endpoints(api):
         "/api/config/v1/openapi.json",
     ]
 
-    for endpoint in doc_endpoints:
+    for result in probe_endpoints(api, doc_endpoints, api.capabilities, refresh=refresh):
+        endpoint = result['endpoint']
         print(f"\nTesting: {endpoint}")
-        try:
-            response = api._make_request("GET", endpoint)
-            if response.status_code == 200:
-                print(f"  [FOUND] Status: 200")
-                content_type = response.headers.get("Content-Type", "")
-                print(f"  Content-Type: {content_type}")
-                print(f"  Size: {len(response.text)} bytes")
-
-                # Save it if it's YAML/JSON
-                if "yaml" in content_type or "json" in content_type:
-                    filename = f"Y:\\Coding\\Beyondtrust\\api_docs_{endpoint.replace('/', '_')}"
-                    with open(filename, 'w') as f:
-                        f.write(response.text)
-                    print(f"  [SAVED] {filename}")
-        except Exception as e:
-            print(f"  [FAILED] {str(e)[:100]}")
+        if result['skipped']:
+            print(f"  [SKIPPED] Known 404 (cached)")
+        elif result['status'] == 200:
+            response = result['response']
+            print(f"  [FOUND] Status: 200")
+            content_type = response.headers.get("Content-Type", "")
+            print(f"  Content-Type: {content_type}")
+            print(f"  Size: {len(response.text)} bytes")
+
+            # Save it if it's YAML/JSON
+            if "yaml" in content_type or "json" in content_type:
+                filename = f"Y:\\Coding\\Beyondtrust\\api_docs_{endpoint.replace('/', '_')}"
+                with open(filename, 'w') as f:
+                    f.write(response.text)
+                print(f"  [SAVED] {filename}")
+        elif result['status'] is not None:
+            print(f"  [FAILED] Status: {result['status']}")
+        else:
+            print(f"  [FAILED] {str(result['error'])[:100]}")
 
 
 def main():
@@ -151,12 +178,18 @@ def main():
     print("=" * 80)
     print("\nThis will test all enabled APIs to find what data is actually available.\n")
 
+    refresh = "--refresh" in sys.argv[1:]
+
     api = BeyondTrustAPI()
 
     # Test each API
-    config_working = test_configuration_api(api)
-    command_working = test_command_api_actions(api)
-    test_openapi_endpoints(api)
+    config_working = test_configuration_api(api, refresh)
+    command_working = test_command_api_actions(api, refresh)
+    test_openapi_endpoints(api, refresh)
+
+    # Persist what we learned so the other tools can skip missing endpoints
+    api.capabilities.save()
+    print(f"\n[SAVED] Capability map: {api.capabilities.path}")
 
     # Final summary
     print("\n" + "=" * 80)
@@ -0,0 +1,341 @@
+"""
+Memory-Mapped CSV Ingestion
+===========================
+Reads BeyondTrust exports through mmap and splits rows on the raw bytes,
+so a large export is never decoded or tokenized as a whole:
+
+- Rows without a quote character are split with bytes.split(b',') and only
+  the requested columns are decoded.
+- Rows containing quotes (commas or newlines inside a field) are
+  reassembled across physical lines and handed to the csv module.
+
+Columns are selected by header name, never by position: projection()
+resolves the wanted names against a file's header once and caches the
+result per schema fingerprint (a hash of the delimiter and normalized
+header), so exports in a known format skip the lookup and a reordered or
+extended export still yields the right columns. clean_csv uses
+project_columns() to copy the kept columns without decoding the unquoted
+rows at all; read_sessions uses iter_columns() to decode only the columns
+the aggregation reads. Both produce the same results as the csv module
+paths they replace.
+
+The format is sniffed from the first SNIFF_BYTES only (sniff()): a UTF-8
+BOM is skipped, the encoding is UTF-8 unless that block isn't valid UTF-8
+(then cp1252), and the delimiter is the most frequent of , ; tab | in the
+header. Header names are normalized once (BOM, whitespace, curly
+apostrophes), so column lookups by name always hit. A stray non-UTF-8 byte
+later in the file is decoded as cp1252 for that row instead of aborting
+the parse. Files that cannot be an export (UTF-16, binary, missing
+required columns) raise CsvFormatError before any row is read.
+
+Usage:
+    from fast_csv import iter_columns, project_columns
+
+    for row in iter_columns(csv_file, ['Started', "Representative's Name"]):
+        ...
+"""
+
+import codecs
+import csv
+import hashlib
+import io
+import mmap
+import os
+from collections import namedtuple
+from contextlib import contextmanager
+
+# Bytes examined per block; quote-free blocks are split in a single call
+BLOCK_SIZE = 4 * 1024 * 1024
+
+# Bytes examined to detect the encoding and delimiter
+SNIFF_BYTES = 64 * 1024
+
+# Candidate delimiters, preferred in this order on a tie
+DELIMITERS = (',', ';', '\t', '|')
+
+# Used for rows that are not valid in the sniffed encoding
+FALLBACK_ENCODING = 'cp1252'
+
+# encoding, delimiter (str), normalized header fields, offsets of the header (after
+# any BOM) and of the first data row
+CsvFormat = namedtuple('CsvFormat', 'encoding delimiter header header_start data_start')
+
+
+# (schema fingerprint, requested columns) -> (present names, their indexes, missing names)
+_projections = {}
+
+
+class CsvFormatError(ValueError):
+    """The file is not a CSV export the pipeline can read"""
+
+
+@contextmanager
+def mapped(path):
+    """Read-only mmap of a file (None for an empty file)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield None
+            return
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield buf
+        finally:
+            buf.close()
+
+
+def iter_records(buf, start=0, end=None):
+    """
+    Yield (record_bytes, quoted) for each CSV record between two offsets.
+
+    start must be at a record boundary. The range is read in blocks; a block
+    without any quote character is split in one bytes.split() call, other
+    blocks are scanned record by record. A record with an odd number of
+    quote characters continues on the next physical line. Line endings
+    (\n or \r\n) are stripped.
+    """
+    end = len(buf) if end is None else end
+    pos = start
+    while pos < end:
+        block_end = min(end, pos + BLOCK_SIZE)
+        if block_end < end:
+            newline = buf.rfind(b'\n', pos, block_end)
+            if newline < 0:
+                newline = buf.find(b'\n', block_end, end)
+            block_end = end if newline < 0 else newline + 1
+
+        block = buf[pos:block_end]
+        if b'"' not in block:
+            lines = block.split(b'\n')
+            last = lines.pop()
+            for line in lines:
+                yield (line[:-1] if line.endswith(b'\r') else line), False
+            if last:
+                yield last, False
+            pos = block_end
+        else:
+            pos = yield from _scan_records(buf, pos, block_end, end)
+
+
+def _scan_records(buf, pos, block_end, end):
+    """Record-by-record scan of records starting before block_end; returns the next offset"""
+    while pos < block_end:
+        newline = buf.find(b'\n', pos, end)
+        next_pos = end if newline < 0 else newline + 1
+        record = buf[pos:next_pos]
+
+        quoted = b'"' in record
+        if quoted:
+            # Quoted newline: keep appending physical lines until the quotes balance
+            while record.count(b'"') % 2 and next_pos < end:
+                newline = buf.find(b'\n', next_pos, end)
+                line_end = end if newline < 0 else newline + 1
+                record += buf[next_pos:line_end]
+                next_pos = line_end
+
+        pos = next_pos
+        if record.endswith(b'\n'):
+            record = record[:-2] if record.endswith(b'\r\n') else record[:-1]
+        yield record, quoted
+    return pos
+
+
+def parse_quoted(record, encoding='utf-8', delimiter=','):
+    """Fields of a record that contains quotes (via the csv module)"""
+    try:
+        text = record.decode(encoding)
+    except UnicodeDecodeError:
+        text = record.decode(FALLBACK_ENCODING, 'replace')
+    for row in csv.reader(io.StringIO(text, newline=''), delimiter=delimiter):
+        return row
+    return []
+
+
+def normalize_header(name):
+    """Header name with BOM, curly apostrophes and extra whitespace normalized"""
+    return ' '.join(name.replace('\ufeff', '').replace('\u2019', "'").split())
+
+
+def sniff(buf):
+    """
+    CsvFormat of a mapped file (or bytes), from its first SNIFF_BYTES
+
+    Raises:
+        CsvFormatError: UTF-16 or binary content
+    """
+    head = buf[:SNIFF_BYTES]
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        raise CsvFormatError("UTF-16 file; export or save it as CSV (UTF-8)")
+    if b'\x00' in head:
+        raise CsvFormatError("Binary file, not a CSV export")
+
+    start = len(codecs.BOM_UTF8) if head.startswith(codecs.BOM_UTF8) else 0
+    try:
+        head[start:].decode('utf-8')
+        encoding = 'utf-8'
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the end of the block is fine
+        cut_off = len(buf) > SNIFF_BYTES and e.start >= len(head) - 3 and e.reason == 'unexpected end of data'
+        encoding = 'utf-8' if cut_off else FALLBACK_ENCODING
+
+    newline = head.find(b'\n', start)
+    header_end = len(buf) if newline < 0 else newline + 1
+    header_line = head[start:header_end]
+    delimiter = max(DELIMITERS, key=lambda d: header_line.count(d.encode('ascii')))
+    if not header_line.count(delimiter.encode('ascii')):
+        delimiter = ','
+
+    for record, quoted in iter_records(buf, start, header_end):
+        if quoted:
+            fields = parse_quoted(record, encoding, delimiter)
+        else:
+            fields = record.decode(encoding, 'replace').split(delimiter)
+        return CsvFormat(encoding, delimiter, [normalize_header(field) for field in fields], start, header_end)
+    return CsvFormat(encoding, delimiter, [], start, header_end)
+
+
+def sniff_file(path):
+    """CsvFormat of a file (reads at most SNIFF_BYTES)"""
+    with open(path, 'rb') as f:
+        return sniff(f.read(SNIFF_BYTES))
+
+
+def check_columns(path, required):
+    """
+    Fail fast if a file lacks any of the required columns; returns its CsvFormat
+
+    Raises:
+        CsvFormatError: unreadable format or missing columns
+    """
+    fmt = sniff_file(path)
+    missing = [name for name in required if name not in fmt.header]
+    if missing:
+        raise CsvFormatError(f"{os.path.basename(path)} is missing column(s): {', '.join(missing)}")
+    return fmt
+
+
+def schema_fingerprint(fmt):
+    """Short hash identifying an export format (delimiter + normalized header)"""
+    text = fmt.delimiter + '\x1f'.join(fmt.header)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def projection(fmt, columns):
+    """
+    (names, indexes, missing) for the requested columns in a file's header
+
+    names/indexes are the requested columns present in the header (in the
+    requested order) and their field positions; missing are the others.
+    Names are matched after normalize_header(); the result is cached per
+    schema fingerprint.
+    """
+    key = (schema_fingerprint(fmt), tuple(columns))
+    cached = _projections.get(key)
+    if cached is None:
+        positions = {}
+        for i, name in enumerate(fmt.header):
+            positions.setdefault(name, i)
+        names, indexes, missing = [], [], []
+        for name in columns:
+            i = positions.get(normalize_header(name))
+            if i is None:
+                missing.append(name)
+            else:
+                names.append(name)
+                indexes.append(i)
+        cached = _projections[key] = (tuple(names), tuple(indexes), tuple(missing))
+    return cached
+
+
+def iter_columns(path, columns, encoding=None, start=None, end=None):
+    """
+    Yield {column: value} dicts for the requested columns of each data row.
+
+    Columns missing from the header or from a short row are None (the same
+    as csv.DictReader). Column names are matched after normalize_header().
+    start/end limit the rows to a byte range whose start is a record
+    boundary (see parallel_csv.py). encoding overrides the sniffed one.
+    """
+    with mapped(path) as buf:
+        if buf is None:
+            return
+        fmt = sniff(buf)
+        encoding = encoding or fmt.encoding
+        delimiter = fmt.delimiter
+        separator = delimiter.encode('ascii')
+        names, indexes, missing = projection(fmt, columns)
+        wanted = list(zip(names, indexes))
+        min_fields = max(indexes, default=-1) + 1
+
+        data_start = fmt.data_start
+        for record, quoted in iter_records(buf, data_start if start is None else max(start, data_start), end):
+            if not record:
+                continue
+            if quoted:
+                fields = parse_quoted(record, encoding, delimiter)
+                row = {name: fields[i] if i < len(fields) else None for name, i in wanted}
+            else:
+                fields = record.split(separator)
+                try:
+                    if len(fields) >= min_fields:
+                        row = dict(zip(names, [fields[i].decode(encoding) for i in indexes]))
+                    else:
+                        row = {name: fields[i].decode(encoding) if i < len(fields) else None for name, i in wanted}
+                except UnicodeDecodeError:
+                    # Not valid in the sniffed encoding (e.g. a cp1252 byte in a UTF-8 export)
+                    row = {name: fields[i].decode(FALLBACK_ENCODING, 'replace') if i < len(fields) else None
+                           for name, i in wanted}
+            for name in missing:
+                row[name] = None
+            yield row
+
+
+def project_columns(input_file, output_file, columns, encoding=None):
+    """
+    Copy the named columns of a CSV (in the given order); returns the row count.
+
+    The header row is written with the given names. Unquoted rows are
+    rejoined as bytes (never decoded); rows with quotes go through
+    csv.reader/csv.writer. Output matches csv.writer (CRLF endings, minimal
+    quoting) with the input's delimiter and encoding, without a BOM.
+    Columns missing from the input are left out (see projection()).
+    """
+    from operator import itemgetter
+
+    rows = 0
+    with mapped(input_file) as buf, open(output_file, 'wb') as out:
+        if buf is None:
+            return 0
+
+        fmt = sniff(buf)
+        encoding = encoding or fmt.encoding
+        separator = fmt.delimiter.encode('ascii')
+        names, indexes, _ = projection(fmt, columns)
+        min_fields = max(indexes, default=-1) + 1
+        # itemgetter returns a bare value (not a tuple) for a single index
+        pick = itemgetter(*indexes) if len(indexes) > 1 else (lambda fields: tuple(fields[i] for i in indexes))
+
+        text_out = io.StringIO()
+        writer = csv.writer(text_out, delimiter=fmt.delimiter)
+
+        def write_quoted(fields):
+            writer.writerow(fields)
+            out.write(text_out.getvalue().encode(encoding, 'replace'))
+            text_out.seek(0)
+            text_out.truncate()
+
+        write_quoted(names)
+        rows += 1
+        for record, quoted in iter_records(buf, fmt.data_start):
+            rows += 1
+            if not record:
+                out.write(b'\r\n')
+            elif quoted:
+                fields = parse_quoted(record, encoding, fmt.delimiter)
+                write_quoted([fields[i] if i < len(fields) else '' for i in indexes])
+            else:
+                fields = record.split(separator)
+                if len(fields) >= min_fields:
+                    out.write(separator.join(pick(fields)) + b'\r\n')
+                else:
+                    out.write(separator.join([fields[i] if i < len(fields) else b'' for i in indexes]) + b'\r\n')
+    return rows
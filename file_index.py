@@ -0,0 +1,178 @@
+"""
+Processed-File Index
+====================
+Persistent record of the CSV exports the folder watcher has processed,
+kept in the history store (processed_files_snapshot.json in the watched
+folder) so it survives restarts.
+
+Each entry is keyed by path and stores the file's size, mtime and a
+content hash (BLAKE2 over the size and the first and last blocks). A file
+counts as processed when its size and mtime match the entry (no I/O beyond
+the stat the directory scan already did) or, when only the mtime changed,
+when the content hash still matches.
+
+Entries are also indexed by content hash, so a re-downloaded copy of an
+export ("Support-sessions (1).csv") can be linked to the report already
+generated for the original instead of being processed again.
+
+At startup the watcher diffs the folder against the index and catches up
+on files that arrived while it was stopped. The index keeps at most
+MAX_ENTRIES entries (least recently processed are dropped first) and
+forgets files that have been deleted.
+
+Usage:
+    from file_index import ProcessedFileIndex, content_hash
+
+    index = ProcessedFileIndex(folder)
+    if not index.is_processed(path):
+        duplicate = index.find_duplicate(content_hash(path), exclude=path)
+        ...
+        index.mark(path, status='success', report_file=report)
+        index.save()
+"""
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+from history_store import load_snapshot, save_snapshot
+
+INDEX_NAME = "processed_files"
+
+# Bump when the entry layout changes; older indexes are rebuilt
+INDEX_VERSION = 2
+
+# Bytes hashed from the start and from the end of each file
+HASH_BLOCK_BYTES = 64 * 1024
+
+MAX_ENTRIES = 5000
+
+
+def content_hash(path, block=HASH_BLOCK_BYTES):
+    """
+    BLAKE2b hex digest of a file's size, first block and last block
+
+    Reads at most 2 * block bytes however large the file is; two exports
+    with the same size and the same first and last rows are treated as the
+    same export.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        digest.update(size.to_bytes(8, 'little'))
+        digest.update(f.read(block))
+        if size > block:
+            f.seek(max(block, size - block))
+            digest.update(f.read(block))
+    return digest.hexdigest()
+
+
+class ProcessedFileIndex:
+    """Processed CSV files in one folder, keyed by (path, size, mtime, content hash)"""
+
+    def __init__(self, folder, max_entries=MAX_ENTRIES):
+        self.folder = folder
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # path -> entry, least recently processed first
+        self.by_hash = {}             # content hash -> path
+        self.loaded = False           # True if an index was found on disk
+        self.dirty = False
+
+        data = load_snapshot(folder, INDEX_NAME)
+        if data and data.get('version') == INDEX_VERSION:
+            self.loaded = True
+            for entry in sorted(data.get('files', []), key=lambda e: e.get('processed_at', 0)):
+                self.entries[entry['path']] = entry
+                if entry['status'] != 'duplicate' or entry['hash'] not in self.by_hash:
+                    self.by_hash[entry['hash']] = entry['path']
+
+    def __len__(self):
+        return len(self.entries)
+
+    def save(self):
+        """Write the index to the history store (if it changed)"""
+        if not self.dirty:
+            return
+        save_snapshot(self.folder, INDEX_NAME, {'version': INDEX_VERSION, 'files': list(self.entries.values())})
+        self.dirty = False
+
+    def get(self, path):
+        return self.entries.get(str(path))
+
+    def is_processed(self, path, stat=None):
+        """True if this exact file (same size and content) has been processed"""
+        entry = self.entries.get(str(path))
+        if entry is None:
+            return False
+
+        try:
+            stat = stat or os.stat(path)
+        except OSError:
+            return False
+
+        if entry['size'] != stat.st_size:
+            return False
+        if entry['mtime'] == stat.st_mtime_ns:
+            return True
+
+        # Same size, new mtime (touched or copied over): compare content
+        try:
+            unchanged = content_hash(path) == entry['hash']
+        except OSError:
+            return False
+        if unchanged:
+            entry['mtime'] = stat.st_mtime_ns
+            self.dirty = True
+        return unchanged
+
+    def find_duplicate(self, digest, exclude=None):
+        """
+        The entry for another file with the same content whose report still
+        exists (None if there is none)
+        """
+        path = self.by_hash.get(digest)
+        if path is None or path == str(exclude):
+            return None
+        entry = self.entries.get(path)
+        if not entry or not entry.get('report_file') or not os.path.exists(entry['report_file']):
+            return None
+        return entry
+
+    def mark(self, path, status='success', report_file=None, stat=None, digest=None):
+        """Record a file as processed (digest: its content_hash, if already known)"""
+        path = str(path)
+        stat = stat or os.stat(path)
+        self._remove(path)
+        entry = {
+            'path': path,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'hash': digest or content_hash(path),
+            'status': status,
+            'report_file': report_file,
+            'processed_at': time.time(),
+        }
+        self.entries[path] = entry
+        # A processed original wins over a duplicate that links to it
+        if status != 'duplicate' or entry['hash'] not in self.by_hash:
+            self.by_hash[entry['hash']] = path
+        while len(self.entries) > self.max_entries:
+            self._remove(next(iter(self.entries)))
+        self.dirty = True
+
+    def _remove(self, path):
+        entry = self.entries.pop(path, None)
+        if entry and self.by_hash.get(entry['hash']) == path:
+            del self.by_hash[entry['hash']]
+
+    def prune(self, existing_paths):
+        """Forget entries for files that are no longer in the folder"""
+        existing = {str(path) for path in existing_paths}
+        for path in [path for path in self.entries if path not in existing]:
+            self._remove(path)
+            self.dirty = True
+
+    def unprocessed(self, paths):
+        """The paths that are new or changed since they were indexed"""
+        return [path for path in paths if not self.is_processed(path)]
@@ -0,0 +1,87 @@
+"""
+Processing History Store
+========================
+Small file-based store kept in the watched folder (usually Downloads):
+
+- processing_history.json   list of report processing records
+- <name>_events.jsonl       append-only event streams (one JSON per line)
+- <name>_snapshot.json      latest state of something (e.g. rep status)
+
+Usage:
+    from history_store import load_history, append_event, load_snapshot
+
+    history = load_history(folder)
+    append_event(folder, "rep_status", {"time": ..., "changed": [...]})
+"""
+
+import json
+import os
+from collections import deque
+from pathlib import Path
+
+HISTORY_FILENAME = "processing_history.json"
+
+
+def _write_json_atomic(path, data, indent=2):
+    """Write JSON to a temp file and rename it over the target"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp_path, path)
+
+
+def load_history(folder):
+    """Load processing history (empty list if missing)"""
+    history_file = Path(folder) / HISTORY_FILENAME
+    if history_file.exists():
+        with open(history_file, 'r') as f:
+            return json.load(f)
+    return []
+
+
+def save_history(folder, history):
+    """Save processing history"""
+    _write_json_atomic(Path(folder) / HISTORY_FILENAME, history)
+
+
+def append_event(folder, stream, record):
+    """Append one record to an event stream"""
+    events_file = Path(folder) / f"{stream}_events.jsonl"
+    with open(events_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+def read_events(folder, stream, limit=None):
+    """Read an event stream (only the last `limit` records if given)"""
+    events_file = Path(folder) / f"{stream}_events.jsonl"
+    if not events_file.exists():
+        return []
+
+    events = deque(maxlen=limit)
+    with open(events_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue
+    return list(events)
+
+
+def save_snapshot(folder, name, data):
+    """Replace the stored snapshot for `name`"""
+    _write_json_atomic(Path(folder) / f"{name}_snapshot.json", data)
+
+
+def load_snapshot(folder, name):
+    """Load the stored snapshot for `name` (None if missing)"""
+    snapshot_file = Path(folder) / f"{name}_snapshot.json"
+    if not snapshot_file.exists():
+        return None
+    try:
+        with open(snapshot_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError:
+        return None
@@ -0,0 +1,154 @@
+"""
+Report Pipeline Instrumentation
+===============================
+Lightweight per-stage timing for the report pipeline, plus an opt-in
+profiling capture.
+
+StageTimer records monotonic wall time, row counts and bytes processed for
+each named stage (file_wait, clean, parse, aggregate, render, write). The
+watcher stores timer.as_dict() in each processing history record, and the
+dashboard shows the breakdown and p50/p95 trends.
+
+ProfileCapture wraps a block with cProfile or tracemalloc and dumps the
+result next to the report.
+
+Usage:
+    from instrumentation import StageTimer, ProfileCapture
+
+    timer = StageTimer()
+    with timer.stage('parse') as stage:
+        sessions = read_sessions(csv_file)
+        stage['rows'] = len(sessions)
+"""
+
+import math
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+PROFILE_MODES = ('cprofile', 'tracemalloc')
+
+# Number of allocation sites written to a tracemalloc dump
+TRACEMALLOC_TOP = 40
+
+
+class StageTimer:
+    """Collects per-stage timings, row counts and bytes processed"""
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name, rows=None, bytes_processed=None):
+        """Time a block; the yielded dict can be updated with rows/bytes"""
+        info = {'seconds': 0.0, 'rows': rows, 'bytes': bytes_processed}
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            info['seconds'] = time.perf_counter() - start
+            existing = self.stages.get(name)
+            if existing:
+                # Same stage entered twice (e.g. several input files): accumulate
+                existing['seconds'] += info['seconds']
+                for key in ('rows', 'bytes'):
+                    if info[key] is not None:
+                        existing[key] = (existing[key] or 0) + info[key]
+            else:
+                self.stages[name] = info
+
+    @property
+    def total_seconds(self):
+        return sum(info['seconds'] for info in self.stages.values())
+
+    def as_dict(self):
+        """Stage breakdown for JSON history records"""
+        return {
+            name: {key: (round(value, 4) if key == 'seconds' else value)
+                   for key, value in info.items() if value is not None}
+            for name, info in self.stages.items()
+        }
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def stage_trends(history, percentiles=(50, 95)):
+    """
+    Per-stage percentiles over the processing history.
+
+    Returns:
+        {stage: {'count': n, 'p50': seconds, 'p95': seconds}}
+    """
+    samples = {}
+    for record in history:
+        for name, info in (record.get('stages') or {}).items():
+            samples.setdefault(name, []).append(info.get('seconds', 0.0))
+
+    return {
+        name: dict({'count': len(values)}, **{f'p{pct}': percentile(values, pct) for pct in percentiles})
+        for name, values in samples.items()
+    }
+
+
+class ProfileCapture:
+    """
+    Opt-in profiler around a block of work.
+
+    mode is 'cprofile', 'tracemalloc' or None (disabled). After the block,
+    call dump(path_stem) to write <stem>.prof (cProfile) or
+    <stem>.tracemalloc.txt next to the report.
+    """
+
+    def __init__(self, mode=None):
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (choose from {', '.join(PROFILE_MODES)})")
+        self.mode = mode
+        self._profiler = None
+        self._snapshot = None
+        self._peak = None
+
+    def __enter__(self):
+        if self.mode == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.mode == 'tracemalloc':
+            import tracemalloc
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.mode == 'cprofile':
+            self._profiler.disable()
+        elif self.mode == 'tracemalloc':
+            import tracemalloc
+            self._snapshot = tracemalloc.take_snapshot()
+            self._peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return False
+
+    def dump(self, path_stem):
+        """Write the captured profile; returns the file path (None if disabled)"""
+        path_stem = Path(path_stem)
+
+        if self.mode == 'cprofile' and self._profiler is not None:
+            profile_file = path_stem.with_name(path_stem.name + '.prof')
+            self._profiler.dump_stats(str(profile_file))
+            return profile_file
+
+        if self.mode == 'tracemalloc' and self._snapshot is not None:
+            profile_file = path_stem.with_name(path_stem.name + '.tracemalloc.txt')
+            with open(profile_file, 'w', encoding='utf-8') as f:
+                f.write(f"Peak traced memory: {self._peak / (1024 * 1024):.1f} MB\n\n")
+                for stat in self._snapshot.statistics('lineno')[:TRACEMALLOC_TOP]:
+                    f.write(f"{stat}\n")
+            return profile_file
+
+        return None
@@ -0,0 +1,352 @@
+"""
+IP Address to Region Classifier
+===============================
+Classifies customer IPs (IPv4 and IPv6) into regions using an offline
+range table (ip_regions.csv: "cidr,region" lines).
+
+The CSV is compiled once into a flat binary table (ip_regions.bin) of sorted,
+non-overlapping integer intervals. The binary table is memory-mapped and
+searched with bisect, so loading is nearly free and each lookup is a binary
+search over packed integers. Repeat IPs are answered from an LRU cache.
+
+Each IP is parsed once, with socket.inet_pton, into (address string,
+version, integer); lookups take the integer, so no ipaddress objects are
+built on the per-session path. If the source directory is read-only, the
+compiled table is kept in the user cache directory instead.
+
+Usage:
+    from ip_regions import classify_ip, classify_address, parse_address, parse_ip
+
+    classify_ip("8.8.8.8")          # 'North America'
+    parse_ip("203.0.113.7:51234")   # '203.0.113.7'
+
+    ip, version, value = parse_address("203.0.113.7:51234")
+    classify_address(version, value)
+
+Import RIR delegated-stats files into a more detailed range table:
+    python ip_regions.py import delegated-arin-extended-latest ... > ip_regions.csv
+"""
+
+import bisect
+import heapq
+import ipaddress
+import json
+import mmap
+import os
+import socket
+import struct
+import sys
+from array import array
+from functools import lru_cache
+from pathlib import Path
+
+RANGE_FILE = Path(__file__).parent / "ip_regions.csv"
+TABLE_FILE = Path(__file__).parent / "ip_regions.bin"
+
+# Where the table is compiled when the source directory is read-only
+CACHE_DIRNAME = "beyondtrust_reports"
+
+DEFAULT_REGION = 'Other'
+
+# Size of the repeat-IP cache
+LOOKUP_CACHE_SIZE = 65536
+
+# Binary table layout: magic, counts, region-name JSON, then 8-byte aligned arrays
+_MAGIC = b'BTIPRG01'
+_HEADER = struct.Struct('<8sIII')  # magic, ipv4 count, ipv6 count, names length
+
+# Regional Internet Registry -> region (used when importing delegated-stats files)
+RIR_REGIONS = {
+    'arin': 'North America',
+    'ripencc': 'Europe',
+    'apnic': 'Asia Pacific',
+    'lacnic': 'Latin America',
+    'afrinic': 'Africa',
+}
+
+
+def parse_address(value):
+    """
+    Parse a "Customer's Public IP" value.
+
+    Accepts "1.2.3.4", "1.2.3.4:5678", "2001:db8::1" and "[2001:db8::1]:443".
+
+    Returns:
+        (normalized address string, IP version, address as int), or None if
+        the value is not an IP
+    """
+    value = (value or '').strip()
+    if not value:
+        return None
+
+    if value.startswith('['):
+        value = value[1:value.find(']')]
+    elif value.count(':') == 1:
+        value = value.split(':', 1)[0]
+
+    try:
+        if ':' not in value:
+            # inet_pton only accepts the canonical dotted quad, so value is already normalized
+            return value, 4, int.from_bytes(socket.inet_pton(socket.AF_INET, value), 'big')
+        packed = socket.inet_pton(socket.AF_INET6, value)
+    except (OSError, ValueError):
+        return None
+    return socket.inet_ntop(socket.AF_INET6, packed), 6, int.from_bytes(packed, 'big')
+
+
+def parse_ip(value):
+    """Normalized address string from a "Customer's Public IP" value (None if not an IP)"""
+    parsed = parse_address(value)
+    return parsed[0] if parsed else None
+
+
+def user_cache_dir():
+    """Per-user cache directory (LOCALAPPDATA on Windows, XDG_CACHE_HOME or ~/.cache elsewhere)"""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / CACHE_DIRNAME
+
+
+def _table_is_stale(range_file, table_file):
+    """True if table_file is missing or older than the range file"""
+    return not table_file.exists() or (range_file.exists() and
+                                       range_file.stat().st_mtime > table_file.stat().st_mtime)
+
+
+def read_range_file(range_file=RANGE_FILE):
+    """Yield (network, region) pairs from a range CSV"""
+    with open(range_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or line.startswith('cidr,'):
+                continue
+            cidr, _, region = line.partition(',')
+            try:
+                network = ipaddress.ip_network(cidr.strip(), strict=False)
+            except ValueError:
+                continue
+            yield network, region.strip() or DEFAULT_REGION
+
+
+def _flatten(ranges):
+    """
+    Turn possibly overlapping (start, end, region) ranges into sorted,
+    non-overlapping ones where the most specific range wins.
+    """
+    if not ranges:
+        return []
+
+    points = sorted({start for start, _, _ in ranges} | {end + 1 for _, end, _ in ranges})
+    by_start = sorted(ranges)
+
+    flat = []
+    active = []  # heap of (size, end, region)
+    next_range = 0
+
+    for i in range(len(points) - 1):
+        seg_start, seg_end = points[i], points[i + 1] - 1
+
+        while next_range < len(by_start) and by_start[next_range][0] <= seg_start:
+            start, end, region = by_start[next_range]
+            heapq.heappush(active, (end - start, end, region))
+            next_range += 1
+        while active and active[0][1] < seg_start:
+            heapq.heappop(active)
+
+        # Smallest active range that still covers this segment
+        region = None
+        for size, end, candidate in sorted(active):
+            if end >= seg_end:
+                region = candidate
+                break
+        if region is None:
+            continue
+
+        if flat and flat[-1][2] == region and flat[-1][1] + 1 == seg_start:
+            flat[-1] = (flat[-1][0], seg_end, region)
+        else:
+            flat.append((seg_start, seg_end, region))
+
+    return flat
+
+
+def build_table(range_file=RANGE_FILE, table_file=TABLE_FILE):
+    """Compile the range CSV into the binary interval table"""
+    v4, v6 = [], []
+    for network, region in read_range_file(range_file):
+        target = v4 if network.version == 4 else v6
+        target.append((int(network.network_address), int(network.broadcast_address), region))
+
+    v4, v6 = _flatten(v4), _flatten(v6)
+
+    names = sorted({region for _, _, region in v4 + v6})
+    name_index = {name: i for i, name in enumerate(names)}
+    names_blob = json.dumps(names).encode('utf-8')
+
+    def pad(data):
+        return data + b'\0' * (-len(data) % 8)
+
+    parts = [_HEADER.pack(_MAGIC, len(v4), len(v6), len(names_blob))]
+    parts.append(pad(names_blob))
+
+    mask = (1 << 64) - 1
+    parts.append(pad(array('I', [start for start, _, _ in v4]).tobytes()))
+    parts.append(pad(array('I', [end for _, end, _ in v4]).tobytes()))
+    parts.append(pad(array('H', [name_index[region] for _, _, region in v4]).tobytes()))
+    parts.append(array('Q', [start >> 64 for start, _, _ in v6]).tobytes())
+    parts.append(array('Q', [start & mask for start, _, _ in v6]).tobytes())
+    parts.append(array('Q', [end >> 64 for _, end, _ in v6]).tobytes())
+    parts.append(array('Q', [end & mask for _, end, _ in v6]).tobytes())
+    parts.append(pad(array('H', [name_index[region] for _, _, region in v6]).tobytes()))
+
+    tmp_file = Path(str(table_file) + '.tmp')
+    with open(tmp_file, 'wb') as f:
+        f.write(b''.join(parts))
+    os.replace(tmp_file, table_file)
+
+
+class _U128View:
+    """Read-only sequence of 128-bit ints stored as high/low 64-bit arrays"""
+
+    def __init__(self, high, low):
+        self.high = high
+        self.low = low
+
+    def __len__(self):
+        return len(self.high)
+
+    def __getitem__(self, i):
+        return (self.high[i] << 64) | self.low[i]
+
+
+class IPRegionClassifier:
+    """Bisect-based lookups over the memory-mapped interval table"""
+
+    def __init__(self, range_file=RANGE_FILE, table_file=TABLE_FILE):
+        range_file, table_file = Path(range_file), Path(table_file)
+
+        # (Re)build the table only when the range file is newer
+        if _table_is_stale(range_file, table_file):
+            try:
+                build_table(range_file, table_file)
+            except OSError:
+                # Read-only install: compile into the user cache directory instead
+                table_file = user_cache_dir() / table_file.name
+                if _table_is_stale(range_file, table_file):
+                    table_file.parent.mkdir(parents=True, exist_ok=True)
+                    build_table(range_file, table_file)
+        self.table_file = table_file
+
+        self._file = open(table_file, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._load_views(memoryview(self._map))
+
+    def _load_views(self, buf):
+        magic, n4, n6, names_len = _HEADER.unpack_from(buf, 0)
+        if magic != _MAGIC:
+            raise ValueError("Not an IP region table")
+
+        offset = _HEADER.size
+        self.regions = json.loads(bytes(buf[offset:offset + names_len]).decode('utf-8'))
+        offset += names_len + (-names_len % 8)
+
+        def take(fmt, count, itemsize):
+            nonlocal offset
+            view = buf[offset:offset + count * itemsize].cast(fmt)
+            size = count * itemsize
+            offset += size + (-size % 8)
+            return view
+
+        self._v4_starts = take('I', n4, 4)
+        self._v4_ends = take('I', n4, 4)
+        self._v4_regions = take('H', n4, 2)
+        v6_start_high = take('Q', n6, 8)
+        v6_start_low = take('Q', n6, 8)
+        v6_end_high = take('Q', n6, 8)
+        v6_end_low = take('Q', n6, 8)
+        self._v6_regions = take('H', n6, 2)
+        self._v6_starts = _U128View(v6_start_high, v6_start_low)
+        self._v6_ends = _U128View(v6_end_high, v6_end_low)
+
+    def lookup(self, value, version=4):
+        """Region for an address given as an int (see parse_address)"""
+        if version == 6 and value >> 32 == 0xffff:
+            # IPv4-mapped (::ffff:a.b.c.d)
+            value, version = value & 0xffffffff, 4
+
+        if version == 4:
+            starts, ends, regions = self._v4_starts, self._v4_ends, self._v4_regions
+        else:
+            starts, ends, regions = self._v6_starts, self._v6_ends, self._v6_regions
+
+        i = bisect.bisect_right(starts, value) - 1
+        if i >= 0 and value <= ends[i]:
+            return self.regions[regions[i]]
+        return DEFAULT_REGION
+
+    def classify(self, ip):
+        """Region for an IP string (with or without port); Other if unparseable"""
+        parsed = parse_address(ip)
+        if parsed is None:
+            return DEFAULT_REGION
+        return self.lookup(parsed[2], parsed[1])
+
+
+_classifier = None
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def classify_address(version, value):
+    """Region for an already-parsed address (see parse_address), with the shared classifier (cached)"""
+    global _classifier
+    if _classifier is None:
+        _classifier = IPRegionClassifier()
+    return _classifier.lookup(value, version)
+
+
+def classify_ip(ip):
+    """Classify an IP string with the shared classifier"""
+    parsed = parse_address(ip)
+    if parsed is None:
+        return DEFAULT_REGION
+    return classify_address(parsed[1], parsed[2])
+
+
+def import_delegated_stats(paths, out=sys.stdout):
+    """Convert RIR delegated-stats files into range CSV lines"""
+    out.write("cidr,region\n")
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                fields = line.strip().split('|')
+                if len(fields) < 7 or line.startswith('#'):
+                    continue
+                registry, _, kind, start, value, _, status = fields[:7]
+                if kind not in ('ipv4', 'ipv6') or status not in ('allocated', 'assigned'):
+                    continue
+                region = RIR_REGIONS.get(registry, DEFAULT_REGION)
+                try:
+                    if kind == 'ipv4':
+                        first = ipaddress.IPv4Address(start)
+                        last = first + int(value) - 1
+                        networks = ipaddress.summarize_address_range(first, last)
+                    else:
+                        networks = [ipaddress.IPv6Network(f"{start}/{value}", strict=False)]
+                except ValueError:
+                    continue
+                for network in networks:
+                    out.write(f"{network},{region}\n")
+
+
+def main():
+    if len(sys.argv) >= 3 and sys.argv[1] == 'import':
+        import_delegated_stats(sys.argv[2:])
+    elif len(sys.argv) >= 2 and sys.argv[1] == 'build':
+        build_table()
+        print(f"[OK] Built {TABLE_FILE}")
+    else:
+        for ip in sys.argv[1:]:
+            print(f"{ip}: {classify_ip(ip)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Queued, Rotating Logging for the Folder Watcher
+===============================================
+Log calls on the processing path only put the record on a queue
+(QueueHandler); a QueueListener thread does the formatting and the file
+and console I/O.
+
+The log file is rotated so it stays bounded:
+    size      - at max_bytes (default 5 MB)
+    midnight  - once a day
+Rotated files keep `backup_count` generations and can be gzip-compressed
+(report_processing.log.1.gz, ...).
+
+With json_logs the file gets one JSON object per line (time, level,
+logger, message - which includes any traceback - and `extra` fields) for
+machine parsing; the console keeps the plain text format.
+
+Usage:
+    from log_setup import setup_queued_logging
+
+    logger, listener = setup_queued_logging('ReportWatcher', log_file, rotate='size', compress=True)
+    logger.info("...")
+    listener.stop()   # flushes queued records
+"""
+
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+from datetime import datetime
+
+ROTATE_MODES = ('size', 'midnight')
+
+# Size rotation threshold and number of rotated files kept
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 5
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# LogRecord attributes that are not `extra` fields
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+def _gzip_namer(name):
+    return name + '.gz'
+
+
+def _gzip_rotator(source, dest):
+    """Compress a rotated log file"""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def rotating_file_handler(log_file, rotate='size', max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT, compress=False):
+    """RotatingFileHandler / TimedRotatingFileHandler for log_file"""
+    if rotate not in ROTATE_MODES:
+        raise ValueError(f"Unknown log rotation: {rotate} (choose from {', '.join(ROTATE_MODES)})")
+
+    if rotate == 'size':
+        handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                       encoding='utf-8')
+    else:
+        handler = logging.handlers.TimedRotatingFileHandler(log_file, when='midnight', backupCount=backup_count,
+                                                            encoding='utf-8')
+    if compress:
+        handler.namer = _gzip_namer
+        handler.rotator = _gzip_rotator
+    return handler
+
+
+def setup_queued_logging(name, log_file, level=logging.INFO, rotate='size', max_bytes=MAX_BYTES,
+                         backup_count=BACKUP_COUNT, compress=False, json_logs=False, console=True):
+    """
+    Attach a QueueHandler to the named logger, with a QueueListener
+    writing to a rotating log file (and the console).
+
+    Returns:
+        (logger, listener); call listener.stop() at shutdown
+    """
+    file_handler = rotating_file_handler(log_file, rotate, max_bytes, backup_count, compress)
+    file_handler.setFormatter(JsonFormatter() if json_logs else logging.Formatter(TEXT_FORMAT))
+    handlers = [file_handler]
+
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(console_handler)
+
+    for handler in handlers:
+        handler.setLevel(level)
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    # Replace the queue handler of an earlier setup (e.g. a second watcher in one process)
+    for handler in list(logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            logger.removeHandler(handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    return logger, listener
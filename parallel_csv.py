@@ -0,0 +1,172 @@
+"""
+Parallel CSV Parsing
+====================
+Parses a large export on several cores: the data rows are split into byte
+ranges at record boundaries, each range is parsed and aggregated in a
+process pool, and the partial results are merged.
+
+Split points are quote-aware: a candidate newline is only used if the
+number of quote characters before it is even, so a quoted field that
+contains a newline is never cut in half.
+
+Each worker returns mergeable partials - per-day SessionAggregates and the
+(epoch, rep, timezone) keys for the session payload - so the merged result
+is the same as the single-process parse + aggregate_sessions.
+
+Usage:
+    from parallel_csv import parse_parallel
+
+    result = parse_parallel(csv_file, workers=16)
+    totals = merge_days(result['days'])
+"""
+
+import os
+
+from aggregate_cache import SessionAggregate, SESSION_FIELDS, parse_started
+from fast_csv import BLOCK_SIZE, mapped, sniff, iter_columns
+from session_payload import session_key
+
+# Exports smaller than this are parsed in-process (pool start-up costs more)
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+
+# Chunks per worker, so one slow chunk doesn't leave the other cores idle
+CHUNKS_PER_WORKER = 4
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def should_parallelize(csv_file, workers=None):
+    """True if csv_file should be parsed with parse_parallel()"""
+    if workers is None:
+        return default_workers() > 1 and os.path.getsize(csv_file) >= PARALLEL_THRESHOLD
+    return workers > 1
+
+
+def _count_quotes(buf, start, end):
+    """Quote characters in buf[start:end], counted one block at a time"""
+    count = 0
+    for pos in range(start, end, BLOCK_SIZE):
+        count += buf[pos:min(end, pos + BLOCK_SIZE)].count(b'"')
+    return count
+
+
+def split_points(csv_file, chunks):
+    """
+    Byte offsets [start, ..., end] that split the data rows into about
+    `chunks` ranges, each starting at a record boundary.
+    """
+    with mapped(csv_file) as buf:
+        if buf is None:
+            return [0, 0]
+
+        data_start = sniff(buf).data_start
+        size = len(buf)
+        points = [data_start]
+
+        # Quote parity is tracked from data_start to scan_pos
+        scan_pos = data_start
+        inside_quotes = False
+        for i in range(1, chunks):
+            target = data_start + (size - data_start) * i // chunks
+            if target <= points[-1]:
+                continue
+
+            newline = buf.find(b'\n', max(target, scan_pos))
+            while newline >= 0:
+                if _count_quotes(buf, scan_pos, newline) % 2:
+                    inside_quotes = not inside_quotes
+                scan_pos = newline
+                if not inside_quotes:
+                    break
+                newline = buf.find(b'\n', newline + 1)
+
+            if newline < 0 or newline + 1 >= size:
+                break
+            points.append(newline + 1)
+
+        points.append(size)
+    return points
+
+
+def empty_result():
+    """An empty partial: {'rows', 'first', 'days', 'keys'}"""
+    return {'rows': 0, 'first': None, 'days': {}, 'keys': []}
+
+
+def accumulate(result, rows, distinct_mode='auto'):
+    """Add session rows to a partial result (rows without 'Started' are skipped)"""
+    days = result['days']
+    keys = result['keys']
+    for row in rows:
+        if not row.get('Started'):
+            continue
+        if result['first'] is None:
+            result['first'] = row
+
+        started = parse_started(row['Started'])
+        day = started.date().isoformat()
+        aggregate = days.get(day)
+        if aggregate is None:
+            aggregate = days[day] = SessionAggregate(distinct_mode)
+        aggregate.add_session(row, started)
+        keys.append(session_key(row, started))
+
+    result['rows'] = len(keys)
+    return result
+
+
+def parse_chunk(task):
+    """
+    Parse and aggregate one byte range (runs in a worker process).
+
+    Returns:
+        {'rows': n, 'first': first session row, 'days': {day: SessionAggregate},
+         'keys': [session_key(), ...]}
+    """
+    csv_file, start, end, distinct_mode, columns = task
+    return accumulate(empty_result(), iter_columns(csv_file, columns, start=start, end=end), distinct_mode)
+
+
+def merge_chunks(results):
+    """Reduce parse_chunk() results (in file order) into one result"""
+    merged = empty_result()
+    for result in results:
+        merged['rows'] += result['rows']
+        if merged['first'] is None:
+            merged['first'] = result['first']
+        for day, aggregate in result['days'].items():
+            if day in merged['days']:
+                merged['days'][day].merge(aggregate)
+            else:
+                merged['days'][day] = aggregate
+        merged['keys'].extend(result['keys'])
+    return merged
+
+
+def parse_parallel(csv_file, distinct_mode='auto', workers=None, columns=None, executor=None):
+    """
+    Parse and aggregate csv_file in a process pool.
+
+    Args:
+        workers: Pool size (default: all cores)
+        columns: Columns to decode (default: aggregate_cache.SESSION_FIELDS)
+        executor: An existing concurrent.futures executor to reuse instead
+            of starting a pool for this call
+
+    Returns:
+        merge_chunks() result: rows, first session row, {day: SessionAggregate}
+        and the session payload keys
+    """
+    workers = workers or default_workers()
+    points = split_points(csv_file, workers * CHUNKS_PER_WORKER)
+    tasks = [(str(csv_file), start, end, distinct_mode, tuple(columns or SESSION_FIELDS))
+             for start, end in zip(points, points[1:])]
+
+    if executor is not None:
+        return merge_chunks(executor.map(parse_chunk, tasks))
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)) or 1) as pool:
+        return merge_chunks(pool.map(parse_chunk, tasks))
@@ -0,0 +1,193 @@
+"""
+Quantile Sketches
+=================
+KLL sketch for approximate quantiles (median / p90 / p99 handle time) in
+constant memory. Values are kept exactly until the sketch fills up; after
+that, each level holds a sorted sample in which every value stands for
+2^level of the values seen.
+
+Sketches are mergeable (level-wise concatenation, then compaction), so
+per-day sketches stored in the aggregate cache can be combined into
+monthly or yearly percentiles without keeping the raw values.
+
+Usage:
+    from quantile_sketch import KllSketch
+
+    sketch = KllSketch()
+    sketch.update([12, 35, 7, 90])
+    sketch.percentiles(), sketch.rank_error
+"""
+
+import math
+
+# Top-level capacity: ~1.3% rank error, at most ~3 * k values kept
+DEFAULT_K = 200
+
+# Capacity ratio between a level and the one above it
+CAPACITY_RATIO = 2 / 3
+
+# Smallest capacity of any level (keeps the bottom levels from compacting every few values)
+MIN_CAPACITY = 8
+
+# Percentiles reported for handle time
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+class KllSketch:
+    """KLL quantile sketch over numeric values"""
+
+    def __init__(self, k=DEFAULT_K):
+        if k < 8:
+            raise ValueError(f"k must be at least 8, got {k}")
+        self.k = k
+        self.count = 0
+        self.levels = [[]]       # levels[h]: values of weight 2^h
+        self.compactions = 0     # bit h: parity of compactions at level h
+        self._min = None         # extremes of values compacted out of level 0
+        self._max = None
+        self._size = 0
+        self._max_size = self._capacity(0)
+
+    def __len__(self):
+        return self.count
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(MIN_CAPACITY, int(math.ceil(self.k * CAPACITY_RATIO ** depth)))
+
+    def _grow(self):
+        self.levels.append([])
+        self._max_size = sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def add(self, value):
+        """Add one value"""
+        self.levels[0].append(value)
+        self.count += 1
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def _track(self, values):
+        """Remember the extremes of values about to leave level 0"""
+        low, high = min(values), max(values)
+        if self._min is None or low < self._min:
+            self._min = low
+        if self._max is None or high > self._max:
+            self._max = high
+
+    @property
+    def min_value(self):
+        values = self.levels[0] + ([self._min] if self._min is not None else [])
+        return min(values) if values else None
+
+    @property
+    def max_value(self):
+        values = self.levels[0] + ([self._max] if self._max is not None else [])
+        return max(values) if values else None
+
+    def update(self, values):
+        """Add many values"""
+        for value in values:
+            self.add(value)
+
+    def _compress(self):
+        """Compact levels that are over capacity until the sketch fits"""
+        while self._size >= self._max_size:
+            for level, items in enumerate(self.levels):
+                if len(items) >= self._capacity(level):
+                    break
+            else:
+                return
+            if level + 1 == len(self.levels):
+                self._grow()
+
+            if level == 0:
+                self._track(items)
+            items.sort()
+            # An odd value out stays at this level
+            keep = [items.pop()] if len(items) % 2 else []
+            # Alternate which half survives, so compactions don't bias the sketch
+            offset = (self.compactions >> level) & 1
+            self.compactions ^= 1 << level
+            promoted = items[offset::2]
+            self.levels[level + 1].extend(promoted)
+            self.levels[level] = keep
+            self._size -= len(items) - len(promoted)
+
+    def merge(self, other):
+        """Merge another sketch into this one (in place)"""
+        if other.k != self.k:
+            raise ValueError("Cannot merge sketches with different k")
+        if not other.count:
+            return self
+        while len(self.levels) < len(other.levels):
+            self._grow()
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        if other._min is not None:
+            self._track((other._min, other._max))
+        self.count += other.count
+        self._size = sum(len(items) for items in self.levels)
+        self._compress()
+        return self
+
+    @property
+    def is_exact(self):
+        """True while every value added is still kept"""
+        return len(self.levels) == 1
+
+    @property
+    def rank_error(self):
+        """Approximate rank error of quantile() (e.g. 0.013 = 1.3%; 0.0 when exact)"""
+        return 0.0 if self.is_exact else 2.296 / self.k ** 0.9723
+
+    def quantile(self, q):
+        """Value at fraction q (0..1) of the sorted values (None if empty)"""
+        if not self.count:
+            return None
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be between 0 and 1, got {q}")
+        if q == 0:
+            return self.min_value
+        if q == 1:
+            return self.max_value
+
+        weighted = sorted((value, 1 << level) for level, items in enumerate(self.levels) for value in items)
+        target = q * self.count
+        seen = 0
+        for value, weight in weighted:
+            seen += weight
+            if seen >= target:
+                return value
+        return self.max_value
+
+    def percentiles(self, percentiles=DEFAULT_PERCENTILES):
+        """{percentile: value} for percentiles like (50, 90, 99)"""
+        return {p: self.quantile(p / 100) for p in percentiles}
+
+    def to_dict(self):
+        """Serialize for JSON storage"""
+        return {
+            'k': self.k,
+            'count': self.count,
+            'min': self.min_value,
+            'max': self.max_value,
+            'compactions': self.compactions,
+            'levels': self.levels,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Deserialize from to_dict() output"""
+        sketch = cls(data['k'])
+        levels = data['levels']
+        if not levels or sum(len(items) << level for level, items in enumerate(levels)) != data['count']:
+            raise ValueError("Corrupt sketch levels")
+        sketch.levels = [list(items) for items in levels]
+        sketch.count = data['count']
+        if data['min'] is not None:
+            sketch._track((data['min'], data['max']))
+        sketch.compactions = data.get('compactions', 0)
+        sketch._size = sum(len(items) for items in sketch.levels)
+        sketch._max_size = sum(sketch._capacity(level) for level in range(len(sketch.levels)))
+        return sketch
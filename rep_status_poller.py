@@ -0,0 +1,224 @@
+"""
+Live Representative Status Poller
+=================================
+Polls the Command API (get_logged_in_reps) for live representative
+availability and publishes only the changes:
+
+- Each change set is appended to rep_status_events.jsonl
+- The latest state is saved to rep_status_snapshot.json
+- The dashboard (report_dashboard.html) is regenerated when something changed
+
+The polling interval adapts: it drops to the minimum right after a change
+and backs off gradually (up to the maximum) while nothing changes or the
+appliance is unreachable, so a quiet team costs very few requests.
+
+Usage:
+    python rep_status_poller.py [folder] [--min-interval N] [--max-interval N]
+
+To stop: Press Ctrl+C
+"""
+
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from history_store import append_event, save_snapshot, load_snapshot
+from command_api import COMMAND_ENDPOINT, CommandAPIError, get_logged_in_reps
+
+# Polling interval bounds (seconds)
+DEFAULT_MIN_INTERVAL = 15
+DEFAULT_MAX_INTERVAL = 300
+
+# Interval multiplier applied after a poll with no changes
+BACKOFF_FACTOR = 1.5
+
+SNAPSHOT_NAME = "rep_status"
+
+
+def rep_state(rep):
+    """Collapse a RepStatus into a single availability state"""
+    if rep.routing_busy:
+        return 'busy'
+    if rep.routing_idle:
+        return 'idle'
+    if rep.routing_available:
+        return 'available'
+    return 'unavailable'
+
+
+def build_snapshot(reps):
+    """Map rep id (as string, for JSON) -> current state"""
+    return {
+        str(rep.id): {
+            'name': rep.display_name,
+            'state': rep_state(rep),
+            'session_count': rep.session_count,
+        }
+        for rep in reps
+    }
+
+
+def diff_snapshots(previous, current):
+    """
+    Compare two snapshots.
+
+    Returns:
+        Dict with joined, left and changed lists (empty lists if nothing changed)
+    """
+    joined = [dict(current[rep_id], id=rep_id) for rep_id in current.keys() - previous.keys()]
+    left = [dict(previous[rep_id], id=rep_id) for rep_id in previous.keys() - current.keys()]
+
+    changed = []
+    for rep_id in current.keys() & previous.keys():
+        old, new = previous[rep_id], current[rep_id]
+        if old['state'] != new['state'] or old['session_count'] != new['session_count']:
+            changed.append({
+                'id': rep_id,
+                'name': new['name'],
+                'from': old['state'],
+                'to': new['state'],
+                'session_count': new['session_count'],
+            })
+
+    return {'joined': joined, 'left': left, 'changed': changed}
+
+
+def summarize_states(snapshot):
+    """Count reps per state"""
+    counts = {'available': 0, 'busy': 0, 'idle': 0, 'unavailable': 0}
+    for rep in snapshot.values():
+        counts[rep['state']] = counts.get(rep['state'], 0) + 1
+    return counts
+
+
+class RepStatusPoller:
+    def __init__(self, api, folder, min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL,
+                 update_dashboard=True):
+        self.api = api
+        self.folder = Path(folder)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.update_dashboard = update_dashboard
+        self.interval = min_interval
+        self.polls = 0
+        self.deltas_published = 0
+
+        # Resume from the last published state so a restart doesn't re-announce everyone
+        stored = load_snapshot(self.folder, SNAPSHOT_NAME)
+        self.snapshot = stored['reps'] if stored else None
+
+    def _publish(self, current, delta):
+        """Write the change set, the new snapshot and the dashboard"""
+        now = datetime.now().isoformat(timespec='seconds')
+
+        if delta is not None:
+            append_event(self.folder, SNAPSHOT_NAME, dict(delta, time=now))
+            self.deltas_published += 1
+
+        save_snapshot(self.folder, SNAPSHOT_NAME, {
+            'updated': now,
+            'counts': summarize_states(current),
+            'reps': current,
+        })
+
+        if self.update_dashboard:
+            from view_dashboard import write_dashboard
+            write_dashboard(self.folder)
+
+    def poll_once(self):
+        """
+        Poll once and publish any changes.
+
+        Returns:
+            The delta dict, or None if nothing changed
+        """
+        self.polls += 1
+        current = build_snapshot(get_logged_in_reps(self.api))
+
+        if self.snapshot is None:
+            # First poll with no stored state: publish the baseline only
+            self._publish(current, None)
+            self.snapshot = current
+            return None
+
+        delta = diff_snapshots(self.snapshot, current)
+        self.snapshot = current
+
+        if not (delta['joined'] or delta['left'] or delta['changed']):
+            return None
+
+        self._publish(current, delta)
+        return delta
+
+    def _next_interval(self, changed):
+        """Reset to the minimum after a change, otherwise back off"""
+        if changed:
+            return self.min_interval
+        return min(self.max_interval, self.interval * BACKOFF_FACTOR)
+
+    def run(self):
+        """Poll until interrupted"""
+        if not self.api.is_endpoint_available(COMMAND_ENDPOINT, {"action": "get_logged_in_reps"}):
+            print("[ERROR] get_logged_in_reps is not available (see api_capabilities.json)")
+            return
+
+        print(f"[POLLING] Rep status every {self.min_interval}-{self.max_interval}s")
+        print(f"[PUBLISH] {self.folder}")
+        print(f"(Press Ctrl+C to stop)\n")
+
+        try:
+            while True:
+                try:
+                    delta = self.poll_once()
+                    changed = delta is not None
+                    if changed:
+                        stamp = datetime.now().strftime('%H:%M:%S')
+                        print(f"[{stamp}] {len(delta['joined'])} joined, {len(delta['left'])} left, "
+                              f"{len(delta['changed'])} changed")
+                except CommandAPIError as e:
+                    print(f"[ERROR] Command API: {e}")
+                    changed = False
+                except Exception as e:
+                    print(f"[ERROR] Poll failed: {e}")
+                    changed = False
+
+                self.interval = self._next_interval(changed)
+                time.sleep(self.interval)
+
+        except KeyboardInterrupt:
+            print(f"\n[STOPPED] {self.polls} polls, {self.deltas_published} change sets published")
+
+
+def main():
+    print("=" * 60)
+    print("BeyondTrust Live Representative Status")
+    print("=" * 60)
+    print()
+
+    args = sys.argv[1:]
+    min_interval = DEFAULT_MIN_INTERVAL
+    max_interval = DEFAULT_MAX_INTERVAL
+
+    if "--min-interval" in args:
+        i = args.index("--min-interval")
+        min_interval = float(args[i + 1])
+        del args[i:i + 2]
+    if "--max-interval" in args:
+        i = args.index("--max-interval")
+        max_interval = float(args[i + 1])
+        del args[i:i + 2]
+
+    folder = Path(args[0]) if args else Path.home() / "Downloads"
+    if not folder.exists():
+        print(f"[ERROR] Folder not found: {folder}")
+        sys.exit(1)
+
+    from beyondtrust_api import BeyondTrustAPI
+
+    poller = RepStatusPoller(BeyondTrustAPI(), folder, min_interval, max(min_interval, max_interval))
+    poller.run()
+
+
+if __name__ == "__main__":
+    main()
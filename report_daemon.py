@@ -0,0 +1,308 @@
+"""
+Resident Report Daemon
+======================
+Keeps a warm Python process (modules imported, report template cached) that
+accepts report jobs over a local socket, so drag-and-drop and the daily /
+monthly runners don't pay interpreter start-up and import costs per report.
+
+The folder watcher (enhanced_watch_folder.py) hosts the job server itself
+when it is running; this script runs a standalone daemon otherwise.
+
+The server listens on 127.0.0.1 only and writes its port and a random token
+to ~/.beyondtrust_report_daemon.json (readable by the current user only);
+clients must present the token. Requests and responses are single JSON
+lines.
+
+Clients only fall back to in-process work when no daemon can be reached.
+Before a job is sent, the daemon must answer a quick ping with the pid in
+the info file; an info file left by a crashed daemon is removed. Once a job
+has been sent, a timeout or dropped connection is reported as an error (the
+daemon may still be writing that report), never as "no daemon".
+
+Usage:
+    python report_daemon.py            # run the standalone daemon
+    python report_daemon.py --status   # check whether a daemon is running
+
+Client:
+    from report_daemon import submit_job
+
+    result = submit_job("C:\\...\\Support-sessions.csv")
+    if result is None:
+        ...  # no daemon running - process in-process instead
+"""
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+DAEMON_INFO_FILE = Path.home() / ".beyondtrust_report_daemon.json"
+
+# How long a client waits for a job to finish (seconds)
+JOB_TIMEOUT = 600
+
+# How long a client waits to connect before falling back to in-process work
+CONNECT_TIMEOUT = 0.5
+
+
+def _read_daemon_info():
+    try:
+        with open(DAEMON_INFO_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _remove_stale_info(info):
+    """Remove the info file left by a daemon that no longer answers (if it wasn't replaced since)"""
+    current = _read_daemon_info()
+    if current and current.get('token') == info.get('token'):
+        try:
+            DAEMON_INFO_FILE.unlink()
+        except OSError:
+            pass
+
+
+def _request(message, timeout=JOB_TIMEOUT, info=None):
+    """
+    Send one request to the running daemon
+
+    Returns None only if no daemon could be reached (nothing was sent). Once
+    the request has been sent, a timeout or an unreadable reply is returned
+    as an error response instead.
+    """
+    info = info or _read_daemon_info()
+    if not info:
+        return None
+
+    try:
+        sock = socket.create_connection(('127.0.0.1', info['port']), timeout=CONNECT_TIMEOUT)
+        payload = dict(message, token=info['token'])
+    except (OSError, KeyError):
+        return None
+
+    host = info.get('host', 'report daemon')
+    with sock:
+        try:
+            sock.sendall(json.dumps(payload).encode('utf-8') + b'\n')
+        except OSError:
+            return None
+
+        try:
+            sock.settimeout(timeout)
+            with sock.makefile('r', encoding='utf-8') as reader:
+                line = reader.readline()
+        except socket.timeout:
+            return {'status': 'error', 'host': host,
+                    'error': f"No reply from the {host} within {timeout}s; the job may still be running there"}
+        except OSError as e:
+            return {'status': 'error', 'host': host, 'error': f"Lost connection to the {host}: {e}"}
+
+    try:
+        return json.loads(line)
+    except ValueError:
+        return {'status': 'error', 'host': host, 'error': f"No valid reply from the {host}"}
+
+
+def _live_daemon_info():
+    """
+    Info of the daemon named in the info file, if it answers a ping
+
+    The info file outlives a daemon that crashed, and its port may since
+    have been reused by something else. A daemon counts as live only if it
+    answers within CONNECT_TIMEOUT with the pid it published; otherwise the
+    file is removed as stale and None is returned.
+    """
+    info = _read_daemon_info()
+    if not info:
+        return None
+
+    response = _request({'action': 'ping'}, timeout=CONNECT_TIMEOUT, info=info)
+    if not response or response.get('status') != 'ok' or response.get('pid') != info.get('pid'):
+        _remove_stale_info(info)
+        return None
+    return info
+
+
+def is_daemon_running():
+    """True if a daemon (or watcher) answers a ping"""
+    return _live_daemon_info() is not None
+
+
+def submit_job(csv_file, open_browser=True):
+    """
+    Ask the running daemon to process a CSV.
+
+    Returns:
+        Response dict (status, report_file, error, host), or None if no
+        daemon answers a ping and the caller should process in-process. A job
+        the daemon accepted but did not finish in JOB_TIMEOUT comes back as
+        an error, so the same report is never generated twice at once.
+    """
+    if os.environ.get('REPORT_NO_DAEMON'):
+        return None
+
+    # Only wait JOB_TIMEOUT on a daemon that has just answered a quick ping
+    info = _live_daemon_info()
+    if info is None:
+        return None
+    return _request({
+        'action': 'generate',
+        'csv_file': str(Path(csv_file).resolve()),
+        'open_browser': open_browser,
+    }, info=info)
+
+
+def process_csv(csv_file, open_browser=True):
+    """Default job handler: clean + generate (+ open) in this process"""
+    from auto_generate_report import clean_csv, generate_report
+
+    cleaned_file = clean_csv(csv_file)
+    report_file = generate_report(cleaned_file)
+    if report_file and open_browser:
+        import webbrowser
+        webbrowser.open(f'file:///{report_file}')
+    return report_file
+
+
+class JobServer:
+    """
+    Local job server.
+
+    handler(csv_file, open_browser) -> report file path (or None on failure)
+    is called on a connection thread; jobs are run one at a time.
+    """
+
+    def __init__(self, handler=process_csv, name='report daemon'):
+        import secrets
+        import threading
+
+        self.handler = handler
+        self.name = name
+        self.token = secrets.token_hex(16)
+        self._job_lock = threading.Lock()
+        self._server = None
+
+    def _handle(self, request):
+        if request.get('token') != self.token:
+            return {'status': 'error', 'error': 'Invalid token'}
+
+        action = request.get('action')
+        if action == 'ping':
+            return {'status': 'ok', 'host': self.name, 'pid': os.getpid()}
+
+        if action == 'generate':
+            csv_file = request.get('csv_file')
+            if not csv_file or not os.path.exists(csv_file):
+                return {'status': 'error', 'error': f"File not found: {csv_file}"}
+            with self._job_lock:
+                try:
+                    report_file = self.handler(csv_file, request.get('open_browser', True))
+                except Exception as e:
+                    return {'status': 'error', 'error': str(e), 'host': self.name}
+            if report_file:
+                return {'status': 'success', 'report_file': str(report_file), 'host': self.name}
+            return {'status': 'error', 'error': 'Failed to generate report', 'host': self.name}
+
+        return {'status': 'error', 'error': f"Unknown action: {action}"}
+
+    def start(self):
+        """Start serving on a background thread and publish the port/token"""
+        import socketserver
+        import threading
+
+        server_self = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {'status': 'error', 'error': 'Invalid request'}
+                else:
+                    response = server_self._handle(request)
+                self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self._server = Server(('127.0.0.1', 0), Handler)
+        port = self._server.server_address[1]
+
+        thread = threading.Thread(target=self._server.serve_forever, name='report-jobs', daemon=True)
+        thread.start()
+
+        # The file holds the token: create it readable by this user only
+        tmp_file = DAEMON_INFO_FILE.with_name(DAEMON_INFO_FILE.name + '.tmp')
+        try:
+            tmp_file.unlink()
+        except FileNotFoundError:
+            pass
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, 'w', encoding='utf-8') as f:
+            json.dump({'port': port, 'token': self.token, 'pid': os.getpid(), 'host': self.name}, f)
+        os.replace(tmp_file, DAEMON_INFO_FILE)
+        return port
+
+    def stop(self):
+        """Stop serving and remove the info file (if it is still ours)"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+        info = _read_daemon_info()
+        if info and info.get('token') == self.token:
+            try:
+                DAEMON_INFO_FILE.unlink()
+            except OSError:
+                pass
+
+
+def warm_up():
+    """Import the pipeline and cache the template so the first job is fast"""
+    import auto_generate_report
+    from ip_regions import classify_ip
+
+    classify_ip('127.0.0.1')
+    if os.path.exists(auto_generate_report.TEMPLATE_FILE):
+        auto_generate_report.read_template(auto_generate_report.TEMPLATE_FILE)
+
+
+def main():
+    if "--status" in sys.argv[1:]:
+        response = _request({'action': 'ping'}, timeout=CONNECT_TIMEOUT)
+        if response and response.get('status') == 'ok':
+            print(f"[RUNNING] {response.get('host')} (pid {response.get('pid')})")
+        else:
+            print("[STOPPED] No report daemon is running")
+        return
+
+    if is_daemon_running():
+        print("[INFO] A report daemon (or the folder watcher) is already running")
+        return
+
+    print("=" * 60)
+    print("Support Session Report Daemon")
+    print("=" * 60)
+
+    warm_up()
+    server = JobServer()
+    port = server.start()
+    print(f"[LISTENING] 127.0.0.1:{port}")
+    print(f"(Press Ctrl+C to stop)\n")
+
+    try:
+        import time
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+        print("\n[STOPPED] Report daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
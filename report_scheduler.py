@@ -0,0 +1,276 @@
+"""
+In-Process Report Scheduler
+===========================
+Runs the daily and monthly reports on a schedule inside the folder watcher
+(a warm, long-running process) instead of Task Scheduler / cron starting a
+fresh interpreter for every run. Works the same on Windows and Linux.
+
+Schedules are 5-field cron specs (minute hour day-of-month month
+day-of-week, with *, lists, ranges and /steps; day-of-week 0 or 7 is
+Sunday) or one of @daily, @weekdays, @monthly:
+
+    daily    '0 7 * * 1-5'  - report for the previous business day
+                              (run_daily_report_simple.get_previous_business_day)
+    monthly  '0 7 1 * *'    - report for the previous month
+                              (run_monthly_report_simple.get_previous_month_weekdays)
+
+Both reports are built with generate_range_report from the
+Support-sessions exports in the watched folder that cover the target
+dates (see csv_discovery.ExportIndex), limited to those dates.
+
+The time of each job's last run is kept in the history store
+(scheduler_snapshot.json). After downtime, runs that were missed are
+caught up at startup (at most MAX_CATCH_UP per job), each for the date
+it would have covered.
+
+Usage:
+    from report_scheduler import ReportScheduler, default_jobs
+
+    scheduler = ReportScheduler(folder, default_jobs(folder), run_job=run)
+    scheduler.start()
+    ...
+    scheduler.stop()
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+from history_store import load_snapshot, save_snapshot
+
+SNAPSHOT_NAME = "scheduler"
+
+DEFAULT_DAILY_CRON = '0 7 * * 1-5'
+DEFAULT_MONTHLY_CRON = '0 7 1 * *'
+
+CRON_ALIASES = {
+    '@daily': '0 0 * * *',
+    '@weekdays': '0 0 * * 1-5',
+    '@monthly': '0 0 1 * *',
+}
+
+# Missed runs caught up per job after downtime (the most recent ones)
+MAX_CATCH_UP = 31
+
+# Longest the scheduler thread sleeps between checks (seconds); keeps it
+# responsive to clock changes and to stop()
+MAX_SLEEP = 30
+
+# How far ahead next_after() searches for a matching day
+MAX_SEARCH_DAYS = 4 * 366
+
+
+def _parse_field(field, low, high):
+    """Set of values for one cron field"""
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"Invalid step in cron field: {field}")
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start_text, end_text = part.split('-', 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field out of range ({low}-{high}): {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSpec:
+    """A 5-field cron schedule (minute resolution, local time)"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        fields = CRON_ALIASES.get(spec.strip(), spec).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron spec needs 5 fields (minute hour day month weekday): {spec}")
+
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        # Cron weekdays: 0 (or 7) = Sunday; stored as Python weekdays (Monday = 0)
+        self.weekdays = {(day - 1) % 7 for day in _parse_field(fields[4], 0, 7)}
+        # Like cron: if both day fields are restricted, either may match
+        self.any_day = fields[2] == '*' or fields[4] == '*'
+
+    def __repr__(self):
+        return f"CronSpec({self.spec!r})"
+
+    def matches_day(self, day):
+        if day.month not in self.months:
+            return False
+        in_days = day.day in self.days
+        in_weekdays = day.weekday() in self.weekdays
+        return (in_days and in_weekdays) if self.any_day else (in_days or in_weekdays)
+
+    def next_after(self, moment):
+        """First scheduled time strictly after moment (None if there is none)"""
+        moment = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = moment.replace(hour=0, minute=0)
+        for _ in range(MAX_SEARCH_DAYS):
+            if self.matches_day(day):
+                for hour in sorted(self.hours):
+                    for minute in sorted(self.minutes):
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= moment:
+                            return candidate
+            day += timedelta(days=1)
+        return None
+
+    def runs_between(self, start, end):
+        """Scheduled times in (start, end]"""
+        runs = []
+        run = self.next_after(start)
+        while run is not None and run <= end:
+            runs.append(run)
+            run = self.next_after(run)
+        return runs
+
+
+class ScheduledJob:
+    """A named job: cron schedule + action(run_time) -> report path or None"""
+
+    def __init__(self, name, cron, action):
+        self.name = name
+        self.cron = cron if isinstance(cron, CronSpec) else CronSpec(cron)
+        self.action = action
+
+
+def exports_for(folder, start, end):
+    """Exports in folder whose sessions overlap start..end (peeked, not parsed)"""
+    from csv_discovery import EXPORT_PREFIX, ExportIndex, scan_csv_files
+
+    return [entry.path for entry in ExportIndex(scan_csv_files(folder, EXPORT_PREFIX)).covering(start, end)]
+
+
+def daily_report(folder, run_time):
+    """Report for the business day before run_time, from the exports in folder"""
+    from auto_generate_report import generate_range_report
+    from run_daily_report_simple import get_previous_business_day
+
+    day = get_previous_business_day(run_time).date()
+    csv_files = exports_for(folder, day, day)
+    if not csv_files:
+        return None
+    return generate_range_report(csv_files, day, day, output_dir=folder)
+
+
+def monthly_report(folder, run_time):
+    """Report for the month before run_time, from the exports in folder"""
+    from auto_generate_report import generate_range_report
+    from run_monthly_report_simple import get_previous_month_weekdays
+
+    _, month_start, month_end = get_previous_month_weekdays(run_time)
+    csv_files = exports_for(folder, month_start.date(), month_end.date())
+    if not csv_files:
+        return None
+    return generate_range_report(csv_files, month_start.date(), month_end.date(), output_dir=folder)
+
+
+def default_jobs(folder, daily=DEFAULT_DAILY_CRON, monthly=DEFAULT_MONTHLY_CRON):
+    """The daily and monthly report jobs for folder (pass None to leave one out)"""
+    jobs = []
+    if daily:
+        jobs.append(ScheduledJob('daily', daily, lambda run_time: daily_report(folder, run_time)))
+    if monthly:
+        jobs.append(ScheduledJob('monthly', monthly, lambda run_time: monthly_report(folder, run_time)))
+    return jobs
+
+
+class ReportScheduler:
+    """
+    Runs ScheduledJobs on a background thread.
+
+    run_job(job, run_time) is called for each due run (default: job.action);
+    the watcher passes a wrapper that takes its processing lock and sends
+    notifications. Jobs run one at a time, in schedule order.
+    """
+
+    def __init__(self, folder, jobs, run_job=None, logger=None, max_catch_up=MAX_CATCH_UP):
+        self.folder = folder
+        self.jobs = list(jobs)
+        self.run_job = run_job or (lambda job, run_time: job.action(run_time))
+        self.logger = logger
+        self.max_catch_up = max_catch_up
+        self._stop = threading.Event()
+        self._thread = None
+        self._dirty = False
+
+        data = load_snapshot(folder, SNAPSHOT_NAME) or {}
+        self.last_runs = {name: datetime.fromisoformat(value)
+                          for name, value in data.get('last_runs', {}).items()}
+
+    def _save(self):
+        self._dirty = False
+        try:
+            save_snapshot(self.folder, SNAPSHOT_NAME,
+                          {'last_runs': {name: value.isoformat() for name, value in self.last_runs.items()}})
+        except OSError as e:
+            self._log('error', f"Could not save scheduler state: {e}")
+
+    def missed_runs(self, now=None):
+        """(run_time, job) pairs due since each job last ran, oldest first"""
+        now = now or datetime.now()
+        due = []
+        for job in self.jobs:
+            last = self.last_runs.get(job.name)
+            if last is None:
+                # New job: start from now rather than catching up on history
+                self.last_runs[job.name] = now
+                self._dirty = True
+                continue
+            runs = job.cron.runs_between(last, now)[-self.max_catch_up:]
+            due.extend((run_time, job) for run_time in runs)
+        return sorted(due, key=lambda item: item[0])
+
+    def next_run(self, now=None):
+        """Earliest upcoming run time over all jobs"""
+        now = now or datetime.now()
+        upcoming = [run for run in (job.cron.next_after(now) for job in self.jobs) if run is not None]
+        return min(upcoming, default=None)
+
+    def run_due(self, now=None):
+        """Run every job due by now; returns the number of runs"""
+        due = self.missed_runs(now)
+        for run_time, job in due:
+            if self._stop.is_set():
+                break
+            self._log('info', f"Scheduled {job.name} report ({run_time:%Y-%m-%d %H:%M})")
+            try:
+                self.run_job(job, run_time)
+            except Exception as e:
+                self._log('error', f"Scheduled {job.name} report failed: {e}")
+            self.last_runs[job.name] = run_time
+            self._save()
+        if self._dirty:
+            self._save()
+        return len(due)
+
+    def start(self):
+        """Catch up on missed runs and keep running jobs on a background thread"""
+        self._thread = threading.Thread(target=self._run, name='report-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_due()
+            next_run = self.next_run()
+            wait = MAX_SLEEP if next_run is None else (next_run - datetime.now()).total_seconds()
+            self._stop.wait(min(max(wait, 0), MAX_SLEEP))
+
+    def _log(self, level, message):
+        if self.logger is not None:
+            getattr(self.logger, level)(message)
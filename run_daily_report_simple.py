@@ -18,9 +18,9 @@ import subprocess
 import time
 
 
-def get_previous_business_day():
-    """Get the previous business day (skip weekends)"""
-    today = datetime.now()
+def get_previous_business_day(today=None):
+    """Get the previous business day (skip weekends); today defaults to now"""
+    today = today or datetime.now()
 
     # If today is Monday (0), go back 3 days to Friday
     if today.weekday() == 0:
@@ -36,26 +36,28 @@ def get_previous_business_day():
 
 
 def find_recent_csv(downloads_dir, target_date):
-    """Find the most recent Support-sessions CSV file"""
-    # Look for Support-sessions CSV files
-    csv_pattern = "Support-sessions*.csv"
-    csv_files = list(downloads_dir.glob(csv_pattern))
+    """Find the Support-sessions CSV for target_date, else the most recent one"""
+    from csv_discovery import EXPORT_PREFIX, ExportIndex, scan_csv_files
 
-    # Filter out _cleaned files
-    csv_files = [f for f in csv_files if not f.name.endswith("_cleaned.csv")]
+    # One directory scan; stat results come with the entries
+    index = ExportIndex(scan_csv_files(downloads_dir, EXPORT_PREFIX))
 
-    if not csv_files:
-        return None
+    # Export whose sessions are from the target date
+    match = index.for_date(target_date)
+    if match:
+        return match.path
 
-    # Get the most recent file (by modification time)
-    recent_csv = max(csv_files, key=lambda x: x.stat().st_mtime)
+    # Otherwise the most recent file (by modification time)
+    recent_csv = index.latest()
+    if recent_csv is None:
+        return None
 
     # Check if it was modified today (within last 24 hours)
-    file_age = time.time() - recent_csv.stat().st_mtime
+    file_age = time.time() - recent_csv.mtime
     if file_age > 86400:  # More than 24 hours old
         return None
 
-    return recent_csv
+    return recent_csv.path
 
 
 def main():
@@ -132,12 +134,22 @@ def main():
     script_dir = Path(__file__).parent
     report_script = script_dir / "auto_generate_report.py"
 
-    result = subprocess.run(
-        [sys.executable, str(report_script), str(csv_file)],
-        cwd=str(script_dir)
-    )
+    # Hand off to the report daemon / folder watcher if one is running
+    from report_daemon import submit_job
+    job = submit_job(csv_file)
+    if job is not None:
+        print(f"Processed by the {job.get('host', 'report daemon')}")
+        if job.get('status') != 'success':
+            print(f"Error: {job.get('error')}")
+        returncode = 0 if job.get('status') == 'success' else 1
+    else:
+        result = subprocess.run(
+            [sys.executable, str(report_script), str(csv_file), "--local"],
+            cwd=str(script_dir)
+        )
+        returncode = result.returncode
 
-    if result.returncode == 0:
+    if returncode == 0:
         print()
         print("=" * 70)
         print("✓ SUCCESS - Report generated!")
@@ -4,7 +4,10 @@ One-Click Monthly Report Runner (Simple Version)
 Processes CSV files for all business days in the previous month.
 
 Assumes you will download the CSVs manually for each day, or processes
-existing CSVs if they're already in your Downloads folder.
+existing CSVs if they're already in your Downloads folder. Only exports
+whose sessions fall in that month are processed (their dates are read
+from the first and last rows), and business days no export covers are
+listed.
 """
 
 import sys
@@ -14,9 +17,9 @@ import subprocess
 import time
 
 
-def get_previous_month_weekdays():
-    """Get all weekdays from the previous month"""
-    today = datetime.now()
+def get_previous_month_weekdays(today=None):
+    """Get all weekdays from the previous month (relative to today, default now)"""
+    today = today or datetime.now()
 
     # Get first day of current month
     first_of_current_month = today.replace(day=1)
@@ -92,34 +95,76 @@ def main():
     script_dir = Path(__file__).parent
     report_script = script_dir / "auto_generate_report.py"
 
+    from report_daemon import submit_job
+    from file_index import ProcessedFileIndex, content_hash
+
     successful = 0
     failed = 0
     skipped = 0
 
-    # Look for all CSV files
-    csv_files = list(downloads_dir.glob("Support-sessions*.csv"))
-    csv_files = [f for f in csv_files if not f.name.endswith("_cleaned.csv")]
+    # Index the CSV files by the dates they cover (one directory scan,
+    # first/last rows of each file only)
+    from csv_discovery import EXPORT_PREFIX, ExportIndex, scan_csv_files
+    export_index = ExportIndex(scan_csv_files(downloads_dir, EXPORT_PREFIX))
+    csv_files = [entry.path for entry in export_index.covering(month_start, month_end)]
+    missing_days = export_index.missing_days(weekdays)
 
     if not csv_files:
-        print("✗ No CSV files found in Downloads folder!")
+        print(f"✗ No CSV files for {month_name} found in Downloads folder!")
         print(f"  Location: {downloads_dir}")
         sys.exit(1)
 
-    print(f"Found {len(csv_files)} CSV file(s) in Downloads folder")
+    print(f"Found {len(csv_files)} CSV file(s) for {month_name} in Downloads folder")
+    if len(export_index) > len(csv_files):
+        print(f"Ignoring {len(export_index) - len(csv_files)} CSV file(s) from other dates")
+    if missing_days:
+        print(f"⚠️  No CSV file covers {len(missing_days)} business day(s):")
+        for day in missing_days:
+            print(f"   - {day.strftime('%A, %B %d, %Y')}")
     print()
 
+    # Re-downloaded copies ("Support-sessions (1).csv") are skipped: within
+    # this batch by content hash, and against the watcher's processed-file
+    # index (read only) when the original already has a report
+    file_index = ProcessedFileIndex(downloads_dir)
+    seen_hashes = {}
+
     for csv_file in csv_files:
         print(f"Processing: {csv_file.name}")
         print("-" * 70)
 
-        result = subprocess.run(
-            [sys.executable, str(report_script), str(csv_file)],
-            cwd=str(script_dir),
-            capture_output=True
-        )
-
-        if result.returncode == 0:
+        try:
+            digest = content_hash(csv_file)
+        except OSError:
+            digest = None
+        if digest in seen_hashes:
+            skipped += 1
+            print(f"- Skipped (same content as {seen_hashes[digest].name})")
+            print()
+            continue
+        duplicate = file_index.find_duplicate(digest, exclude=csv_file) if digest else None
+        if duplicate:
+            skipped += 1
+            print(f"- Skipped (report already exists: {Path(duplicate['report_file']).name})")
+            print()
+            continue
+
+        # Hand off to the report daemon / folder watcher if one is running
+        job = submit_job(csv_file)
+        if job is not None:
+            returncode = 0 if job.get('status') == 'success' else 1
+        else:
+            result = subprocess.run(
+                [sys.executable, str(report_script), str(csv_file), "--local"],
+                cwd=str(script_dir),
+                capture_output=True
+            )
+            returncode = result.returncode
+
+        if returncode == 0:
             successful += 1
+            if digest:
+                seen_hashes[digest] = csv_file
             print(f"✓ Success")
         else:
             failed += 1
@@ -134,7 +179,9 @@ def main():
     print(f"Month: {month_name}")
     print(f"CSV files processed: {len(csv_files)}")
     print(f"Successful: {successful}")
+    print(f"Skipped (duplicates): {skipped}")
     print(f"Failed: {failed}")
+    print(f"Business days without a CSV: {len(missing_days)}")
     print()
 
     if failed > 0:
@@ -0,0 +1,327 @@
+"""
+Compact Session Payload for the Report Filter
+=============================================
+Encodes the per-session data the report's client-side filter needs
+(representative, hour, 'Started') as columns instead of one JSON object per
+session, ordered by start time:
+
+    {"v": 1,
+     "reps": ["Alex Morgan", "Jordan Lee", ...],   # rep dictionary (sorted)
+     "rep": [0, 1, 1, 0, ...],                     # index into reps
+     "epoch": [1762506902, 34, 120, ...],          # delta-encoded seconds
+     "tzs": ["EST"], "tz": [...]}                  # tz column only if mixed
+
+Epochs are the wall-clock 'Started' time encoded as if it were UTC, so the
+hour is (epoch / 3600) % 24 and no hour column is stored.
+
+The payload is embedded in the report in one of these modes:
+    inline   - a JSON literal in the page
+    gzip     - gzip + base64, inflated in the page with DecompressionStream
+    sidecar  - written next to the report as <report>.sessions.js and loaded
+               with a <script> tag (fetch() of a .json file is blocked for
+               file:// pages)
+    cube     - no per-session data, only the count cube below
+    auto     - inline, or gzip once the JSON is larger than GZIP_THRESHOLD
+               (always inline for templates that still scan allSessionData)
+
+Every mode also embeds a precomputed count cube, rep x hour (x weekday for
+reports covering more than one day), so filter interactions are lookups
+over reps x hours instead of scans over every session.
+
+The injected script defines sessionCube, sessionColumns (typed arrays),
+sessionDataReady (a Promise), filterSessions(rep, hour) and
+countSessions(rep, hour, weekday) / cubeHourly(rep, weekday) for the
+template's filter. Templates that still scan allSessionData get it filled
+from the columns.
+
+Usage:
+    from session_payload import encode_sessions, session_script
+
+    payload = encode_sessions(sessions)
+    html = html.replace(SESSION_DATA_PLACEHOLDER, session_script(payload, 'auto'))
+"""
+
+import base64
+import calendar
+import gzip
+import json
+import os
+from pathlib import Path
+
+from aggregate_cache import parse_started
+
+PAYLOAD_VERSION = 1
+
+PAYLOAD_MODES = ('auto', 'inline', 'gzip', 'sidecar', 'cube')
+
+# 'auto' switches from inline JSON to gzip+base64 above this many bytes
+GZIP_THRESHOLD = 256 * 1024
+
+SIDECAR_SUFFIX = '.sessions.js'
+
+# Template line the session data replaces
+SESSION_DATA_PLACEHOLDER = 'let allSessionData = []; // Will be populated by the Python script'
+
+# Client-side decoder and column filters (inserted once per report)
+CLIENT_JS = r"""
+function decodeSessionColumns(p) {
+  const n = p.rep.length;
+  const rep = new Uint16Array(p.rep);
+  const epoch = new Float64Array(n);
+  const hour = new Uint8Array(n);
+  let t = 0;
+  for (let i = 0; i < n; i++) {
+    t += p.epoch[i];
+    epoch[i] = t;
+    hour[i] = ((Math.floor(t / 3600) % 24) + 24) % 24;
+  }
+  return {length: n, reps: p.reps, rep: rep, epoch: epoch, hour: hour,
+          tzs: p.tzs || [], tz: p.tz ? new Uint8Array(p.tz) : null};
+}
+function sessionStarted(cols, i) {
+  const tz = cols.tz ? cols.tzs[cols.tz[i]] : cols.tzs[0];
+  const text = new Date(cols.epoch[i] * 1000).toISOString().slice(0, 19).replace('T', ' ');
+  return tz ? text + ' ' + tz : text;
+}
+function sessionRows(cols) {
+  const rows = new Array(cols.length);
+  for (let i = 0; i < cols.length; i++) {
+    rows[i] = {rep: cols.reps[cols.rep[i]], hour: cols.hour[i], started: sessionStarted(cols, i)};
+  }
+  return rows;
+}
+function filterSessions(rep, hour, cols) {
+  cols = cols || sessionColumns;
+  const out = [];
+  if (!cols) return out;
+  const r = (rep === undefined || rep === null || rep === 'all') ? -1 : cols.reps.indexOf(rep);
+  const h = (hour === undefined || hour === null || hour === 'all') ? -1 : Number(hour);
+  if (rep !== undefined && rep !== null && rep !== 'all' && r < 0) return out;
+  for (let i = 0; i < cols.length; i++) {
+    if ((r < 0 || cols.rep[i] === r) && (h < 0 || cols.hour[i] === h)) out.push(i);
+  }
+  return out;
+}
+function cubeCount(rep, hour, weekday, cube) {
+  cube = cube || sessionCube;
+  const isAll = v => v === undefined || v === null || v === 'all';
+  const width = cube.weekdays ? 168 : 24;
+  const r = isAll(rep) ? -1 : cube.reps.indexOf(rep);
+  if (!isAll(rep) && r < 0) return 0;
+  const days = (cube.weekdays && !isAll(weekday)) ? [Number(weekday)] : (cube.weekdays ? [0, 1, 2, 3, 4, 5, 6] : [0]);
+  const hours = isAll(hour) ? null : [Number(hour)];
+  let total = 0;
+  for (let i = (r < 0 ? 0 : r); i < (r < 0 ? cube.reps.length : r + 1); i++) {
+    for (const d of days) {
+      const base = i * width + d * 24;
+      if (hours) { total += cube.counts[base + hours[0]]; continue; }
+      for (let h = 0; h < 24; h++) total += cube.counts[base + h];
+    }
+  }
+  return total;
+}
+function cubeHourly(rep, weekday, cube) {
+  const out = new Array(24);
+  for (let h = 0; h < 24; h++) out[h] = cubeCount(rep, h, weekday, cube);
+  return out;
+}
+function countSessions(rep, hour, weekday) {
+  return cubeCount(rep, hour, weekday);
+}
+async function inflateSessionPayload(b64) {
+  const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+  return JSON.parse(await new Response(stream).text());
+}
+function loadSessionSidecar(src) {
+  return new Promise((resolve, reject) => {
+    const script = document.createElement('script');
+    script.src = src;
+    script.onload = () => resolve(window.sessionPayload);
+    script.onerror = () => reject(new Error('Could not load ' + src));
+    document.head.appendChild(script);
+  });
+}
+"""
+
+
+def session_key(session, started=None):
+    """(epoch, rep name, timezone) for one session (started: parsed 'Started')"""
+    if started is None:
+        started = parse_started(session['Started'])
+    return (
+        calendar.timegm(started.timetuple()),
+        session.get("Representative's Name", "Unknown"),
+        session['Started'].rsplit(' ', 1)[1]
+    )
+
+
+def session_keys(sessions):
+    """session_key() for each session with a 'Started' value"""
+    return [session_key(session) for session in sessions if session.get('Started')]
+
+
+def encode_keys(keys):
+    """Columnar payload from session_keys() output (keys from several chunks can be concatenated)"""
+    reps = sorted({rep for _, rep, _ in keys})
+    rep_index = {rep: i for i, rep in enumerate(reps)}
+    tzs = sorted({tz for _, _, tz in keys})
+    tz_index = {tz: i for i, tz in enumerate(tzs)}
+
+    # Sorted by start time so the deltas stay small
+    keys = sorted(keys)
+    epoch_column = []
+    previous = 0
+    for epoch, _, _ in keys:
+        epoch_column.append(epoch - previous)
+        previous = epoch
+
+    payload = {'v': PAYLOAD_VERSION, 'reps': reps, 'rep': [rep_index[rep] for _, rep, _ in keys],
+               'epoch': epoch_column, 'tzs': tzs}
+    if len(tzs) > 1:
+        payload['tz'] = [tz_index[tz] for _, _, tz in keys]
+    return payload
+
+
+def encode_sessions(sessions):
+    """Columnar payload (see module docstring) for sessions with a 'Started' value"""
+    return encode_keys(session_keys(sessions))
+
+
+def count_cube(payload, weekdays=None):
+    """
+    Session counts by rep x hour (x weekday) from a payload.
+
+    weekdays defaults to True when the sessions span more than one day.
+    counts is flat: index = rep * width + weekday * 24 + hour, where width
+    is 168 with weekdays (Monday = 0) and 24 without.
+    """
+    epochs = []
+    epoch = 0
+    for delta in payload['epoch']:
+        epoch += delta
+        epochs.append(epoch)
+
+    if weekdays is None:
+        weekdays = len({epoch // 86400 for epoch in epochs}) > 1
+    width = 168 if weekdays else 24
+
+    counts = [0] * (len(payload['reps']) * width)
+    for rep, epoch in zip(payload['rep'], epochs):
+        index = rep * width + epoch // 3600 % 24
+        if weekdays:
+            # 1970-01-01 was a Thursday
+            index += (epoch // 86400 + 3) % 7 * 24
+        counts[index] += 1
+
+    return {'reps': payload['reps'], 'weekdays': weekdays, 'counts': counts}
+
+
+def decode_sessions(payload):
+    """Rows ({rep, hour, started}) from a payload, in start-time order"""
+    from datetime import datetime, timezone
+
+    rows = []
+    epoch = 0
+    tzs = payload.get('tzs') or ['']
+    tz_column = payload.get('tz')
+
+    for i, (rep, delta) in enumerate(zip(payload['rep'], payload['epoch'])):
+        epoch += delta
+        started = datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        tz = tzs[tz_column[i]] if tz_column else tzs[0]
+        rows.append({
+            'rep': payload['reps'][rep],
+            'hour': (epoch // 3600) % 24,
+            'started': f'{started} {tz}' if tz else started
+        })
+    return rows
+
+
+def payload_json(payload):
+    """Compact JSON text of a payload"""
+    return json.dumps(payload, separators=(',', ':'))
+
+
+def gzip_base64(text):
+    """gzip + base64 of a string (what inflateSessionPayload() decodes)"""
+    return base64.b64encode(gzip.compress(text.encode('utf-8'), mtime=0)).decode('ascii')
+
+
+def sidecar_path(report_file):
+    """Sidecar script path for a report file"""
+    report_file = Path(report_file)
+    return report_file.with_name(report_file.stem + SIDECAR_SUFFIX)
+
+
+def write_sidecar(report_file, payload):
+    """Write <report>.sessions.js next to the report; returns its path"""
+    path = sidecar_path(report_file)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(f'window.sessionPayload = {payload_json(payload)};\n')
+    os.replace(tmp_path, path)
+    return path
+
+
+def scans_rows(html):
+    """True if the template's own script still reads allSessionData"""
+    return 'allSessionData' in html.replace(SESSION_DATA_PLACEHOLDER, '')
+
+
+def resolve_mode(payload, mode='auto', row_compat=False):
+    """
+    The concrete embedding for a payload ('auto' picks inline or gzip)
+
+    With row_compat, 'auto' always stays inline: gzip fills allSessionData
+    only after sessionDataReady resolves, and templates that scan the row
+    list read it synchronously at page load.
+    """
+    if mode not in PAYLOAD_MODES:
+        raise ValueError(f"Unknown payload mode: {mode} (choose from {', '.join(PAYLOAD_MODES)})")
+    if mode == 'auto':
+        if row_compat:
+            return 'inline'
+        return 'gzip' if len(payload_json(payload)) > GZIP_THRESHOLD else 'inline'
+    return mode
+
+
+def session_script(payload, mode='auto', report_file=None, row_compat=True):
+    """
+    JavaScript that replaces SESSION_DATA_PLACEHOLDER in the template.
+
+    Args:
+        payload: encode_sessions() result
+        mode: 'auto', 'inline', 'gzip', 'sidecar' or 'cube' (sidecar needs
+            report_file for the script src; the caller writes it with
+            write_sidecar)
+        row_compat: also fill allSessionData with {rep, hour, started} rows
+            for templates whose filter still scans the row list ('auto'
+            then stays inline, see resolve_mode)
+    """
+    mode = resolve_mode(payload, mode, row_compat)
+
+    lines = [CLIENT_JS.strip(), f'const sessionCube = {payload_json(count_cube(payload))};',
+             'let sessionColumns = null;', 'let allSessionData = [];']
+    fill_rows = ' allSessionData = sessionRows(sessionColumns);' if row_compat else ''
+
+    if mode == 'cube':
+        lines.append('const sessionDataReady = Promise.resolve(null);')
+        return '\n'.join(lines)
+
+    if mode == 'inline':
+        # Decoded synchronously so code running at page load sees the data
+        lines.append(f'sessionColumns = decodeSessionColumns({payload_json(payload)});{fill_rows}')
+        lines.append('const sessionDataReady = Promise.resolve(sessionColumns);')
+        return '\n'.join(lines)
+
+    if mode == 'gzip':
+        source = f'inflateSessionPayload("{gzip_base64(payload_json(payload))}")'
+    else:
+        if report_file is None:
+            raise ValueError("Sidecar payloads need the report file name")
+        source = f'loadSessionSidecar({json.dumps(sidecar_path(report_file).name)})'
+
+    lines.append(f'const sessionDataReady = {source}.then(p => {{ '
+                 f'sessionColumns = decodeSessionColumns(p);{fill_rows} return sessionColumns; }});')
+    return '\n'.join(lines)
@@ -0,0 +1,223 @@
+"""
+Asynchronous Notifications and Browser Launch
+=============================================
+Desktop notifications (a PowerShell toast on Windows, notify-send or D-Bus
+on Linux) and opening finished reports in the browser can each take
+seconds. The folder watcher hands them to a SideEffectDispatcher instead:
+a background thread draining a bounded queue, so file processing never
+waits on them.
+
+When several files finish together, their notifications are coalesced
+into one summary ("5 reports generated") instead of a toast per file.
+If the queue is full, new side effects are dropped (and counted) rather
+than blocking the caller.
+
+Notification backends:
+    auto         - windows on Windows, else notify-send, else dbus, else none
+    windows      - PowerShell toast
+    notify-send  - libnotify command-line tool
+    dbus         - org.freedesktop.Notifications via gdbus
+    none         - no notifications
+
+Usage:
+    from side_effects import SideEffectDispatcher
+
+    side_effects = SideEffectDispatcher(backend='auto')
+    side_effects.open_report(report_file)
+    side_effects.notify("Report Generated Successfully", "Generated: ...")
+    ...
+    side_effects.stop()   # flushes what is queued
+"""
+
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+NOTIFY_BACKENDS = ('auto', 'windows', 'notify-send', 'dbus', 'none')
+
+APP_NAME = "BeyondTrust Report Processor"
+
+# Queued side effects beyond this are dropped instead of blocking the caller
+MAX_QUEUED = 100
+
+# Notifications arriving within this many seconds of each other are coalesced
+COALESCE_SECONDS = 1.0
+
+# Timeout for a notification subprocess (seconds)
+NOTIFY_TIMEOUT = 5
+
+# Names listed in a summary notification before "+N more"
+SUMMARY_NAMES = 3
+
+WINDOWS_TOAST_SCRIPT = '''
+[Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, ContentType = WindowsRuntime] | Out-Null
+[Windows.Data.Xml.Dom.XmlDocument, Windows.Data.Xml.Dom.XmlDocument, ContentType = WindowsRuntime] | Out-Null
+
+$template = @"
+<toast>
+    <visual>
+        <binding template="ToastText02">
+            <text id="1">{title}</text>
+            <text id="2">{message}</text>
+        </binding>
+    </visual>
+</toast>
+"@
+
+$xml = New-Object Windows.Data.Xml.Dom.XmlDocument
+$xml.LoadXml($template)
+$toast = [Windows.UI.Notifications.ToastNotification]::new($xml)
+[Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier("{app}").Show($toast)
+'''
+
+
+def notify_windows(title, message, success=True):
+    """Toast notification through PowerShell"""
+    # Escape quotes for the PowerShell here-string
+    script = WINDOWS_TOAST_SCRIPT.format(title=title.replace('"', '`"'), message=message.replace('"', '`"'),
+                                         app=APP_NAME)
+    subprocess.run(['powershell', '-Command', script], capture_output=True, timeout=NOTIFY_TIMEOUT)
+
+
+def notify_send(title, message, success=True):
+    """Notification through the libnotify notify-send tool"""
+    subprocess.run(['notify-send', '--app-name', APP_NAME, '--urgency', 'normal' if success else 'critical',
+                    title, message], capture_output=True, timeout=NOTIFY_TIMEOUT)
+
+
+def notify_dbus(title, message, success=True):
+    """Notification through org.freedesktop.Notifications (gdbus)"""
+    subprocess.run(['gdbus', 'call', '--session',
+                    '--dest', 'org.freedesktop.Notifications',
+                    '--object-path', '/org/freedesktop/Notifications',
+                    '--method', 'org.freedesktop.Notifications.Notify',
+                    APP_NAME, '0', '', title, message, '[]', '{}', '5000'],
+                   capture_output=True, timeout=NOTIFY_TIMEOUT)
+
+
+def notify_none(title, message, success=True):
+    pass
+
+
+def resolve_backend(backend='auto'):
+    """Notification function for a backend name ('auto' picks one for this platform)"""
+    if backend not in NOTIFY_BACKENDS:
+        raise ValueError(f"Unknown notification backend: {backend} (choose from {', '.join(NOTIFY_BACKENDS)})")
+    if backend == 'auto':
+        if sys.platform == 'win32':
+            backend = 'windows'
+        elif shutil.which('notify-send'):
+            backend = 'notify-send'
+        elif shutil.which('gdbus'):
+            backend = 'dbus'
+        else:
+            backend = 'none'
+    return {
+        'windows': notify_windows,
+        'notify-send': notify_send,
+        'dbus': notify_dbus,
+        'none': notify_none,
+    }[backend]
+
+
+def open_in_browser(report_file):
+    import webbrowser
+    webbrowser.open(f'file:///{report_file}')
+
+
+def summarize(notifications):
+    """One (title, message, success) for a burst of notifications"""
+    if len(notifications) == 1:
+        return notifications[0]
+
+    failed = [item for item in notifications if not item[2]]
+    if failed:
+        title = f"{len(notifications)} Reports Processed, {len(failed)} Failed"
+    else:
+        title = f"{len(notifications)} Reports Generated Successfully"
+    messages = [message for _, message, _ in notifications]
+    message = '\n'.join(messages[:SUMMARY_NAMES])
+    if len(messages) > SUMMARY_NAMES:
+        message += f"\n+{len(messages) - SUMMARY_NAMES} more"
+    return title, message, not failed
+
+
+class SideEffectDispatcher:
+    """
+    Runs notifications and browser launches on a background thread.
+
+    notify() and open_report() only enqueue and never block. Notifications
+    are held for coalesce_seconds and merged with any that arrive in the
+    meantime; browser launches run in order as they are dequeued.
+    """
+
+    def __init__(self, backend='auto', max_queued=MAX_QUEUED, coalesce_seconds=COALESCE_SECONDS, logger=None):
+        self.backend = backend
+        self.notifier = resolve_backend(backend)
+        self.coalesce_seconds = coalesce_seconds
+        self.logger = logger
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._thread = threading.Thread(target=self._run, name='side-effects', daemon=True)
+        self._thread.start()
+
+    def notify(self, title, message, success=True):
+        """Queue a desktop notification"""
+        self._put(('notify', (title, message, success)))
+
+    def open_report(self, report_file):
+        """Queue opening a report in the browser"""
+        self._put(('open', str(report_file)))
+
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            self._log('warning', f"Side-effect queue full; dropped {item[0]}")
+
+    def stop(self, timeout=NOTIFY_TIMEOUT * 2):
+        """Flush the queue and stop the thread"""
+        try:
+            self._queue.put(('stop', None), timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _run(self):
+        pending = []      # notifications waiting to be coalesced
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                kind, value = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                kind, value = 'flush', None
+
+            if kind == 'notify':
+                pending.append(value)
+                if deadline is None:
+                    deadline = time.monotonic() + self.coalesce_seconds
+            elif kind == 'open':
+                self._call(open_in_browser, value)
+
+            # Send the burst once its window has passed (or on stop)
+            if pending and (kind == 'stop' or time.monotonic() >= deadline):
+                self._call(self.notifier, *summarize(pending))
+                pending = []
+                deadline = None
+            if kind == 'stop':
+                return
+
+    def _call(self, func, *args):
+        try:
+            func(*args)
+        except Exception as e:
+            self._log('debug', f"{func.__name__} failed: {e}")
+
+    def _log(self, level, message):
+        if self.logger is not None:
+            getattr(self.logger, level)(message)
@@ -0,0 +1,83 @@
+from datetime import date, datetime
+
+import pytest
+
+from aggregate_cache import SessionAggregate, load_day, load_range, parse_started, parse_time_involved, save_day
+
+
+def session(started, rep='Alice', minutes='0:30', ip='10.0.0.1', customer='Acme'):
+    return {
+        'Started': started,
+        "Representative's Name": rep,
+        "Representative's Time Involved": minutes,
+        "Customer's Public IP": ip,
+        "Customer's Name": customer,
+    }
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2025-11-07 09:15:02 EST', datetime(2025, 11, 7, 9, 15, 2)),
+    ('2025-11-07 9:15:02 PST', datetime(2025, 11, 7, 9, 15, 2)),
+])
+def test_parse_started(value, expected):
+    assert parse_started(value) == expected
+
+
+@pytest.mark.parametrize('value', ['2025-11-07 09:15:02', '2025-13-07 09:15:02 EST', 'yesterday'])
+def test_parse_started_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        parse_started(value)
+
+
+@pytest.mark.parametrize('value, minutes', [('1:25', 85), ('0:05', 5), ('', None), ('5', None), ('a:b', None)])
+def test_parse_time_involved(value, minutes):
+    assert parse_time_involved(value) == minutes
+
+
+def test_aggregate_merge_matches_single_pass():
+    sessions = [session(f'2025-11-0{3 + i % 2} {8 + i % 4:02d}:00:00 EST', rep=f'Rep {i % 3}',
+                        minutes=f'0:{i % 60:02d}', ip=f'10.0.0.{i % 20}', customer=f'C{i % 7}')
+                for i in range(100)]
+    whole = SessionAggregate()
+    parts = [SessionAggregate(), SessionAggregate()]
+    for i, row in enumerate(sessions):
+        whole.add_session(row)
+        parts[i % 2].add_session(row)
+
+    merged = SessionAggregate().merge(parts[0]).merge(parts[1])
+    assert merged.sessions == 100
+    assert merged.rep_counts == whole.rep_counts
+    assert merged.rep_time == whole.rep_time
+    assert merged.hourly_counts == whole.hourly_counts
+    assert merged.unique_ips.count() == 20
+    assert merged.unique_customers.count() == 7
+    assert merged.handle_time.percentiles() == whole.handle_time.percentiles()
+
+
+def test_cache_round_trip_and_range(tmp_path):
+    day_one, day_two = SessionAggregate(), SessionAggregate()
+    day_one.add_session(session('2025-11-03 09:00:00 EST', minutes='0:10'))
+    day_two.add_session(session('2025-11-05 10:00:00 EST', rep='Bob', minutes='1:00', ip='10.0.0.2'))
+    save_day(tmp_path, '2025-11-03', day_one)
+    save_day(tmp_path, date(2025, 11, 5), day_two)
+
+    assert load_day(tmp_path, '2025-11-03').to_dict() == day_one.to_dict()
+    assert load_day(tmp_path, '2025-11-04') is None
+
+    totals, missing = load_range(tmp_path, date(2025, 11, 3), date(2025, 11, 5))
+    assert missing == [date(2025, 11, 4)]
+    assert totals.sessions == 2
+    assert dict(totals.rep_time) == {'Alice': 10, 'Bob': 60}
+    assert totals.unique_ips.count() == 2
+    assert totals.rep_handle_time['Bob'].percentiles((50,)) == {50: 60}
+
+
+def test_outdated_cache_is_ignored(tmp_path):
+    import json
+    aggregate = SessionAggregate()
+    save_day(tmp_path, '2025-11-03', aggregate)
+    path = tmp_path / 'report_cache' / '2025-11-03.json'
+    data = json.loads(path.read_text(encoding='utf-8'))
+    data['version'] = 0
+    path.write_text(json.dumps(data), encoding='utf-8')
+    assert load_day(tmp_path, '2025-11-03') is None
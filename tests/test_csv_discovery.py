@@ -0,0 +1,116 @@
+import os
+from datetime import date
+
+import pytest
+
+import csv_discovery
+from csv_discovery import PEEK_BYTES, EXPORT_PREFIX, ExportIndex, name_date, peek_date_span, scan_csv_files
+
+
+HEADER = "Started,Representative's Name,Notes\r\n"
+
+
+def export_rows(days, per_day=3, note='x'):
+    """Rows for the given days (in order), per_day sessions each"""
+    return ''.join(f'{day.isoformat()} {9 + i:02d}:00:00 EST,Alice,{note}\r\n' for day in days for i in range(per_day))
+
+
+def touch(path, mtime, content=b'Started\r\n'):
+    path.write_bytes(content)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_scan_newest_first_and_filters(tmp_path):
+    touch(tmp_path / 'Support-sessions-a.csv', 1000)
+    touch(tmp_path / 'support-SESSIONS-b.CSV', 3000)
+    touch(tmp_path / 'Support-sessions-a_cleaned.csv', 4000)
+    touch(tmp_path / 'other.csv', 2000)
+    touch(tmp_path / 'Support-sessions-notes.txt', 5000)
+    (tmp_path / 'Support-sessions-dir.csv').mkdir()
+
+    assert [entry.name for entry in scan_csv_files(tmp_path)] == [
+        'support-SESSIONS-b.CSV', 'other.csv', 'Support-sessions-a.csv']
+    entries = scan_csv_files(tmp_path, EXPORT_PREFIX)
+    assert [entry.name for entry in entries] == ['support-SESSIONS-b.CSV', 'Support-sessions-a.csv']
+    assert entries[0].mtime == 3000
+    assert entries[0].size == len(b'Started\r\n')
+
+
+def test_name_date():
+    assert name_date('Support-sessions-2025-11-07.csv') == date(2025, 11, 7)
+    assert name_date('Support-sessions-2025-02-30.csv') is None
+    assert name_date('Support-sessions (1).csv') is None
+
+
+def test_peek_span_small_file(tmp_path):
+    path = tmp_path / 'Support-sessions.csv'
+    path.write_text(HEADER + export_rows([date(2025, 11, 3), date(2025, 11, 4)]), encoding='utf-8')
+    assert peek_date_span(path) == (date(2025, 11, 3), date(2025, 11, 4))
+
+
+def test_peek_span_reads_head_and_tail_only(tmp_path):
+    # Newest first (either order works); the middle of the file is never read
+    days = [date(2025, 11, 30 - i) for i in range(30)]
+    body = export_rows(days, per_day=200, note='n' * 50)
+    assert len(body) > 4 * PEEK_BYTES
+    path = tmp_path / 'Support-sessions.csv'
+    path.write_text(HEADER + body, encoding='utf-8')
+    assert peek_date_span(path) == (date(2025, 11, 1), date(2025, 11, 30))
+
+
+@pytest.mark.parametrize('padding', [0, PEEK_BYTES])
+def test_peek_span_skips_multiline_fragments(tmp_path, padding):
+    # A quoted note whose second line looks like a dated row, in the head and in the tail
+    fragment = '2025-11-04 09:00:00 EST,Bob,"note with\r\n2025-01-01 00:00:00 EST,a,b"\r\n'
+    rows = (export_rows([date(2025, 11, 3)]) + fragment +
+            export_rows([date(2025, 11, 4)], per_day=padding // 40) +
+            fragment + export_rows([date(2025, 11, 5)]))
+    path = tmp_path / 'Support-sessions.csv'
+    path.write_text(HEADER + rows, encoding='utf-8')
+    assert peek_date_span(path, rows=10) == (date(2025, 11, 3), date(2025, 11, 5))
+
+
+def test_peek_span_without_dates(tmp_path):
+    path = tmp_path / 'Support-sessions.csv'
+    path.write_text('Name,Notes\r\nAlice,x\r\n', encoding='utf-8')
+    assert peek_date_span(path) is None
+
+
+def test_export_index(tmp_path):
+    touch(tmp_path / 'Support-sessions-2025-11-03.csv', 1000, HEADER.encode('utf-8'))
+    month = tmp_path / 'Support-sessions-month.csv'
+    month.write_text(HEADER + export_rows([date(2025, 11, 3), date(2025, 11, 4), date(2025, 11, 7)]),
+                     encoding='utf-8')
+    os.utime(month, (2000, 2000))
+    old = tmp_path / 'Support-sessions-old.csv'
+    old.write_text(HEADER + export_rows([date(2025, 10, 30), date(2025, 10, 31)]), encoding='utf-8')
+    os.utime(old, (500, 500))
+    touch(tmp_path / 'Support-sessions-empty.csv', 3000, HEADER.encode('utf-8'))
+
+    index = ExportIndex(scan_csv_files(tmp_path, EXPORT_PREFIX))
+    assert len(index) == 4
+    assert index.latest().name == 'Support-sessions-empty.csv'
+    assert index.spans[month] == (date(2025, 11, 3), date(2025, 11, 7))
+
+    # Newest export covering a day wins; the span covers the days between its ends
+    assert index.for_date(date(2025, 11, 3)).path == month
+    assert index.for_date(date(2025, 11, 5)).path == month
+    assert index.for_date(date(2025, 11, 8)) is None
+
+    covering = index.covering(date(2025, 11, 1), date(2025, 11, 30))
+    assert [entry.name for entry in covering] == ['Support-sessions-2025-11-03.csv', 'Support-sessions-month.csv']
+    assert index.missing_days([date(2025, 10, 31), date(2025, 11, 7), date(2025, 11, 10)]) == [date(2025, 11, 10)]
+
+
+def test_peeked_spans_are_memoized(tmp_path, monkeypatch):
+    path = tmp_path / 'Support-sessions.csv'
+    path.write_text(HEADER + export_rows([date(2025, 11, 3)]), encoding='utf-8')
+    entries = scan_csv_files(tmp_path)
+    ExportIndex(entries)
+
+    def fail(path, rows=None):
+        raise AssertionError('peeked twice')
+
+    monkeypatch.setattr(csv_discovery, 'peek_date_span', fail)
+    assert ExportIndex(entries).spans[path] == (date(2025, 11, 3), date(2025, 11, 3))
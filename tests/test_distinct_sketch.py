@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from distinct_sketch import DistinctCounter, HyperLogLog
+
+
+def values(start, stop):
+    return [f'10.0.{i // 256}.{i % 256}' for i in range(start, stop)]
+
+
+def test_hyperloglog_estimate_within_error():
+    hll = HyperLogLog()
+    hll.update(values(0, 50000))
+    assert abs(hll.count() - 50000) / 50000 < 3 * hll.relative_error
+
+
+def test_hyperloglog_small_counts_use_linear_counting():
+    hll = HyperLogLog()
+    hll.update(['a', 'b', 'c', 'a'])
+    assert hll.count() == 3
+
+
+def test_hyperloglog_merge_equals_union():
+    a, b, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    a.update(values(0, 30000))
+    b.update(values(20000, 50000))
+    union.update(values(0, 50000))
+    assert a.merge(b).registers == union.registers
+
+
+def test_hyperloglog_round_trip_and_precision_checks():
+    hll = HyperLogLog(10)
+    hll.update(values(0, 1000))
+    restored = HyperLogLog.from_dict(json.loads(json.dumps(hll.to_dict())))
+    assert restored.registers == hll.registers
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(hll)
+    with pytest.raises(ValueError):
+        HyperLogLog(3)
+
+
+def test_distinct_counter_auto_switches_to_sketch():
+    counter = DistinctCounter('auto', threshold=100)
+    for value in values(0, 100):
+        counter.add(value)
+    assert counter.is_exact and counter.count() == 100
+    counter.add('one more')
+    assert not counter.is_exact
+    assert counter.error_bound > 0
+    assert abs(counter.count() - 101) <= 3
+
+
+def test_distinct_counter_sketch_matches_exact_values():
+    exact = DistinctCounter('exact')
+    sketch = DistinctCounter('sketch')
+    for value in values(0, 5000) * 2:
+        exact.add(value)
+        sketch.add(value)
+    assert exact.count() == 5000
+    assert exact.sketch.registers == sketch.sketch.registers
+
+
+def test_distinct_counter_merge_exact_and_sketch():
+    a, b = DistinctCounter('auto'), DistinctCounter('auto')
+    for value in values(0, 300):
+        a.add(value)
+    for value in values(200, 500):
+        b.add(value)
+    merged = DistinctCounter('auto').merge(a).merge(b)
+    assert merged.is_exact and merged.count() == 500
+
+    # An exact counter merged with a sketch-only one becomes a sketch of the union
+    sketch_only = DistinctCounter('sketch')
+    for value in values(200, 500):
+        sketch_only.add(value)
+    mixed = DistinctCounter('auto').merge(a).merge(sketch_only)
+    assert not mixed.is_exact
+    assert mixed.sketch.registers == merged.sketch.registers
+
+
+def test_distinct_counter_round_trip_keeps_exact_count_only():
+    counter = DistinctCounter('auto')
+    for value in values(0, 42):
+        counter.add(value)
+    data = json.loads(json.dumps(counter.to_dict()))
+    assert 'values' not in data
+    restored = DistinctCounter.from_dict(data)
+    assert restored.values is None
+    assert restored.count() == 42 and restored.is_exact
+    assert restored.sketch.registers == counter.sketch.registers
@@ -0,0 +1,169 @@
+import codecs
+import csv
+
+import pytest
+
+from fast_csv import (SNIFF_BYTES, CsvFormatError, check_columns, iter_columns, iter_records,
+                      normalize_header, parse_quoted, project_columns, projection, schema_fingerprint, sniff)
+
+HEADER = "Started,Representative's Name,Notes,Customer's Public IP\r\n"
+
+ROWS = (
+    '2025-11-03 09:00:00 EST,Alice,plain,1.2.3.4\r\n'
+    '2025-11-03 09:05:00 EST,Bob,"comma, inside",5.6.7.8\r\n'
+    '2025-11-03 09:10:00 EST,"Carol ""CJ"" Jones","line one\r\nline two",9.9.9.9\r\n'
+    '2025-11-03 09:15:00 EST,Dave\r\n'
+    '\r\n'
+    '2025-11-03 09:20:00 EST,Eve,last,8.8.8.8'
+)
+
+COLUMNS = ['Started', "Representative's Name", 'Notes', "Customer's Public IP"]
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = tmp_path / 'Support-sessions.csv'
+    path.write_bytes((HEADER + ROWS).encode('utf-8'))
+    return path
+
+
+def dict_reader_rows(path, columns):
+    with open(path, newline='', encoding='utf-8') as f:
+        return [{name: row.get(name) for name in columns} for row in csv.DictReader(f) if any(row.values())]
+
+
+def test_iter_records_joins_quoted_newlines():
+    buf = b'a,b\r\n1,"x\r\ny"\r\n2,z\n3,"q"'
+    assert list(iter_records(buf)) == [
+        (b'a,b', False),
+        (b'1,"x\r\ny"', True),
+        (b'2,z', False),
+        (b'3,"q"', True),
+    ]
+
+
+def test_iter_records_respects_range():
+    buf = b'h\n1\n2\n3\n'
+    assert [record for record, _ in iter_records(buf, start=4, end=6)] == [b'2']
+
+
+def test_iter_columns_matches_dict_reader(export):
+    assert list(iter_columns(export, COLUMNS)) == dict_reader_rows(export, COLUMNS)
+
+
+def test_iter_columns_quoting(export):
+    rows = list(iter_columns(export, COLUMNS))
+    assert rows[1]['Notes'] == 'comma, inside'
+    assert rows[2]["Representative's Name"] == 'Carol "CJ" Jones'
+    assert rows[2]['Notes'] == 'line one\r\nline two'
+
+
+def test_iter_columns_short_and_missing_columns(export):
+    rows = list(iter_columns(export, ['Started', 'Notes', 'Not A Column']))
+    assert rows[3] == {'Started': '2025-11-03 09:15:00 EST', 'Notes': None, 'Not A Column': None}
+    assert all(row['Not A Column'] is None for row in rows)
+
+
+def test_iter_columns_empty_file(tmp_path):
+    path = tmp_path / 'empty.csv'
+    path.write_bytes(b'')
+    assert list(iter_columns(path, COLUMNS)) == []
+
+
+def test_sniff_skips_bom_and_normalizes_header():
+    fmt = sniff(codecs.BOM_UTF8 + 'Started, Representative\u2019s  Name\r\n1,2\r\n'.encode('utf-8'))
+    assert fmt.encoding == 'utf-8'
+    assert fmt.delimiter == ','
+    assert fmt.header == ['Started', "Representative's Name"]
+    assert fmt.header_start == len(codecs.BOM_UTF8)
+
+
+def test_sniff_semicolon_delimiter():
+    fmt = sniff(b'Started;Notes\r\n2025-11-03 09:00:00 EST;a,b\r\n')
+    assert fmt.delimiter == ';'
+    assert fmt.header == ['Started', 'Notes']
+
+
+def test_sniff_cp1252_export():
+    fmt = sniff('Started,Name\r\n1,Jos\xe9\r\n'.encode('cp1252'))
+    assert fmt.encoding == 'cp1252'
+
+
+@pytest.mark.parametrize('data', ['Started,Name\r\n'.encode('utf-16'), b'Started\x00\x01\x02'])
+def test_sniff_rejects_utf16_and_binary(data):
+    with pytest.raises(CsvFormatError):
+        sniff(data)
+
+
+def test_stray_cp1252_byte_falls_back_per_row(tmp_path):
+    # UTF-8 for the whole sniffed block, then cp1252 bytes further on
+    filler = '1,Zo\u00eb\r\n'.encode('utf-8') * (SNIFF_BYTES // 8)
+    path = tmp_path / 'mixed.csv'
+    path.write_bytes(b'Started,Name\r\n' + filler + b'2,Jos\xe9\r\n3,"Ren\xe9, Jr."\r\n')
+    rows = list(iter_columns(path, ['Name']))
+    assert rows[0]['Name'] == 'Zo\u00eb'
+    assert [row['Name'] for row in rows[-2:]] == ['Jos\u00e9', 'Ren\u00e9, Jr.']
+
+
+def test_parse_quoted_decode_fallback():
+    assert parse_quoted(b'"a;b";\xe9', 'utf-8', ';') == ['a;b', '\u00e9']
+
+
+def test_check_columns(tmp_path):
+    path = tmp_path / 'export.csv'
+    path.write_bytes(b'Started,Name\r\n')
+    assert check_columns(path, ['Started']).header == ['Started', 'Name']
+    with pytest.raises(CsvFormatError, match='Ended'):
+        check_columns(path, ['Started', 'Ended'])
+
+
+def test_normalize_header():
+    assert normalize_header('\ufeff Customer\u2019s   Name ') == "Customer's Name"
+
+
+def csv_writer_projection(path, columns):
+    """Reference output: csv.DictReader rows written back with csv.writer"""
+    import io
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if row == COLUMNS:
+                continue
+            record = dict(zip(COLUMNS, row))
+            writer.writerow([record.get(name, '') for name in columns] if row else [])
+    return out.getvalue().encode('utf-8')
+
+
+def test_projection_by_name():
+    fmt = sniff(b'B,A,C\r\n')
+    assert projection(fmt, ['A', 'C', 'D']) == (('A', 'C'), (1, 2), ('D',))
+
+
+def test_schema_fingerprint_depends_on_header_and_delimiter():
+    assert schema_fingerprint(sniff(b'A,B\r\n')) == schema_fingerprint(sniff(b'A, B\r\n'))
+    assert schema_fingerprint(sniff(b'A,B\r\n')) != schema_fingerprint(sniff(b'B,A\r\n'))
+    assert schema_fingerprint(sniff(b'A,B\r\n')) != schema_fingerprint(sniff(b'A;B\r\n'))
+
+
+def test_project_columns_matches_csv_writer(export, tmp_path):
+    columns = ['Started', 'Notes', "Representative's Name"]
+    output = tmp_path / 'out.csv'
+    project_columns(export, output, columns)
+    assert output.read_bytes() == csv_writer_projection(export, columns)
+
+
+def test_project_columns_reordered_export(export, tmp_path):
+    # Same data with the columns in another order and an extra column
+    reordered = tmp_path / 'reordered.csv'
+    with open(export, newline='', encoding='utf-8') as f_in, open(reordered, 'w', newline='', encoding='utf-8') as f_out:
+        writer = csv.writer(f_out)
+        for row in csv.reader(f_in):
+            row = row + [''] * (len(COLUMNS) - len(row)) if row else row
+            writer.writerow([row[3], 'extra', row[1], row[0], row[2]] if row else [])
+
+    columns = ['Started', "Representative's Name", 'Notes']
+    project_columns(export, tmp_path / 'a.csv', columns)
+    project_columns(reordered, tmp_path / 'b.csv', columns)
+    assert (tmp_path / 'a.csv').read_bytes() == (tmp_path / 'b.csv').read_bytes()
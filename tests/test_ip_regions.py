@@ -0,0 +1,80 @@
+import pytest
+
+from ip_regions import DEFAULT_REGION, IPRegionClassifier, _flatten, parse_address, parse_ip
+
+RANGES = """cidr,region
+# comment
+10.0.0.0/8,North America
+10.1.0.0/16,Europe
+10.1.2.0/24,Asia Pacific
+2001:db8::/32,Europe
+2001:db8:1::/48,Africa
+not-a-network,Other
+"""
+
+
+@pytest.fixture
+def classifier(tmp_path):
+    range_file = tmp_path / 'ranges.csv'
+    range_file.write_text(RANGES, encoding='utf-8')
+    return IPRegionClassifier(range_file, tmp_path / 'ranges.bin')
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('1.2.3.4', ('1.2.3.4', 4, 0x01020304)),
+    (' 1.2.3.4:5678 ', ('1.2.3.4', 4, 0x01020304)),
+    ('2001:DB8::1', ('2001:db8::1', 6, 0x20010db8 << 96 | 1)),
+    ('[2001:db8::1]:443', ('2001:db8::1', 6, 0x20010db8 << 96 | 1)),
+    ('', None),
+    (None, None),
+    ('1.2.3', None),
+    ('01.2.3.4', None),
+    ('not an ip', None),
+])
+def test_parse_address(value, expected):
+    assert parse_address(value) == expected
+    assert parse_ip(value) == (expected[0] if expected else None)
+
+
+def test_flatten_most_specific_range_wins():
+    # D overlaps the end of A but is larger, so A keeps 50-99
+    flat = _flatten([(0, 99, 'A'), (10, 19, 'B'), (15, 16, 'C'), (50, 199, 'D')])
+    assert flat == [
+        (0, 9, 'A'),
+        (10, 14, 'B'),
+        (15, 16, 'C'),
+        (17, 19, 'B'),
+        (20, 99, 'A'),
+        (100, 199, 'D'),
+    ]
+
+
+def test_flatten_merges_adjacent_same_region():
+    assert _flatten([(0, 9, 'A'), (10, 19, 'A'), (30, 39, 'A')]) == [(0, 19, 'A'), (30, 39, 'A')]
+
+
+@pytest.mark.parametrize('ip, region', [
+    ('10.0.0.1', 'North America'),
+    ('10.1.0.1', 'Europe'),
+    ('10.1.2.200', 'Asia Pacific'),
+    ('10.1.3.0', 'Europe'),
+    ('10.255.255.255', 'North America'),
+    ('11.0.0.0', DEFAULT_REGION),
+    ('::ffff:10.1.2.3', 'Asia Pacific'),
+    ('2001:db8::1', 'Europe'),
+    ('[2001:db8:1::5]:443', 'Africa'),
+    ('2001:db9::1', DEFAULT_REGION),
+    ('garbage', DEFAULT_REGION),
+])
+def test_classify(classifier, ip, region):
+    assert classifier.classify(ip) == region
+
+
+def test_table_rebuilt_when_ranges_change(tmp_path, classifier):
+    import os
+    range_file = tmp_path / 'ranges.csv'
+    range_file.write_text("cidr,region\n11.0.0.0/8,Europe\n", encoding='utf-8')
+    table_file = tmp_path / 'ranges.bin'
+    stat = table_file.stat()
+    os.utime(range_file, (stat.st_atime, stat.st_mtime + 10))
+    assert IPRegionClassifier(range_file, table_file).classify('11.1.1.1') == 'Europe'
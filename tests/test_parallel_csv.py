@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from auto_generate_report import aggregate_sessions, read_sessions
+from fast_csv import iter_records
+from parallel_csv import parse_parallel, split_points
+
+HEADER = "Started,Representative's Name,Representative's Time Involved,Customer's Public IP,Customer's Name\r\n"
+
+
+@pytest.fixture
+def export(tmp_path):
+    lines = [HEADER]
+    for i in range(200):
+        day = 3 + i % 3
+        name = f'"Customer {i}\r\nsecond line"' if i % 7 == 0 else f'Customer {i % 40}'
+        lines.append(f'2025-11-0{day} {8 + i % 10:02d}:{i % 60:02d}:00 EST,Rep {i % 5},0:{i % 50:02d},'
+                     f'10.0.{i % 7}.{i % 250},{name}\r\n')
+    path = tmp_path / 'Support-sessions.csv'
+    path.write_bytes(''.join(lines).encode('utf-8'))
+    return path
+
+
+def test_split_points_land_on_record_boundaries(export):
+    buf = export.read_bytes()
+    points = split_points(export, 16)
+    assert points[0] == len(HEADER)
+    assert points[-1] == len(buf)
+    assert points == sorted(points)
+
+    # Records read range by range are exactly the records of the whole file
+    whole = list(iter_records(buf, points[0]))
+    pieces = [record for start, end in zip(points, points[1:]) for record in iter_records(buf, start, end)]
+    assert pieces == whole
+
+
+def test_parse_parallel_matches_sequential(export):
+    sessions = read_sessions(export)
+    expected = aggregate_sessions(sessions)
+
+    with ThreadPoolExecutor(4) as executor:
+        result = parse_parallel(export, workers=4, executor=executor)
+
+    assert result['rows'] == len(sessions)
+    assert result['first'] == sessions[0]
+    totals = aggregate_sessions([])
+    for aggregate in result['days'].values():
+        totals.merge(aggregate)
+    assert totals.to_dict() == expected.to_dict()
@@ -0,0 +1,82 @@
+import json
+import random
+
+import pytest
+
+from quantile_sketch import KllSketch
+
+
+def shuffled(n, seed=1):
+    values = list(range(n))
+    random.Random(seed).shuffle(values)
+    return values
+
+
+def test_small_sketch_is_exact():
+    sketch = KllSketch()
+    sketch.update([5, 1, 4, 2, 3])
+    assert sketch.is_exact
+    assert sketch.rank_error == 0.0
+    assert sketch.percentiles((0, 50, 100)) == {0: 1, 50: 3, 100: 5}
+
+
+def test_empty_sketch():
+    sketch = KllSketch()
+    assert sketch.quantile(0.5) is None
+    assert sketch.min_value is None and sketch.max_value is None
+
+
+def test_quantiles_within_rank_error():
+    n = 100000
+    sketch = KllSketch()
+    sketch.update(shuffled(n))
+    assert not sketch.is_exact
+    assert sum(len(items) for items in sketch.levels) <= 3 * sketch.k
+    for q in (0.1, 0.5, 0.9, 0.99):
+        assert abs(sketch.quantile(q) / n - q) < 3 * sketch.rank_error
+
+
+def test_min_and_max_survive_compaction():
+    sketch = KllSketch()
+    sketch.update(shuffled(20000))
+    assert sketch.quantile(0) == 0
+    assert sketch.quantile(1) == 19999
+
+
+def test_merge_matches_single_sketch():
+    n = 60000
+    values = shuffled(n, seed=2)
+    merged = KllSketch()
+    for start in range(0, n, 10000):
+        part = KllSketch()
+        part.update(values[start:start + 10000])
+        merged.merge(part)
+    assert merged.count == n
+    assert (merged.min_value, merged.max_value) == (0, n - 1)
+    for q in (0.5, 0.9, 0.99):
+        assert abs(merged.quantile(q) / n - q) < 3 * merged.rank_error
+
+
+def test_merge_rejects_different_k():
+    with pytest.raises(ValueError):
+        KllSketch(100).merge(KllSketch(200))
+
+
+def test_round_trip_through_json():
+    sketch = KllSketch()
+    sketch.update(shuffled(5000))
+    restored = KllSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+    assert restored.count == sketch.count
+    assert restored.percentiles() == sketch.percentiles()
+    assert (restored.min_value, restored.max_value) == (0, 4999)
+    # Keeps compacting the same way as the original
+    sketch.update(range(5000))
+    restored.update(range(5000))
+    assert restored.levels == sketch.levels
+
+
+def test_from_dict_rejects_corrupt_levels():
+    data = KllSketch().to_dict()
+    data['count'] = 3
+    with pytest.raises(ValueError):
+        KllSketch.from_dict(data)
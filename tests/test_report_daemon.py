@@ -0,0 +1,66 @@
+import json
+import socket
+import time
+
+import pytest
+
+import report_daemon
+from report_daemon import JobServer, is_daemon_running, submit_job
+
+
+@pytest.fixture(autouse=True)
+def info_file(tmp_path, monkeypatch):
+    path = tmp_path / 'daemon.json'
+    monkeypatch.setattr(report_daemon, 'DAEMON_INFO_FILE', path)
+    monkeypatch.delenv('REPORT_NO_DAEMON', raising=False)
+    return path
+
+
+def test_submit_job_to_running_server(tmp_path):
+    csv_file = tmp_path / 'Support-sessions.csv'
+    csv_file.write_text('Started\n', encoding='utf-8')
+    server = JobServer(handler=lambda path, open_browser: path + '.html', name='test daemon')
+    server.start()
+    try:
+        response = submit_job(csv_file, open_browser=False)
+    finally:
+        server.stop()
+    assert response == {'status': 'success', 'report_file': str(csv_file.resolve()) + '.html',
+                        'host': 'test daemon'}
+
+
+def test_server_removes_info_file_on_stop(info_file):
+    server = JobServer(handler=lambda path, open_browser: None)
+    server.start()
+    assert is_daemon_running()
+    server.stop()
+    assert not info_file.exists()
+    assert submit_job('missing.csv') is None
+
+
+def test_stale_info_file_on_reused_port(tmp_path, info_file):
+    # Something else now listens on the crashed daemon's port and never replies
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen()
+    info_file.write_text(json.dumps({'port': listener.getsockname()[1], 'token': 'x', 'pid': 1}),
+                         encoding='utf-8')
+    try:
+        start = time.monotonic()
+        assert submit_job(tmp_path / 'Support-sessions.csv') is None
+        assert time.monotonic() - start < 5
+    finally:
+        listener.close()
+    assert not info_file.exists()
+
+
+def test_ping_from_a_different_pid_is_stale(info_file):
+    server = JobServer(handler=lambda path, open_browser: None)
+    server.start()
+    try:
+        info = json.loads(info_file.read_text(encoding='utf-8'))
+        info_file.write_text(json.dumps(dict(info, pid=info['pid'] + 1)), encoding='utf-8')
+        assert not is_daemon_running()
+        assert not info_file.exists()
+    finally:
+        server.stop()
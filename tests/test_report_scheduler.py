@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import pytest
+
+from report_scheduler import CronSpec, ReportScheduler, ScheduledJob
+
+
+def test_cron_fields():
+    spec = CronSpec('*/15 7-9 1,15 * 1-5')
+    assert spec.minutes == {0, 15, 30, 45}
+    assert spec.hours == {7, 8, 9}
+    assert spec.days == {1, 15}
+    assert spec.months == set(range(1, 13))
+    assert spec.weekdays == {0, 1, 2, 3, 4}   # Monday-Friday as Python weekdays
+
+
+def test_cron_sunday_is_0_or_7():
+    assert CronSpec('0 0 * * 0').weekdays == CronSpec('0 0 * * 7').weekdays == {6}
+
+
+def test_cron_aliases():
+    assert CronSpec('@weekdays').next_after(datetime(2025, 11, 7, 12)) == datetime(2025, 11, 10, 0, 0)
+    assert CronSpec('@monthly').next_after(datetime(2025, 11, 7)) == datetime(2025, 12, 1, 0, 0)
+
+
+@pytest.mark.parametrize('spec', ['0 7 * *', '60 * * * *', '0 24 * * *', '0 0 0 * *', '*/0 * * * *', '5-1 * * * *'])
+def test_cron_invalid(spec):
+    with pytest.raises(ValueError):
+        CronSpec(spec)
+
+
+def test_next_after_is_strictly_after():
+    spec = CronSpec('0 7 * * 1-5')
+    assert spec.next_after(datetime(2025, 11, 7, 6, 59, 30)) == datetime(2025, 11, 7, 7, 0)
+    assert spec.next_after(datetime(2025, 11, 7, 7, 0)) == datetime(2025, 11, 10, 7, 0)
+
+
+def test_day_of_month_or_weekday_when_both_restricted():
+    # Like cron: the 13th of the month or any Friday
+    spec = CronSpec('0 0 13 * 5')
+    runs = spec.runs_between(datetime(2025, 6, 1), datetime(2025, 6, 30))
+    assert [run.day for run in runs] == [6, 13, 20, 27]
+    spec = CronSpec('0 0 13 * 1')
+    runs = spec.runs_between(datetime(2025, 6, 1), datetime(2025, 6, 30))
+    assert [run.day for run in runs] == [2, 9, 13, 16, 23, 30]
+
+
+def test_runs_between_excludes_start():
+    spec = CronSpec('0 7 1 * *')
+    runs = spec.runs_between(datetime(2025, 1, 1, 7, 0), datetime(2025, 4, 1, 7, 0))
+    assert runs == [datetime(2025, 2, 1, 7), datetime(2025, 3, 1, 7), datetime(2025, 4, 1, 7)]
+
+
+def test_scheduler_catches_up_missed_runs(tmp_path):
+    calls = []
+    job = ScheduledJob('daily', '0 7 * * *', lambda run_time: calls.append(run_time))
+
+    # First start: nothing to catch up, the job starts from now
+    scheduler = ReportScheduler(tmp_path, [job])
+    assert scheduler.run_due(datetime(2025, 11, 3, 12, 0)) == 0
+
+    # Restarted three days later: one run per missed day, at most max_catch_up
+    scheduler = ReportScheduler(tmp_path, [job], max_catch_up=2)
+    assert scheduler.run_due(datetime(2025, 11, 6, 12, 0)) == 2
+    assert calls == [datetime(2025, 11, 5, 7), datetime(2025, 11, 6, 7)]
+
+    # State survives restarts
+    scheduler = ReportScheduler(tmp_path, [job])
+    assert scheduler.last_runs['daily'] == datetime(2025, 11, 6, 7)
+    assert scheduler.run_due(datetime(2025, 11, 6, 13, 0)) == 0
+
+
+def test_failed_job_does_not_block_the_schedule(tmp_path):
+    def fail(run_time):
+        raise RuntimeError('boom')
+
+    scheduler = ReportScheduler(tmp_path, [ScheduledJob('daily', '0 7 * * *', fail)])
+    scheduler.run_due(datetime(2025, 11, 3, 12, 0))
+    assert scheduler.run_due(datetime(2025, 11, 4, 12, 0)) == 1
+    assert scheduler.last_runs['daily'] == datetime(2025, 11, 4, 7)
+
+
+def test_next_run_over_all_jobs(tmp_path):
+    jobs = [ScheduledJob('daily', '0 7 * * 1-5', None), ScheduledJob('monthly', '0 6 1 * *', None)]
+    scheduler = ReportScheduler(tmp_path, jobs)
+    assert scheduler.next_run(datetime(2025, 10, 31, 8, 0)) == datetime(2025, 11, 1, 6, 0)
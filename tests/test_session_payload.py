@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from auto_generate_report import _render_and_write, aggregate_sessions
+from session_payload import GZIP_THRESHOLD, encode_sessions, payload_json, resolve_mode, session_script
+
+TEMPLATE = '''<html><body>
+<select>
+          <!-- Representative options will be populated by JavaScript -->
+</select>
+<script>
+let allSessionData = []; // Will be populated by the Python script
+</script>
+<script>
+renderTable(allSessionData.filter(s => s.hour >= 9));
+</script>
+</body></html>
+'''
+
+
+def sessions(n, seed=1):
+    rng = random.Random(seed)
+    epoch = 0
+    rows = []
+    for i in range(n):
+        epoch += rng.randrange(1, 100000)
+        day, second = divmod(epoch, 86400)
+        rows.append({
+            'Started': f'2025-{1 + day // 28 % 12:02d}-{1 + day % 28:02d} '
+                       f'{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d} EST',
+            "Representative's Name": f'Rep {rng.randrange(40)}',
+            "Representative's Time Involved": f'0:{rng.randrange(60):02d}',
+            "Customer's Public IP": f'10.0.{i // 256 % 256}.{i % 256}',
+            "Customer's Name": f'C{i % 50}',
+        })
+    return rows
+
+
+@pytest.fixture(scope='module')
+def large_payload():
+    payload = encode_sessions(sessions(60000))
+    assert len(payload_json(payload)) > GZIP_THRESHOLD
+    return payload
+
+
+def test_auto_mode_compresses_large_payloads(large_payload):
+    assert resolve_mode(large_payload, 'auto') == 'gzip'
+    assert resolve_mode(encode_sessions(sessions(10)), 'auto') == 'inline'
+
+
+def test_auto_mode_stays_inline_for_row_list_templates(large_payload):
+    assert resolve_mode(large_payload, 'auto', row_compat=True) == 'inline'
+    script = session_script(large_payload, 'auto', row_compat=True)
+    assert 'inflateSessionPayload("' not in script
+    assert 'allSessionData = sessionRows(sessionColumns);' in script
+
+
+def test_large_report_fills_row_list_at_page_load(tmp_path):
+    rows = sessions(60000)
+    totals = aggregate_sessions(rows)
+    payload = encode_sessions(rows)
+    template = tmp_path / 'template.html'
+    template.write_text(TEMPLATE, encoding='utf-8')
+
+    report = _render_and_write(rows, totals, payload, tmp_path, template_file=template)
+    html = open(report, encoding='utf-8').read()
+    assert 'inflateSessionPayload("' not in html
+    # The row list is filled before the template's own script runs
+    assert html.index('allSessionData = sessionRows(sessionColumns);') < html.index('renderTable(')
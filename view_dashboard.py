@@ -14,17 +14,146 @@ from datetime import datetime
 import webbrowser
 import os
 
+from history_store import load_history, load_snapshot, read_events
+from instrumentation import stage_trends
 
-def load_history(folder):
-    """Load processing history"""
-    history_file = Path(folder) / "processing_history.json"
-    if history_file.exists():
-        with open(history_file, 'r') as f:
-            return json.load(f)
-    return []
+# Pipeline stages in processing order (for breakdowns and trends)
+STAGE_ORDER = ['file_wait', 'clean', 'parse', 'aggregate', 'render', 'write']
 
+# Card / badge style per representative state (anything else is neutral)
+REP_STATE_CLASSES = {'available': 'success', 'busy': 'error', 'idle': 'rate'}
 
-def generate_dashboard_html(history, folder):
+
+def _ordered_stages(stages):
+    """Stage names in pipeline order, unknown stages last"""
+    return sorted(stages, key=lambda name: STAGE_ORDER.index(name) if name in STAGE_ORDER else len(STAGE_ORDER))
+
+
+def _stage_breakdown_html(stages):
+    """Compact per-stage timing text for one history record"""
+    if not stages:
+        return ''
+    parts = [f"{name} {stages[name].get('seconds', 0):.2f}s" for name in _ordered_stages(stages)]
+    return f'<div class="timestamp">{" &middot; ".join(parts)}</div>'
+
+
+def _stage_trends_html(history):
+    """p50/p95 per stage across the processing history"""
+    trends = stage_trends(history)
+    if not trends:
+        return ''
+
+    html = '''
+        <div class="section">
+            <h2>Stage Timings (p50 / p95)</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Stage</th>
+                        <th>Samples</th>
+                        <th>p50</th>
+                        <th>p95</th>
+                    </tr>
+                </thead>
+                <tbody>
+'''
+    for name in _ordered_stages(trends):
+        trend = trends[name]
+        html += f'''
+                    <tr>
+                        <td>{name}</td>
+                        <td>{trend['count']}</td>
+                        <td>{trend['p50']:.2f}s</td>
+                        <td>{trend['p95']:.2f}s</td>
+                    </tr>
+'''
+    html += '''
+                </tbody>
+            </table>
+        </div>
+'''
+    return html
+
+
+def _rep_status_html(rep_status, rep_events):
+    """Build the live representative status section (from rep_status_poller.py)"""
+    counts = rep_status.get('counts', {})
+    updated = rep_status.get('updated', '')
+
+    html = f'''
+        <div class="section">
+            <h2>Live Representative Status</h2>
+            <div class="stats">
+                <div class="stat-card">
+                    <div class="stat-label">Available</div>
+                    <div class="stat-value success">{counts.get('available', 0)}</div>
+                </div>
+                <div class="stat-card">
+                    <div class="stat-label">Busy</div>
+                    <div class="stat-value error">{counts.get('busy', 0)}</div>
+                </div>
+                <div class="stat-card">
+                    <div class="stat-label">Idle</div>
+                    <div class="stat-value rate">{counts.get('idle', 0)}</div>
+                </div>
+                <div class="stat-card">
+                    <div class="stat-label">Unavailable</div>
+                    <div class="stat-value neutral">{counts.get('unavailable', 0)}</div>
+                </div>
+            </div>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Representative</th>
+                        <th>Status</th>
+                        <th>Sessions</th>
+                    </tr>
+                </thead>
+                <tbody>
+'''
+    for rep in sorted(rep_status.get('reps', {}).values(), key=lambda r: r['name']):
+        badge_class = REP_STATE_CLASSES.get(rep['state'], 'neutral')
+        html += f'''
+                    <tr>
+                        <td>{rep['name']}</td>
+                        <td><span class="badge {badge_class}">{rep['state'].upper()}</span></td>
+                        <td>{rep['session_count']}</td>
+                    </tr>
+'''
+    html += '''
+                </tbody>
+            </table>
+'''
+
+    if rep_events:
+        html += '''
+            <h2 style="margin-top:20px">Recent Changes</h2>
+            <table>
+                <tbody>
+'''
+        for event in reversed(rep_events):
+            parts = [f"{r['name']} joined" for r in event.get('joined', [])]
+            parts += [f"{r['name']} left" for r in event.get('left', [])]
+            parts += [f"{r['name']}: {r['from']} &rarr; {r['to']}" for r in event.get('changed', [])]
+            html += f'''
+                    <tr>
+                        <td class="timestamp">{event.get('time', '')}</td>
+                        <td>{', '.join(parts)}</td>
+                    </tr>
+'''
+        html += '''
+                </tbody>
+            </table>
+'''
+
+    html += f'''
+            <div class="timestamp" style="margin-top:10px">Last updated: {updated}</div>
+        </div>
+'''
+    return html
+
+
+def generate_dashboard_html(history, folder, rep_status=None, rep_events=None):
     """Generate HTML dashboard"""
 
     # Calculate statistics
@@ -96,6 +225,9 @@ def generate_dashboard_html(history, folder):
         .stat-value.rate {{
             color: #3b82f6;
         }}
+        .stat-value.neutral {{
+            color: #64748b;
+        }}
         .section {{
             background: white;
             padding: 20px;
@@ -140,6 +272,14 @@ def generate_dashboard_html(history, folder):
             background: #fee2e2;
             color: #991b1b;
         }}
+        .badge.rate {{
+            background: #dbeafe;
+            color: #1e40af;
+        }}
+        .badge.neutral {{
+            background: #f1f5f9;
+            color: #475569;
+        }}
         .btn {{
             display: inline-block;
             padding: 8px 16px;
@@ -193,6 +333,12 @@ def generate_dashboard_html(history, folder):
             </div>
         </div>
 
+'''
+
+    if rep_status:
+        html += _rep_status_html(rep_status, rep_events)
+
+    html += '''
         <div class="section">
             <h2>Recent Reports</h2>
 '''
@@ -227,7 +373,7 @@ def generate_dashboard_html(history, folder):
                         <td class="timestamp">{start_time.strftime('%Y-%m-%d %H:%M:%S')}</td>
                         <td>{record['filename']}</td>
                         <td><span class="badge {status_class}">{status_text}</span></td>
-                        <td>{duration:.1f}s</td>
+                        <td>{duration:.1f}s{_stage_breakdown_html(record.get('stages'))}</td>
                         <td>{report_link}</td>
                     </tr>
 '''
@@ -241,9 +387,13 @@ def generate_dashboard_html(history, folder):
             <div class="empty">No reports processed yet</div>
 '''
 
-    html += f'''
+    html += '''
         </div>
+'''
+
+    html += _stage_trends_html(history)
 
+    html += f'''
         <div class="section">
             <h2>Quick Actions</h2>
             <a href="file:///{folder}" class="btn">Open Downloads Folder</a>
@@ -261,6 +411,22 @@ def generate_dashboard_html(history, folder):
     return html
 
 
+def write_dashboard(folder):
+    """Regenerate report_dashboard.html in the folder and return its path"""
+    folder = Path(folder)
+    history = load_history(folder)
+    rep_status = load_snapshot(folder, "rep_status")
+    rep_events = read_events(folder, "rep_status", limit=10)
+
+    html = generate_dashboard_html(history, folder, rep_status, rep_events)
+
+    dashboard_file = folder / "report_dashboard.html"
+    with open(dashboard_file, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+    return dashboard_file
+
+
 def main():
     print("=" * 60)
     print("BeyondTrust Report Dashboard")
@@ -285,14 +451,9 @@ def main():
     history = load_history(folder)
     print(f"Found {len(history)} records")
 
-    # Generate dashboard
+    # Generate and save dashboard
     print("Generating dashboard...")
-    html = generate_dashboard_html(history, folder)
-
-    # Save dashboard
-    dashboard_file = folder / "report_dashboard.html"
-    with open(dashboard_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    dashboard_file = write_dashboard(folder)
 
     print(f"Dashboard saved to: {dashboard_file}")
     print("\nOpening in browser...")